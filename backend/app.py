@@ -1,20 +1,56 @@
 import os
 import json
+import logging
+from datetime import datetime, timezone
 from flask import Flask, render_template, redirect, url_for, request, session, flash, jsonify, Blueprint, current_app
 from flask_cors import CORS
-from werkzeug.utils import secure_filename
-from werkzeug.security import check_password_hash
+from sqlalchemy import insert
 
 # Ensure imports work whether run as module (python -m backend.app)
 # or as script inside backend directory (python app.py)
 try:
     from backend.db import db
-    from backend.config import Config
+    from backend.config import get_config
     # Models
     from backend.models.users import Users
     from backend.models.properties import Property
+    from backend.models.property_images import PropertyImage
+    from backend.models.table_versions import TableVersion
+    from backend.models.image_variants import ImageVariant
+    from backend.models.property_tombstones import PropertyTombstone
+    from backend.models.saved_searches import SavedSearch
+    from backend.models.saved_search_matches import SavedSearchMatch
+    from backend.models.properties_archive import PropertyArchive
     # Blueprints
     from backend.routes.property_routes import property_routes
+    from backend.routes.saved_search_routes import saved_search_routes
+    from backend.utils.pagination import parse_page_args, paginate, DEFAULT_PAGE_SIZE
+    from backend.utils.listing_filters import listing_query
+    from backend.utils.invalidation import listings_changed
+    from backend.utils.cache import init_listing_cache, listing_cache, normalize_filters
+    from backend.utils.conditional import make_validators, not_modified, add_validators, record_validators
+    from backend.utils.serializers import (
+        PROPERTY_FIELDS, columns_for, json_response, parse_fields, property_to_dict, serialize_properties
+    )
+    from backend.utils.validators import validate_property, REQUIRED_PROPERTY_FIELDS
+    from backend.utils.streaming import requested_stream_format, stream_properties
+    from backend.utils.search import reindex_properties
+    from backend.utils.saved_searches import init_saved_searches, match_saved_searches, saved_searches_changed
+    from backend.utils.archive import init_archive
+    from backend.utils.changes import claim_property_ids, record_property_changes
+    from backend.utils.geo import location_fields
+    from backend.utils.instrumentation import init_instrumentation
+    from backend.utils.pool import engine_options, init_pool
+    from backend.utils.replicas import init_replicas, replica_reads
+    from backend.utils.passwords import PasswordHasherBusy, init_password_hasher, password_hasher
+    from backend.utils.sessions import init_sessions
+    from backend.utils.users import current_user, get_user, init_user_cache, invalidate_user, remember_user
+    from backend.utils.logs import configure_logging
+    from backend.utils.images import init_image_pipeline
+    from backend.utils.uploads import init_upload_headers, save_upload
+    from backend.utils.compression import init_compression
+    from backend.utils.assets import init_assets
+    from backend.utils.asgi import run_blocking
 except ModuleNotFoundError:
     import sys
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -22,12 +58,49 @@ except ModuleNotFoundError:
     if project_root not in sys.path:
         sys.path.insert(0, project_root)
     from backend.db import db
-    from backend.config import Config
+    from backend.config import get_config
     # Models
     from backend.models.users import Users
     from backend.models.properties import Property
+    from backend.models.property_images import PropertyImage
+    from backend.models.table_versions import TableVersion
+    from backend.models.image_variants import ImageVariant
+    from backend.models.property_tombstones import PropertyTombstone
+    from backend.models.saved_searches import SavedSearch
+    from backend.models.saved_search_matches import SavedSearchMatch
+    from backend.models.properties_archive import PropertyArchive
     # Blueprints
     from backend.routes.property_routes import property_routes
+    from backend.routes.saved_search_routes import saved_search_routes
+    from backend.utils.pagination import parse_page_args, paginate, DEFAULT_PAGE_SIZE
+    from backend.utils.listing_filters import listing_query
+    from backend.utils.invalidation import listings_changed
+    from backend.utils.cache import init_listing_cache, listing_cache, normalize_filters
+    from backend.utils.conditional import make_validators, not_modified, add_validators, record_validators
+    from backend.utils.serializers import (
+        PROPERTY_FIELDS, columns_for, json_response, parse_fields, property_to_dict, serialize_properties
+    )
+    from backend.utils.validators import validate_property, REQUIRED_PROPERTY_FIELDS
+    from backend.utils.streaming import requested_stream_format, stream_properties
+    from backend.utils.search import reindex_properties
+    from backend.utils.saved_searches import init_saved_searches, match_saved_searches, saved_searches_changed
+    from backend.utils.archive import init_archive
+    from backend.utils.changes import claim_property_ids, record_property_changes
+    from backend.utils.geo import location_fields
+    from backend.utils.instrumentation import init_instrumentation
+    from backend.utils.pool import engine_options, init_pool
+    from backend.utils.replicas import init_replicas, replica_reads
+    from backend.utils.passwords import PasswordHasherBusy, init_password_hasher, password_hasher
+    from backend.utils.sessions import init_sessions
+    from backend.utils.users import current_user, get_user, init_user_cache, invalidate_user, remember_user
+    from backend.utils.logs import configure_logging
+    from backend.utils.images import init_image_pipeline
+    from backend.utils.uploads import init_upload_headers, save_upload
+    from backend.utils.compression import init_compression
+    from backend.utils.assets import init_assets
+    from backend.utils.asgi import run_blocking
+
+logger = logging.getLogger(__name__)
 
 # ------------------------
 # Blueprints
@@ -37,84 +110,41 @@ except ModuleNotFoundError:
 # Property APIs
 # ------------------------
 @property_routes.route("/api/properties", methods=["GET"])
+@replica_reads
 def get_properties():
-    query = Property.query.filter_by(status="Available")
-
-    # Parse filters from query string
-    filters_param = request.args.get("filters")
-    if filters_param:
-        try:
-            filters = json.loads(filters_param)
-
-            # Cities
-            if filters.get("cities"):
-                query = query.filter(Property.city.in_(filters["cities"]))
-
-            # Districts
-            if filters.get("districts"):
-                query = query.filter(Property.district.in_(filters["districts"]))
-
-            # Areas (using the dedicated area column)
-            if filters.get("areas"):
-                query = query.filter(Property.area.in_(filters["areas"]))
-
-            # Property Types
-            if filters.get("propertyTypes"):
-                query = query.filter(Property.property_type.in_(filters["propertyTypes"]))
-
-            # BHK
-            if filters.get("bhk"):
-                query = query.filter(Property.house_type.in_(filters["bhk"]))
-
-            # Budget
-            if filters.get("minBudget") and filters.get("maxBudget"):
-                query = query.filter(
-                    Property.rent_price.between(filters["minBudget"], filters["maxBudget"])
-                )
-
-            # Car Parking
-            if filters.get("carParking"):
-                query = query.filter(Property.car_parking == filters["carParking"])
-
-            # Pets
-            if filters.get("pets"):
-                query = query.filter(Property.pets == filters["pets"])
-
-            # Facing (multiple allowed)
-            if filters.get("facing"):
-                query = query.filter(Property.facing.in_(filters["facing"]))
-
-            # Furnishing (multiple allowed)
-            if filters.get("furnishing"):
-                query = query.filter(Property.furnishing.in_(filters["furnishing"]))
-
-        except Exception as e:
-            print("Filter parsing error:", e)
-
-    # Final query
-    all_props = query.order_by(Property.property_id.desc()).all()
-
-    # Convert to dict list
-    props_list = [{
-        "property_id": p.property_id,
-        "full_name": p.full_name,
-        "address": p.address,
-        "city": p.city,
-        "area": p.area,
-        "district": p.district,
-        "property_type": p.property_type,
-        "house_type": p.house_type,
-        "rent_price": str(p.rent_price),
-        "car_parking": p.car_parking,
-        "pets": p.pets,
-        "facing": p.facing,
-        "furnishing": p.furnishing,
-        "description": p.description,
-        "images": p.images.split(",") if p.images else [],
-        "status": p.status
-    } for p in all_props]
-
-    return jsonify(props_list)
+    try:
+        after_id, limit = parse_page_args(request.args)
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Full exports (partner feed, analytics) stream the whole filtered catalog
+    stream_format = requested_stream_format(request)
+    if stream_format:
+        return stream_properties(listing_query(request.args.get("filters")), fields, stream_format)
+
+    # Clients revalidating an unchanged page get a 304 without any serialization
+    filters_key = normalize_filters(request.args.get("filters"))
+    etag, last_modified = make_validators("properties", filters_key, after_id, limit, ",".join(fields))
+    unchanged = not_modified(etag, last_modified)
+    if unchanged is not None:
+        return unchanged
+
+    # Popular filter combinations are served straight from the cache
+    cache = listing_cache()
+    cache_key = cache.key("properties", etag)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return add_validators(current_app.response_class(cached, mimetype="application/json"), etag, last_modified)
+
+    # Final query (one keyset page, newest first), selecting only the
+    # requested columns rather than hydrating full Property objects
+    query = listing_query(request.args.get("filters")).with_entities(*columns_for(fields))
+    rows, next_cursor = paginate(query, Property.property_id, after_id, limit)
+
+    response = json_response({"properties": serialize_properties(rows, fields), "next_cursor": next_cursor})
+    cache.set(cache_key, response.get_data())
+    return add_validators(response, etag, last_modified)
 
 
 @property_routes.route("/api/properties", methods=["POST"])
@@ -125,20 +155,22 @@ def create_property():
 
     form_data = request.form.to_dict()
 
+    error = validate_property(form_data)
+    if error:
+        return jsonify({"error": error}), 400
     car_parking = form_data.get("car_parking")
     pets = form_data.get("pets")
-    if car_parking not in ("Any", "Available", "NotAvailable"):
-        return jsonify({"error": "Invalid car_parking value"}), 400
-    if pets not in ("Any", "Allowed", "Strictly Not Allowed"):
-        return jsonify({"error": "Invalid pets value"}), 400
 
     files = request.files.getlist("images")
     image_filenames = []
     for f in files:
         if f:
-            filename = secure_filename(f.filename)
-            f.save(os.path.join(current_app.config["UPLOAD_FOLDER"], filename))
-            image_filenames.append(filename)
+            filename = run_blocking(save_upload, f, current_app.config["UPLOAD_FOLDER"],
+                                    current_app.config["ALLOWED_EXTENSIONS"])
+            if filename is None:
+                return jsonify({"error": f"Unsupported image type: {f.filename}"}), 400
+            if filename not in image_filenames:
+                image_filenames.append(filename)
 
     try:
         new_property = Property(
@@ -157,38 +189,96 @@ def create_property():
             facing=form_data.get("facing"),
             furnishing=form_data.get("furnishing"),
             description=form_data.get("description"),
-            images=",".join(image_filenames),
-            status="Available"
+            photos=[PropertyImage(ordinal=i, storage_key=name) for i, name in enumerate(image_filenames)],
+            status="Available",
+            **location_fields(form_data),
         )
 
         db.session.add(new_property)
+        record_property_changes([new_property])
+        db.session.commit()
+        listings_changed()
+        reindex_properties([new_property.property_id])
+        match_saved_searches([new_property.property_id])
+        # Resized variants are built off the request path
+        current_app.extensions["image_pipeline"].submit(image_filenames)
+
+        body = {"success": True, "property_id": new_property.property_id, "property": property_to_dict(new_property)}
+
+        # Compatibility for clients that expect the listing page back
+        if "list" in request.args.get("include", "").split(","):
+            page, next_cursor = paginate(
+                Property.query.filter_by(status="Available").with_entities(*columns_for(PROPERTY_FIELDS)),
+                Property.property_id, None, DEFAULT_PAGE_SIZE
+            )
+            body["properties"] = serialize_properties(page)
+            body["next_cursor"] = next_cursor
+
+        response = jsonify(body)
+        response.headers["Location"] = url_for("property_routes.get_property", property_id=new_property.property_id)
+        return response, 201
+
+    except Exception:
+        db.session.rollback()
+        logger.exception("property create failed")
+        return jsonify({"error": "Failed to create property"}), 500
+
+
+MAX_BATCH_SIZE = 500
+
+
+@property_routes.route("/api/properties/batch", methods=["POST"])
+def create_properties_batch():
+    user_data = session.get("user")
+    if not user_data or not isinstance(user_data, dict):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    data = request.get_json(silent=True) or {}
+    items = data.get("properties")
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Expected a non-empty 'properties' list"}), 400
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"At most {MAX_BATCH_SIZE} properties per batch"}), 400
+
+    rows = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            return jsonify({"error": "Each property must be an object", "index": index}), 400
+        error = validate_property(item, require_all=True)
+        if error:
+            return jsonify({"error": error, "index": index}), 400
+        row = {field: item[field] for field in REQUIRED_PROPERTY_FIELDS}
+        row.update(
+            owner_id=user_data.get("user_id"),
+            description=item.get("description"),
+            status="Available",
+            created_at=datetime.now(timezone.utc),
+            latitude=None,
+            longitude=None,
+            geohash=None,
+        )
+        row.update(location_fields(item))
+        rows.append(row)
+
+    try:
+        # One multi-row INSERT inside a single transaction, with ids claimed
+        # under the version lock (so every dialect knows them up front)
+        seq = record_property_changes()
+        property_ids = claim_property_ids(len(rows))
+        for row, property_id in zip(rows, property_ids):
+            row.update(property_id=property_id, change_seq=seq)
+        db.session.execute(insert(Property), rows)
         db.session.commit()
+        listings_changed()
+        reindex_properties(property_ids)
+        match_saved_searches(property_ids)
+
+        return jsonify({"success": True, "created": len(rows), "property_ids": property_ids}), 201
 
-        all_props = Property.query.filter_by(status="Available").order_by(Property.property_id.desc()).all()
-        props_list = [{
-            "property_id": p.property_id,
-            "full_name": p.full_name,
-            "address": p.address,
-            "city": p.city,
-            "area": p.area,
-            "district": p.district,
-            "property_type": p.property_type,
-            "house_type": p.house_type,
-            "rent_price": str(p.rent_price),
-            "car_parking": p.car_parking,
-            "pets": p.pets,
-            "facing": p.facing,
-            "furnishing": p.furnishing,
-            "description": p.description,
-            "images": p.images.split(",") if p.images else [],
-            "status": p.status
-        } for p in all_props]
-
-        return jsonify(props_list), 201
-
-    except Exception as e:
+    except Exception:
         db.session.rollback()
-        return jsonify({"error": str(e)}), 500
+        logger.exception("batch create failed")
+        return jsonify({"error": "Failed to create properties"}), 500
 
 
 ## Status update route is defined in blueprint file to avoid duplication
@@ -197,18 +287,43 @@ def create_property():
 # ------------------------
 # App factory
 # ------------------------
-def create_app():
+def create_app(config=None, **overrides):
+    """Build the app from a config profile name or class (default: ``APP_ENV``).
+
+    Keyword arguments override individual settings, e.g.
+    ``create_app("bench", SQLALCHEMY_DATABASE_URI=...)``.
+    """
+    if config is None or isinstance(config, str):
+        config = get_config(config)
     app = Flask(__name__, template_folder="templates", static_folder="static")
-    app.config.from_object(Config)
-    app.secret_key = Config.SECRET_KEY
+    app.config.from_object(config)
     app.config["UPLOAD_FOLDER"] = os.path.join(app.root_path, "static/uploads")
-    os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
-
+    app.config.update(overrides)
+    missing = [key for key in ("SQLALCHEMY_DATABASE_URI", "SECRET_KEY") if not app.config.get(key)]
+    if missing:
+        raise RuntimeError(f"Missing configuration: {', '.join(missing)}")
+    app.secret_key = app.config["SECRET_KEY"]
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config)
+
+    configure_logging(app)
     db.init_app(app)
+    init_replicas(app)
+    init_instrumentation(app)
+    init_pool(app)
+    init_sessions(app)
+    init_password_hasher(app)
+    init_user_cache(app)
+    init_listing_cache(app)
+    init_saved_searches(app)
+    init_image_pipeline(app)
+    init_archive(app)
+    init_upload_headers(app)
+    init_assets(app)
+    init_compression(app)
     CORS(app, supports_credentials=True)
-
-    with app.app_context():
-        db.create_all()
+    # No schema or filesystem work here: tables come from
+    # ``python -m backend.scripts.migrate`` and the upload folder is created
+    # on first write, so workers start without touching either.
 
     # ------------------------
     # HTML Pages
@@ -238,10 +353,11 @@ def create_app():
 
     @app.route("/profile")
     def profile_page():
-        if "user" not in session:
+        user = current_user()
+        if user is None:
             flash("Please login to view your profile.", "warning")
             return redirect(url_for("login_page"))
-        return render_template("profile.html", user=session["user"])
+        return render_template("profile.html", user=user)
 
     @app.route("/logout")
     def logout():
@@ -277,9 +393,11 @@ def create_app():
             db.session.commit()
 
             return jsonify({"success": True, "message": "Signup successful"})
+        except PasswordHasherBusy:
+            raise  # 503 with Retry-After (see utils/passwords.py)
         except Exception as e:
             db.session.rollback()
-            print(f"Signup error: {str(e)}")  # Log to console
+            logger.exception("signup failed")
             return jsonify({"success": False, "error": f"Server error: {str(e)}"}), 500
 
     @app.route("/auth/login", methods=["POST"])
@@ -305,26 +423,32 @@ def create_app():
             if not user.password_hash:  # ✅ fix here
                 return jsonify({"success": False, "message": "Password not set for this user"}), 500
 
-            if check_password_hash(user.password_hash, password):  # ✅ fix here
-                session["user"] = {
-                    "user_id": user.user_id,
-                    "full_name": user.full_name,
-                    "email": user.email,
-                    "mobile_number": user.mobile_number
-                }
-                return jsonify({"success": True, "user": session["user"]})
+            if user.check_password(password):
+                # Hash made with older settings: upgrade it while we have the password
+                if password_hasher().needs_rehash(user.password_hash):
+                    try:
+                        user.set_password(password)
+                        db.session.commit()
+                    except PasswordHasherBusy:
+                        logger.info("rehash deferred user_id=%s", user.user_id)
+                # The session keeps only the id; details come from get_user()
+                session["user"] = {"user_id": user.user_id}
+                session.rotate()
+                return jsonify({"success": True, "user": remember_user(user)})
 
             return jsonify({"success": False, "message": "Invalid credentials"}), 401
 
+        except PasswordHasherBusy:
+            raise
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception("login failed")
             return jsonify({"success": False, "message": f"Server error: {str(e)}"}), 500
 
     @app.route("/api/session")
     def check_session():
-        if "user" in session and isinstance(session["user"], dict):
-            return jsonify({"loggedIn": True, "user": session["user"]})
+        user = current_user()
+        if user is not None:
+            return jsonify({"loggedIn": True, "user": user})
         return jsonify({"loggedIn": False}), 401
 
     # ------------------------
@@ -335,17 +459,16 @@ def create_app():
         if "user" not in session:
             return jsonify({"error": "Unauthorized"}), 401
 
-        user_id = session["user"]["user_id"]
-        user = db.session.get(Users, user_id)
+        user = get_user(session["user"]["user_id"])
         if not user:
             return jsonify({"error": "User not found"}), 404
 
-        return jsonify({
-            "user_id": user.user_id,
-            "full_name": user.full_name,
-            "email": user.email,
-            "mobile_number": user.mobile_number
-        })
+        # Keyed on this user's row only: other accounts' writes keep it valid
+        etag, last_modified = record_validators("user", user)
+        unchanged = not_modified(etag, last_modified)
+        if unchanged is not None:
+            return unchanged
+        return add_validators(jsonify(user), etag, last_modified)
 
     @app.route("/api/profile", methods=["PUT"])
     def update_profile():
@@ -371,14 +494,7 @@ def create_app():
             user.set_password(data["password"])
 
         db.session.commit()
-
-        # Update session with new data
-        session["user"] = {
-            "user_id": user.user_id,
-            "full_name": user.full_name,
-            "email": user.email,
-            "mobile_number": user.mobile_number
-        }
+        invalidate_user(user_id)
 
         return jsonify({"success": True, "message": "Profile updated successfully"})
 
@@ -392,8 +508,22 @@ def create_app():
         if not user:
             return jsonify({"error": "User not found"}), 404
 
+        # The owner's listings go with the account; leave tombstones for the feed
+        owned = Property.query.filter_by(owner_id=user_id).with_entities(Property.property_id, Property.owner_id).all()
+        record_property_changes(deleted=owned)
+        search_ids = [sid for sid, in db.session.query(SavedSearch.search_id).filter_by(user_id=user_id)]
+        SavedSearchMatch.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+        if search_ids:
+            SavedSearch.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            TableVersion.bump("saved_searches")
+        PropertyArchive.query.filter_by(owner_id=user_id).delete(synchronize_session=False)
         db.session.delete(user)
         db.session.commit()
+        listings_changed()  # owner's listings go with the account
+        reindex_properties([property_id for property_id, _ in owned])
+        if search_ids:
+            saved_searches_changed(removed=search_ids)
+        invalidate_user(user_id)
         session.pop("user", None)
 
         return jsonify({"success": True, "message": "Account deleted successfully"})
@@ -402,9 +532,9 @@ def create_app():
     # Register Blueprint
     # ------------------------
 
-    print("[DEBUG] Registering property_routes blueprint")
     app.register_blueprint(property_routes)
-    print("[DEBUG] property_routes blueprint registered successfully")
+    app.register_blueprint(saved_search_routes)
+    logger.debug("property_routes and saved_search_routes blueprints registered")
 
     # profile_routes blueprint removed; contact owner handled in property routes
 
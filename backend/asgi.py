@@ -0,0 +1,29 @@
+"""ASGI entry point: the same routes, served from an event loop.
+
+    uvicorn --factory backend.asgi:create_asgi_app --host 0.0.0.0 --port 5002 --workers 4
+
+Every route of ``create_app()`` (the ``property_routes`` blueprint included)
+runs unchanged; see ``utils/asgi.py`` for how. The database and replica URLs
+are switched to the asyncio driver of the same database (aiomysql for
+MySQL, aiosqlite for SQLite) unless ``ASYNC_DATABASE_URL`` names one.
+"""
+from backend.app import create_app
+from backend.config import get_config
+from backend.utils.asgi import ASGIAdapter, async_database_uri
+
+
+def create_asgi_app(config=None, **overrides):
+    """ASGI callable for a config profile; keyword arguments override settings, as in ``create_app``."""
+    if config is None or isinstance(config, str):
+        config = get_config(config)
+
+    def setting(name):
+        return overrides.get(name, getattr(config, name, None))
+
+    uri = setting("ASYNC_DATABASE_URL") or setting("SQLALCHEMY_DATABASE_URI")
+    overrides.update(
+        SQLALCHEMY_DATABASE_URI=async_database_uri(uri) if uri else uri,
+        REPLICA_DATABASE_URIS=[async_database_uri(u) for u in setting("REPLICA_DATABASE_URIS") or ()],
+    )
+    app = create_app(config, **overrides)
+    return ASGIAdapter(app, blocking_workers=app.config.get("ASGI_BLOCKING_WORKERS", 8))
@@ -0,0 +1,221 @@
+"""Benchmark: threaded WSGI server vs the ASGI server at high concurrency.
+
+Seeds a throwaway SQLite file (as ``bench_endpoints`` does, listing cache
+off) and serves the same routes two ways:
+
+* ``wsgi`` - werkzeug's threaded server, one thread per connection, sync
+  driver (pysqlite);
+* ``asgi`` - uvicorn with ``backend.asgi.create_asgi_app``, one event loop,
+  async driver (aiosqlite).
+
+A separate client process holds ``--connections`` keep-alive connections
+open and sends requests on all of them for ``--duration`` seconds, per
+scenario:
+
+* ``detail``        GET /api/property/<id>
+* ``list_filtered`` GET /api/properties?filters=...
+
+SQLite answers in microseconds, far faster than MySQL over a network;
+``--db-latency-ms`` adds that round trip to every statement (a sleep that
+holds the request's thread under WSGI and yields to the loop under ASGI).
+
+Usage:
+    python -m backend.benchmarks.bench_asgi [--properties 5000] [--connections 500]
+        [--duration 10] [--db-latency-ms 5] [--pool-size 20]
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import multiprocessing
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlencode
+
+from sqlalchemy import event
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+
+from backend.app import create_app, db
+from backend.asgi import create_asgi_app
+from backend.benchmarks.bench_endpoints import FILTERS, seed, serving, summarize
+from backend.models.properties import Property
+
+try:
+    import uvicorn
+except ImportError:  # pragma: no cover - only the asgi mode needs it
+    uvicorn = None
+
+
+# -- server side -------------------------------------------------------------
+
+def add_round_trip_latency(app, seconds):
+    """Delay every statement by ``seconds``, the way a remote database would."""
+    if seconds <= 0:
+        return
+
+    def round_trip(*args):
+        if in_greenlet():
+            await_only(asyncio.sleep(seconds))
+        else:
+            time.sleep(seconds)
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", round_trip)
+
+
+@contextlib.contextmanager
+def serving_asgi(asgi_app):
+    config = uvicorn.Config(asgi_app, host="127.0.0.1", port=0, log_level="warning",
+                            access_log=False, lifespan="on", backlog=2048)
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("uvicorn failed to start")
+        time.sleep(0.01)
+    try:
+        yield server.servers[0].sockets[0].getsockname()[1]
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+# -- client side (runs in its own process) -----------------------------------
+
+async def _read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    headers = dict(line.lower().split(": ", 1) for line in lines[1:] if ": " in line)
+    await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers.get("connection") == "close"
+
+
+async def _connection(port, paths, rng, start_at, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    await asyncio.sleep(max(0.0, start_at - time.perf_counter()))
+    try:
+        while time.perf_counter() < deadline:
+            request = f"GET {rng.choice(paths)} HTTP/1.1\r\nHost: bench\r\n\r\n".encode()
+            started = time.perf_counter()
+            try:
+                writer.write(request)
+                status, closed = await asyncio.wait_for(_read_response(reader), 30)
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+                errors.append(1)
+                closed = True
+            else:
+                latencies.append(time.perf_counter() - started)
+                if status >= 400:
+                    errors.append(1)
+            if closed:
+                writer.close()
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    finally:
+        writer.close()
+
+
+async def _load(port, paths, connections, duration, seed_value):
+    # Every connection is opened before the clock starts
+    start_at = time.perf_counter() + 1 + connections / 500
+    latencies, errors = [], []
+    await asyncio.gather(*(
+        _connection(port, paths, random.Random(seed_value + i), start_at, start_at + duration, latencies, errors)
+        for i in range(connections)
+    ))
+    return latencies, len(errors), time.perf_counter() - start_at
+
+
+def load(port, paths, connections, duration, seed_value):
+    latencies, errors, wall = asyncio.run(_load(port, paths, connections, duration, seed_value))
+    if not latencies:
+        return {"requests": 0, "errors": errors}
+    return summarize(latencies, errors, wall)
+
+
+# -- driver -----------------------------------------------------------------
+
+def scenario_paths(rng, available_ids):
+    return {
+        "detail": [f"/api/property/{rng.choice(available_ids)}" for _ in range(1000)],
+        "list_filtered": ["/api/properties?" + urlencode({"filters": json.dumps(f)}) for f in FILTERS],
+    }
+
+
+def print_table(results):
+    print(f"  {'mode':<5} {'scenario':<14} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'requests':>9} {'errors':>7}")
+    for mode, rows in results.items():
+        for name, r in rows.items():
+            if not r["requests"]:
+                print(f"  {mode:<5} {name:<14} {'-':>9} {'-':>9} {'-':>9} {0:>9} {r['errors']:>7}")
+                continue
+            print(f"  {mode:<5} {name:<14} {r['throughput_rps']:>9.1f} {r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f} "
+                  f"{r['requests']:>9} {r['errors']:>7}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Threaded WSGI vs ASGI at high concurrency")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--properties", type=int, default=5000)
+    parser.add_argument("--connections", type=int, default=500, help="concurrent keep-alive connections")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per scenario and mode")
+    parser.add_argument("--db-latency-ms", type=float, default=5, help="added to every statement")
+    parser.add_argument("--pool-size", type=int, default=20, help="DB_POOL_SIZE for both modes")
+    parser.add_argument("--mode", choices=["wsgi", "asgi", "both"], default="both")
+    parser.add_argument("--scenarios", help="comma-separated subset to run")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.mode != "wsgi" and uvicorn is None:
+        parser.error("the asgi mode needs uvicorn (pip install uvicorn)")
+    rng = random.Random(args.seed)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    # The client gets its own interpreter so it does not compete for the server's GIL
+    client = ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn"))
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp, client:
+        overrides = {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'bench.db')}", "UPLOAD_FOLDER": tmp,
+            "LISTING_CACHE_SIZE": 0, "DB_POOL_SIZE": args.pool_size, "DB_MAX_OVERFLOW": 0,
+            "DB_POOL_TIMEOUT": 60,
+        }
+        app = create_app("bench", **overrides)
+        with app.app_context():
+            db.create_all()
+            seed(args.users, args.properties, rng)
+            available = [pid for pid, in db.session.query(Property.property_id).filter_by(status="Available")]
+        paths = scenario_paths(rng, available)
+        if args.scenarios:
+            paths = {name: p for name, p in paths.items() if name in args.scenarios.split(",")}
+
+        servers = {}
+        if args.mode in ("wsgi", "both"):
+            servers["wsgi"] = (app, lambda: serving(app))
+        if args.mode in ("asgi", "both"):
+            asgi_app = create_asgi_app("bench", **overrides)
+            servers["asgi"] = (asgi_app.app, lambda: serving_asgi(asgi_app))
+        for mode, (flask_app, serve) in servers.items():
+            add_round_trip_latency(flask_app, args.db_latency_ms / 1000)
+            with serve() as port:
+                results[mode] = {
+                    name: client.submit(load, port, scenario, args.connections, args.duration, args.seed).result()
+                    for name, scenario in paths.items()
+                }
+
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+    print(f"{args.properties:,} listings, {args.connections} connections, {args.duration:g}s per run, "
+          f"+{args.db_latency_ms:g} ms per statement, pool of {args.pool_size}")
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""Load benchmark for the hot HTTP endpoints.
+
+Seeds a throwaway SQLite file with ``--users`` owners and ``--properties``
+listings, then drives ``create_app()`` two ways:
+
+* ``client`` - sequential requests through Flask's test client (app cost
+  only, no sockets);
+* ``server`` - a real threaded WSGI server (werkzeug) on localhost, hit by
+  ``--concurrency`` threads over HTTP.
+
+Scenarios, in order (``create`` writes, so it runs last):
+
+* ``list``          GET  /api/properties
+* ``list_filtered`` GET  /api/properties?filters=... (rotating combinations)
+* ``myproperties``  GET  /api/myproperties (logged in)
+* ``login``         POST /auth/login
+* ``create``        POST /api/properties (form post, no images)
+
+For each one it reports p50/p95/p99 latency and throughput, and writes the
+numbers plus the git commit to a JSON file. ``--compare`` prints the change
+against an earlier file. The listing cache is on as in production;
+``--no-cache`` measures the uncached path.
+
+Usage:
+    python -m backend.benchmarks.bench_endpoints [--properties 20000] [--requests 500]
+        [--concurrency 8] [--mode both] [--out results.json] [--compare old.json]
+"""
+import argparse
+import contextlib
+import http.client
+import json
+import logging
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+from flask import current_app
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+from werkzeug.serving import make_server
+
+from backend.app import create_app, db
+from backend.models.users import Users
+from backend.models.properties import Property
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+PASSWORD = "bench-password"
+CITIES = ["Chennai", "Coimbatore", "Madurai", "Salem", "Trichy", "Erode", "Vellore", "Tirunelveli"]
+AREAS = ["Adyar", "Anna Nagar", "Gandhipuram", "Peelamedu", "KK Nagar", "Thillai Nagar"]
+HOUSE_TYPES = ["1HK", "1BHK", "2BHK", "3BHK", "4+ BHK"]
+PROPERTY_TYPES = ["House", "Flat", "PG", "Hostel"]
+FILTERS = [
+    {"cities": ["Chennai"]},
+    {"cities": ["Madurai", "Salem"], "minBudget": "5000", "maxBudget": "15000"},
+    {"bhk": ["2BHK", "3BHK"]},
+    {"propertyTypes": ["Flat"], "furnishing": ["Furnished"]},
+    {"districts": ["Coimbatore"], "pets": "Allowed"},
+]
+NEW_LISTING = {
+    "full_name": "Bench Owner", "mobile_number": "9999999999", "address": "1 Bench Road",
+    "city": "Chennai", "area": "Adyar", "district": "Chennai", "property_type": "Flat",
+    "house_type": "2BHK", "rent_price": "15000", "car_parking": "Available", "pets": "Allowed",
+    "facing": "East", "furnishing": "Furnished", "description": "Benchmark listing",
+}
+
+
+# -- data ----------------------------------------------------------------
+
+def seed(users, properties, rng):
+    # One hash for everyone: hashing is what the login scenario measures,
+    # not what seeding should spend its time on
+    password_hash = generate_password_hash(PASSWORD, current_app.config["PASSWORD_HASH_METHOD"])
+    db.session.execute(insert(Users), [dict(
+        full_name=f"Owner {i}", email=f"owner{i}@example.com", mobile_number=f"9{i:09d}",
+        password_hash=password_hash,
+    ) for i in range(users)])
+
+    rows = []
+    for i in range(properties):
+        city = rng.choice(CITIES)
+        rows.append(dict(
+            owner_id=rng.randint(1, users), full_name="Owner", mobile_number="9999999999",
+            address=f"{i} Main St", city=city, area=rng.choice(AREAS), district=city,
+            property_type=rng.choice(PROPERTY_TYPES), house_type=rng.choice(HOUSE_TYPES),
+            rent_price=rng.randrange(2000, 40000, 500),
+            car_parking=rng.choice(["Available", "NotAvailable"]),
+            pets=rng.choice(["Allowed", "Strictly Not Allowed"]),
+            facing="East", furnishing=rng.choice(["Furnished", "Unfurnished"]),
+            description="Spacious, well ventilated home close to schools and the bus stand.",
+            status="Available" if rng.random() < 0.9 else "Unavailable",
+            created_at=datetime.now(timezone.utc),
+        ))
+        if len(rows) == 5000:
+            db.session.execute(insert(Property), rows)
+            rows = []
+    if rows:
+        db.session.execute(insert(Property), rows)
+    db.session.commit()
+    db.session.execute(db.text("ANALYZE"))
+
+
+def scenarios(rng, users):
+    """``[(name, make_request)]``; ``make_request()`` -> (method, path, body, content_type)."""
+    def list_filtered():
+        return "GET", "/api/properties?" + urlencode({"filters": json.dumps(rng.choice(FILTERS))}), None, None
+
+    def login():
+        body = json.dumps({"identifier": f"owner{rng.randrange(users)}@example.com", "password": PASSWORD})
+        return "POST", "/auth/login", body, "application/json"
+
+    return [
+        ("list", lambda: ("GET", "/api/properties", None, None)),
+        ("list_filtered", list_filtered),
+        ("myproperties", lambda: ("GET", "/api/myproperties", None, None)),
+        ("login", login),
+        ("create", lambda: ("POST", "/api/properties", urlencode(NEW_LISTING),
+                            "application/x-www-form-urlencoded")),
+    ]
+
+
+# -- statistics ------------------------------------------------------------
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def summarize(latencies, errors, wall):
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "throughput_rps": round(len(latencies) / wall, 1),
+    }
+
+
+# -- drivers ---------------------------------------------------------------
+
+def run_client(app, make_request, count, warmup):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["user"] = {"user_id": 1}
+
+    def once():
+        method, path, body, content_type = make_request()
+        start = time.perf_counter()
+        response = client.open(path, method=method, data=body, content_type=content_type)
+        elapsed = time.perf_counter() - start
+        return elapsed, response.status_code >= 400
+
+    for _ in range(warmup):
+        once()
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    for _ in range(count):
+        elapsed, failed = once()
+        latencies.append(elapsed)
+        errors += failed
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+@contextlib.contextmanager
+def serving(app):
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.server_port
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+def http_request(port, method, path, body=None, content_type=None, cookie=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    headers = {}
+    if content_type:
+        headers["Content-Type"] = content_type
+    if cookie:
+        headers["Cookie"] = cookie
+    try:
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        return response
+    finally:
+        conn.close()
+
+
+def login_cookie(port):
+    response = http_request(port, "POST", "/auth/login",
+                            json.dumps({"identifier": "owner0@example.com", "password": PASSWORD}),
+                            "application/json")
+    return response.getheader("Set-Cookie", "").split(";", 1)[0]
+
+
+def run_server(port, cookie, make_request, count, warmup, concurrency):
+    def once(_):
+        method, path, body, content_type = make_request()
+        start = time.perf_counter()
+        try:
+            status = http_request(port, method, path, body, content_type, cookie).status
+        except OSError:
+            status = 599
+        return time.perf_counter() - start, status >= 400
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(once, range(warmup)))
+        started = time.perf_counter()
+        outcomes = list(pool.map(once, range(count)))
+        wall = time.perf_counter() - started
+    return summarize([t for t, _ in outcomes], sum(failed for _, failed in outcomes), wall)
+
+
+# -- results ---------------------------------------------------------------
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(__file__), check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results):
+    for mode, rows in results.items():
+        print(f"\n[{mode}]")
+        print(f"  {'scenario':<14} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>9} {'errors':>7}")
+        for name, r in rows.items():
+            print(f"  {name:<14} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+                  f"{r['throughput_rps']:>9.1f} {r['errors']:>7}")
+
+
+def print_comparison(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nChange vs {baseline_path} (commit {baseline['meta'].get('commit')}); negative latency is better")
+    for mode, rows in results.items():
+        for name, r in rows.items():
+            old = baseline["results"].get(mode, {}).get(name)
+            if not old:
+                continue
+            change = lambda key: (r[key] - old[key]) / old[key] * 100 if old[key] else 0.0  # noqa: E731
+            print(f"  {mode:<6} {name:<14} p50 {change('p50_ms'):+6.1f}%  p95 {change('p95_ms'):+6.1f}%  "
+                  f"p99 {change('p99_ms'):+6.1f}%  req/s {change('throughput_rps'):+6.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load benchmark for the hot HTTP endpoints")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--properties", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=500, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8, help="client threads in server mode")
+    parser.add_argument("--mode", choices=["client", "server", "both"], default="both")
+    parser.add_argument("--scenarios", help="comma-separated subset to run")
+    parser.add_argument("--no-cache", action="store_true", help="disable the listing response cache")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help=f"JSON results path (default: {RESULTS_DIR}/<time>-<commit>.json)")
+    parser.add_argument("--compare", help="earlier JSON results to compare against")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        overrides = {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'bench.db')}", "UPLOAD_FOLDER": tmp}
+        if args.no_cache:
+            overrides["LISTING_CACHE_SIZE"] = 0
+        app = create_app("bench", **overrides)
+
+        with app.app_context():
+            db.create_all()
+            seed(args.users, args.properties, rng)
+
+        selected = scenarios(rng, args.users)
+        if args.scenarios:
+            wanted = set(args.scenarios.split(","))
+            selected = [s for s in selected if s[0] in wanted]
+
+        results = {}
+        if args.mode in ("client", "both"):
+            results["client"] = {name: run_client(app, make, args.requests, args.warmup) for name, make in selected}
+        if args.mode in ("server", "both"):
+            with serving(app) as port:
+                cookie = login_cookie(port)
+                results["server"] = {
+                    name: run_server(port, cookie, make, args.requests, args.warmup, args.concurrency)
+                    for name, make in selected
+                }
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    out = args.out
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        out = os.path.join(RESULTS_DIR, f"{stamp}-{commit or 'nogit'}.json")
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{args.properties:,} listings, {args.users:,} users, {args.requests} requests per scenario")
+    print_table(results)
+    if args.compare:
+        print_comparison(results, args.compare)
+    print(f"\nResults written to {out}")
+
+
+if __name__ == "__main__":
+    main()
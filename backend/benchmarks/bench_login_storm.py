@@ -0,0 +1,146 @@
+"""Benchmark: listing latency while a login storm is in progress.
+
+Serves the app from a threaded WSGI server on localhost (as
+``bench_endpoints`` does, listing cache off) and measures filtered
+``GET /api/properties`` latency twice per mode: on its own, then while
+``--logins`` threads keep posting to ``/auth/login``. The two modes are:
+
+* ``inline`` - password hashes computed on the request thread (the old
+  behaviour, ``PASSWORD_HASH_WORKERS=0``);
+* ``pool``   - hashes sent to ``--workers`` low-priority processes behind
+  the ``PASSWORD_HASH_MAX_PENDING`` limit.
+
+Pooled logins over the limit get 503 + Retry-After; the storm threads
+count those and retry, as a client would.
+
+Usage:
+    python -m backend.benchmarks.bench_login_storm [--properties 20000] [--requests 300]
+        [--concurrency 4] [--logins 8] [--workers 1] [--method scrypt]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from backend.app import create_app, db
+from backend.benchmarks.bench_endpoints import FILTERS, PASSWORD, http_request, seed, serving, summarize
+
+
+def listing_load(port, rng, count, concurrency):
+    def once(_):
+        path = "/api/properties?" + urlencode({"filters": json.dumps(rng.choice(FILTERS))})
+        start = time.perf_counter()
+        try:
+            failed = http_request(port, "GET", path).status >= 400
+        except OSError:
+            failed = True
+        return time.perf_counter() - start, failed
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        started = time.perf_counter()
+        outcomes = list(pool.map(once, range(count)))
+        wall = time.perf_counter() - started
+    return summarize([t for t, _ in outcomes], sum(f for _, f in outcomes), wall)
+
+
+def login_storm(port, users, threads, stop):
+    """Start ``threads`` login loops; returns a dict they fill in."""
+    counts = {"ok": 0, "busy": 0, "failed": 0}
+    lock = threading.Lock()
+
+    def loop(seed_value):
+        rng = random.Random(seed_value)
+        while not stop.is_set():
+            body = json.dumps({"identifier": f"owner{rng.randrange(users)}@example.com", "password": PASSWORD})
+            try:
+                status = http_request(port, "POST", "/auth/login", body, "application/json").status
+            except OSError:
+                status = 599
+            key = "ok" if status == 200 else "busy" if status == 503 else "failed"
+            with lock:
+                counts[key] += 1
+            if status == 503:
+                time.sleep(0.05)
+
+    workers = [threading.Thread(target=loop, args=(i,), daemon=True) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    counts["threads"] = workers
+    return counts
+
+
+def run_mode(name, database_url, tmp, args, overrides):
+    app = create_app("bench", SQLALCHEMY_DATABASE_URI=database_url, UPLOAD_FOLDER=tmp, LISTING_CACHE_SIZE=0,
+                     PASSWORD_HASH_METHOD=args.method, **overrides)
+    rng = random.Random(args.seed)
+    rows = {}
+    with serving(app) as port:
+        listing_load(port, rng, 20, args.concurrency)  # warm up
+        rows["quiet"] = listing_load(port, rng, args.requests, args.concurrency)
+
+        stop = threading.Event()
+        counts = login_storm(port, args.users, args.logins, stop)
+        time.sleep(0.5)  # let the storm build up
+        started = time.perf_counter()
+        rows["storm"] = listing_load(port, rng, args.requests, args.concurrency)
+        elapsed = time.perf_counter() - started
+        stop.set()
+        for worker in counts.pop("threads"):
+            worker.join()
+        rows["storm"].update(logins_per_s=round(counts["ok"] / elapsed, 1), login_503=counts["busy"],
+                             login_errors=counts["failed"])
+
+    app.extensions["password_hasher"].shutdown()
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Listing latency during a login storm")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--properties", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=300, help="listing requests per phase")
+    parser.add_argument("--concurrency", type=int, default=4, help="listing client threads")
+    parser.add_argument("--logins", type=int, default=8, help="login storm threads")
+    parser.add_argument("--workers", type=int, default=1, help="hash processes in pool mode")
+    parser.add_argument("--method", default="scrypt", help="PASSWORD_HASH_METHOD")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    modes = {
+        "inline": {"PASSWORD_HASH_WORKERS": 0},
+        "pool": {"PASSWORD_HASH_WORKERS": args.workers},
+    }
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        app = create_app("bench", SQLALCHEMY_DATABASE_URI=database_url, UPLOAD_FOLDER=tmp,
+                         PASSWORD_HASH_METHOD=args.method)
+        with app.app_context():
+            db.create_all()
+            seed(args.users, args.properties, random.Random(args.seed))
+            db.engine.dispose()
+        for name, overrides in modes.items():
+            results[name] = run_mode(name, database_url, tmp, args, overrides)
+
+    print(f"{args.properties:,} listings, {args.requests} filtered listing requests x {args.concurrency} threads, "
+          f"{args.logins} login threads, {os.cpu_count()} CPU(s), {args.method}")
+    print(f"  {'mode':<7} {'phase':<6} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>7} {'logins/s':>9} {'503s':>5}")
+    for name, rows in results.items():
+        for phase, r in rows.items():
+            print(f"  {name:<7} {phase:<6} {r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['throughput_rps']:>7.1f} "
+                  f"{r.get('logins_per_s', ''):>9} {r.get('login_503', ''):>5}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Benchmark: "nearby" search cost as the catalog grows.
+
+Seeds an in-memory SQLite database with listings spread over Tamil Nadu
+and times random 3 km queries two ways:
+
+* ``indexed`` - ``nearby_listings`` (geohash range scans + bounding box +
+  haversine);
+* ``scan``    - every located listing's coordinates fetched and ranked in
+  Python, i.e. what the browser had to do before.
+
+Each size is added on top of the previous one, so the table keeps growing.
+The indexed cost follows the number of listings in the cells around the
+point, not the catalog size.
+
+Usage: python -m backend.benchmarks.bench_nearby [max_rows] [queries]
+"""
+import random
+import statistics
+import sys
+import time
+
+from sqlalchemy import insert
+
+from backend.app import create_app, db
+from backend.models.users import Users
+from backend.models.properties import Property
+from backend.utils.geo import haversine_km, location_fields, nearby_listings
+
+# Rough bounding box of Tamil Nadu
+LAT_RANGE = (8.1, 13.5)
+LNG_RANGE = (76.3, 80.3)
+RADIUS_KM = 3.0
+FIELDS = ("property_id", "rent_price")
+
+
+def seed(rng, start, count):
+    rows = []
+    for i in range(start, start + count):
+        rows.append(dict(
+            owner_id=1, full_name="Owner", mobile_number="9999999999", address=f"{i} Main St",
+            city="Chennai", area="Adyar", district="Chennai", property_type="Flat", house_type="2BHK",
+            rent_price=10000, car_parking="Available", pets="Allowed", facing="East", furnishing="Furnished",
+            status="Available",
+            **location_fields({"latitude": rng.uniform(*LAT_RANGE), "longitude": rng.uniform(*LNG_RANGE)}),
+        ))
+    for offset in range(0, len(rows), 5000):
+        db.session.execute(insert(Property), rows[offset:offset + 5000])
+    db.session.commit()
+
+
+def scan(lat, lng):
+    rows = Property.query.filter_by(status="Available").filter(Property.latitude.isnot(None)).with_entities(
+        Property.property_id, Property.latitude, Property.longitude)
+    hits = [(haversine_km(lat, lng, r.latitude, r.longitude), r.property_id) for r in rows]
+    return sorted(h for h in hits if h[0] <= RADIUS_KM)[:20]
+
+
+def time_queries(fn, points):
+    timings = []
+    for lat, lng in points:
+        start = time.perf_counter()
+        fn(lat, lng)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main(max_rows=200000, queries=50):
+    app = create_app("bench", SQLALCHEMY_DATABASE_URI="sqlite://")
+    rng = random.Random(42)
+    sizes = [s for s in (12500, 25000, 50000, 100000, 200000, 400000) if s <= max_rows]
+
+    with app.app_context():
+        db.create_all()
+        db.session.add(Users(full_name="Owner", email="owner@example.com", mobile_number="9999999999"))
+        db.session.commit()
+
+        print(f"{RADIUS_KM:g} km radius, median of {queries} queries")
+        print(f"  {'rows':>8} {'indexed ms':>11} {'scan ms':>9} {'speedup':>8}")
+        seeded = 0
+        for size in sizes:
+            seed(rng, seeded, size - seeded)
+            seeded = size
+            db.session.execute(db.text("ANALYZE"))
+            points = [(rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE)) for _ in range(queries)]
+
+            indexed = time_queries(lambda lat, lng: nearby_listings(lat, lng, RADIUS_KM, None, FIELDS, 20), points)
+            scanned = time_queries(scan, points[:max(3, queries // 10)])
+            print(f"  {size:>8,} {indexed:>11.2f} {scanned:>9.1f} {scanned / indexed:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
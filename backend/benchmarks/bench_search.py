@@ -0,0 +1,61 @@
+"""Micro-benchmark: SearchIndex query latency.
+
+Indexes synthetic listings in memory (no database) and reports the median
+and p95 latency of a few query shapes, fetching the top 25 as the search
+endpoint does without filters.
+
+Usage: python -m backend.benchmarks.bench_search [listings]
+"""
+import random
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+from backend.utils.search import SearchIndex
+
+AREAS = ["Adyar", "Anna Nagar", "Velachery", "Tambaram", "Mylapore", "Gandhipuram", "Peelamedu",
+         "Saibaba Colony", "KK Nagar", "Thillai Nagar", "Besant Nagar", "Porur", "Guindy"]
+CITIES = ["Chennai", "Coimbatore", "Madurai", "Trichy", "Salem", "Erode", "Vellore"]
+# Descriptions draw from a Zipf-like vocabulary: a few very common words
+# ("spacious", "near") and a long tail, as in real listing text.
+BASE_WORDS = ("spacious airy quiet gated community near school hospital metro bus stand market park "
+              "temple beach lake view balcony modular kitchen covered parking lift security power backup "
+              "borewell corporation water east facing vastu compliant newly painted").split()
+_tail = random.Random(2)
+WORDS = BASE_WORDS + ["".join(_tail.choices("abcdefghijklmnopqrstuvwxyz", k=7)) for _ in range(400)]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(WORDS))]
+QUERIES = ["chennai", "adyar metro", "beach view balcony", "gand", "quiet gated community near park", "vel"]
+
+
+def build(n):
+    rng = random.Random(1)
+    index = SearchIndex()
+    for i in range(n):
+        city = rng.choice(CITIES)
+        index.add(SimpleNamespace(
+            property_id=i, area=rng.choice(AREAS), city=city, district=city, full_name=f"Owner {i % 997}",
+            address=f"{rng.randint(1, 200)} {rng.choice(AREAS)} Main Road",
+            description=" ".join(rng.choices(WORDS, WEIGHTS, k=25)),
+        ))
+    return index
+
+
+def main(n=100000, repeats=20):
+    start = time.perf_counter()
+    index = build(n)
+    print(f"indexed {n} listings in {time.perf_counter() - start:.1f}s")
+
+    for query in QUERIES:
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            hits = index.search(query, limit=25)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        print(f"  {query!r:<36} {len(hits):>3} hits  p50 {statistics.median(timings):7.2f} ms  p95 {p95:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
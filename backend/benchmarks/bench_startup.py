@@ -0,0 +1,77 @@
+"""Benchmark: cold start of one worker.
+
+Each run is a fresh interpreter (as a new Gunicorn worker would be) that
+times three steps against an existing SQLite file:
+
+* ``import``        - ``from backend.app import create_app``;
+* ``create_app``    - building the app with the bench profile;
+* ``first_request`` - ``GET /api/properties`` through the test client,
+  where anything deferred out of startup is paid instead.
+
+The schema is created once up front, as the migrations command would have
+done before a deploy. Reports the median and worst run of each step.
+
+Usage: python -m backend.benchmarks.bench_startup [--runs 20] [--database-url URL]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from backend.app import create_app, db
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+STEPS = ("import", "create_app", "first_request")
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from backend.app import create_app
+imported = time.perf_counter()
+app = create_app("bench", SQLALCHEMY_DATABASE_URI=sys.argv[1], UPLOAD_FOLDER=sys.argv[2])
+created = time.perf_counter()
+status = app.test_client().get("/api/properties").status_code
+served = time.perf_counter()
+print(json.dumps({"import": imported - start, "create_app": created - imported,
+                  "first_request": served - created, "status": status}))
+"""
+
+
+def run_once(database_url, upload_folder):
+    out = subprocess.run([sys.executable, "-c", CHILD, database_url, upload_folder], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    timings = json.loads(out.stdout.strip().splitlines()[-1])
+    if timings.pop("status") != 200:
+        raise RuntimeError("first request failed; is the schema in place?")
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import + create_app() latency of a fresh worker")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--database-url", help="existing database to start against (default: temp SQLite)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'startup.db')}"
+        app = create_app("bench", SQLALCHEMY_DATABASE_URI=database_url, UPLOAD_FOLDER=tmp)
+        with app.app_context():
+            db.create_all()
+            db.engine.dispose()
+
+        run_once(database_url, tmp)  # warm the bytecode cache
+        runs = [run_once(database_url, tmp) for _ in range(args.runs)]
+
+    print(f"{args.runs} fresh interpreters")
+    print(f"  {'step':<14} {'median ms':>10} {'max ms':>8}")
+    for step in STEPS + ("total",):
+        values = [sum(r.values()) if step == "total" else r[step] for r in runs]
+        print(f"  {step:<14} {statistics.median(values) * 1000:>10.1f} {max(values) * 1000:>8.1f}")
+    return runs
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,51 @@
+import random
+import time
+
+from flask import current_app, g, has_request_context, session
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+# Flask session key: reads go to the primary until this timestamp
+STICKY_SESSION_KEY = "_read_primary_until"
+
+
+class RoutingSession(Session):
+    """Session that sends reads in ``replica_reads`` views to a replica.
+
+    Everything else - flushes, INSERT/UPDATE/DELETE statements and every
+    query outside a marked view - uses the primary, so an unmarked route is
+    always safe. Writing also flags the request so that the writer's next
+    reads stick to the primary (see utils/replicas.py).
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing or isinstance(clause, UpdateBase):
+                if has_request_context():
+                    g.db_wrote = True
+            else:
+                replica = self._request_replica()
+                if replica is not None:
+                    return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _request_replica(self):
+        """The replica engine for this request, or None to use the primary."""
+        if not has_request_context() or not g.get("replica_reads"):
+            return None
+        if "db_replica" not in g:
+            replicas = list(current_app.extensions.get("replicas", {}).values())
+            sticky = session.get(STICKY_SESSION_KEY, 0) > time.time()
+            # One replica per request, so its reads share a snapshot
+            g.db_replica = random.choice(replicas) if replicas and not sticky else None
+        return g.db_replica
+
 
 # Create SQLAlchemy instance
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+
+def app_engines():
+    """Every engine of the current app by bind key: ``db.engines`` plus replicas."""
+    return {**db.engines, **current_app.extensions.get("replicas", {})}
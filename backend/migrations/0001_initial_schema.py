@@ -0,0 +1,51 @@
+"""Initial schema: users and listings, as the app first created them.
+
+Matches what ``db.create_all()`` built at startup before migrations
+existed, photos still in the comma-separated ``properties.images``
+column. Later migrations bring it up to date. Tables that already exist
+are left alone, so this also adopts databases created that way.
+"""
+from sqlalchemy import (
+    Column, DateTime, Enum, ForeignKey, Index, Integer, MetaData, Numeric, String, Table, Text,
+)
+
+metadata = MetaData()
+
+Table(
+    "users", metadata,
+    Column("user_id", Integer, primary_key=True, autoincrement=True),
+    Column("full_name", String(100), nullable=False),
+    Column("email", String(120), nullable=False),
+    Column("password_hash", String(200)),
+    Column("mobile_number", String(15), nullable=False),
+    Column("profile_image", String(200)),
+    Column("created_at", DateTime),
+    Index("ix_users_email", "email", unique=True),
+)
+
+Table(
+    "properties", metadata,
+    Column("property_id", Integer, primary_key=True, autoincrement=True),
+    Column("owner_id", Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False),
+    Column("full_name", String(100), nullable=False),
+    Column("mobile_number", String(15), nullable=False),
+    Column("address", Text, nullable=False),
+    Column("city", String(100), nullable=False),
+    Column("area", String(100), nullable=False),
+    Column("district", String(100), nullable=False),
+    Column("property_type", String(50), nullable=False),
+    Column("house_type", String(50), nullable=False),
+    Column("rent_price", Numeric(10, 2), nullable=False),
+    Column("car_parking", Enum("Any", "Available", "NotAvailable"), nullable=False),
+    Column("pets", Enum("Any", "Allowed", "Strictly Not Allowed"), nullable=False),
+    Column("facing", String(50), nullable=False),
+    Column("furnishing", String(50), nullable=False),
+    Column("description", Text),
+    Column("images", Text),
+    Column("status", String(20)),
+    Column("created_at", DateTime),
+)
+
+
+def upgrade(connection):
+    metadata.create_all(connection)
@@ -0,0 +1,41 @@
+"""Change feed: ``updated_at``/``change_seq`` on listings and a tombstone table.
+
+Existing listings get ``updated_at = created_at`` and ``change_seq = 0``:
+they predate every token, so clients pick them up with a full sync.
+Columns and tables that already exist (databases built with
+``db.create_all()``) are left alone.
+"""
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, MetaData, Table, inspect, text
+
+metadata = MetaData()
+
+Table(
+    "property_tombstones", metadata,
+    Column("property_id", Integer, primary_key=True, autoincrement=False),
+    Column("owner_id", Integer, nullable=False),
+    Column("change_seq", BigInteger, nullable=False),
+    Column("deleted_at", DateTime, nullable=False),
+    Index("ix_property_tombstones_change_seq", "change_seq", "property_id"),
+)
+
+NEW_COLUMNS = (
+    ("updated_at", DateTime(), ""),
+    ("change_seq", BigInteger(), " NOT NULL DEFAULT 0"),
+)
+
+
+def upgrade(connection):
+    inspector = inspect(connection)
+    existing = {c["name"] for c in inspector.get_columns("properties")}
+    for name, type_, suffix in NEW_COLUMNS:
+        if name not in existing:
+            column_type = type_.compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE properties ADD COLUMN {name} {column_type}{suffix}"))
+    if "updated_at" not in existing:
+        connection.execute(text("UPDATE properties SET updated_at = created_at"))
+
+    indexes = {i["name"] for i in inspector.get_indexes("properties")}
+    if "ix_properties_change_seq" not in indexes:
+        connection.execute(text("CREATE INDEX ix_properties_change_seq ON properties (change_seq, property_id)"))
+
+    metadata.create_all(connection)
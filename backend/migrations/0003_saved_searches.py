@@ -0,0 +1,36 @@
+"""Saved searches and their match inbox."""
+from sqlalchemy import (
+    Boolean, Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, Text, UniqueConstraint,
+)
+
+metadata = MetaData()
+
+# Referenced tables, for the foreign keys only (created by 0001)
+Table("users", metadata, Column("user_id", Integer, primary_key=True))
+Table("properties", metadata, Column("property_id", Integer, primary_key=True))
+
+saved_searches = Table(
+    "saved_searches", metadata,
+    Column("search_id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False),
+    Column("name", String(100)),
+    Column("filters", Text, nullable=False),
+    Column("created_at", DateTime),
+    Index("ix_saved_searches_user_id", "user_id", "search_id"),
+)
+
+saved_search_matches = Table(
+    "saved_search_matches", metadata,
+    Column("match_id", Integer, primary_key=True, autoincrement=True),
+    Column("search_id", Integer, ForeignKey("saved_searches.search_id", ondelete="CASCADE"), nullable=False),
+    Column("user_id", Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False),
+    Column("property_id", Integer, ForeignKey("properties.property_id", ondelete="CASCADE"), nullable=False),
+    Column("seen", Boolean, nullable=False),
+    Column("matched_at", DateTime),
+    UniqueConstraint("search_id", "property_id", name="uq_saved_search_matches_search_property"),
+    Index("ix_saved_search_matches_user_id", "user_id", "match_id"),
+)
+
+
+def upgrade(connection):
+    metadata.create_all(connection, tables=[saved_searches, saved_search_matches])
@@ -0,0 +1,43 @@
+"""Cold table for archived listings (see utils/archive.py)."""
+from sqlalchemy import (
+    BigInteger, Column, DateTime, Float, ForeignKey, Index, Integer, MetaData, Numeric, String, Table, Text,
+)
+
+metadata = MetaData()
+
+# Referenced table, for the foreign key only (created by 0001)
+Table("users", metadata, Column("user_id", Integer, primary_key=True))
+
+properties_archive = Table(
+    "properties_archive", metadata,
+    Column("property_id", Integer, primary_key=True, autoincrement=False),
+    Column("owner_id", Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False),
+    Column("full_name", String(100), nullable=False),
+    Column("mobile_number", String(15), nullable=False),
+    Column("address", Text, nullable=False),
+    Column("city", String(100), nullable=False),
+    Column("area", String(100), nullable=False),
+    Column("district", String(100), nullable=False),
+    Column("property_type", String(50), nullable=False),
+    Column("house_type", String(50), nullable=False),
+    Column("rent_price", Numeric(10, 2), nullable=False),
+    Column("car_parking", String(20), nullable=False),
+    Column("pets", String(20), nullable=False),
+    Column("facing", String(50), nullable=False),
+    Column("furnishing", String(50), nullable=False),
+    Column("description", Text),
+    Column("status", String(20)),
+    Column("latitude", Float),
+    Column("longitude", Float),
+    Column("geohash", String(12)),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+    Column("change_seq", BigInteger, nullable=False),
+    Column("photos", Text),
+    Column("archived_at", DateTime, nullable=False),
+    Index("ix_properties_archive_owner_id", "owner_id", "property_id"),
+)
+
+
+def upgrade(connection):
+    metadata.create_all(connection, tables=[properties_archive])
@@ -0,0 +1,26 @@
+"""Nearby search: ``latitude``/``longitude``/``geohash`` on listings and their index.
+
+Existing listings get no location and so never show up as nearby until
+their owner sets one. Columns and the index that already exist (databases
+built with ``db.create_all()``) are left alone.
+"""
+from sqlalchemy import Float, String, inspect, text
+
+NEW_COLUMNS = (
+    ("latitude", Float()),
+    ("longitude", Float()),
+    ("geohash", String(12)),
+)
+
+
+def upgrade(connection):
+    inspector = inspect(connection)
+    existing = {c["name"] for c in inspector.get_columns("properties")}
+    for name, type_ in NEW_COLUMNS:
+        if name not in existing:
+            column_type = type_.compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE properties ADD COLUMN {name} {column_type}"))
+
+    indexes = {i["name"] for i in inspector.get_indexes("properties")}
+    if "ix_properties_status_geohash" not in indexes:
+        connection.execute(text("CREATE INDEX ix_properties_status_geohash ON properties (status, geohash)"))
@@ -0,0 +1,23 @@
+"""Composite listing indexes: status filters, keyset paging and the owner dashboard.
+
+Indexes that already exist (databases built with ``db.create_all()``)
+are left alone.
+"""
+from sqlalchemy import inspect, text
+
+INDEXES = (
+    ("ix_properties_status_id", "status, property_id"),
+    ("ix_properties_status_city_rent", "status, city, rent_price"),
+    ("ix_properties_status_district_city", "status, district, city"),
+    ("ix_properties_status_area", "status, area"),
+    ("ix_properties_status_house_rent", "status, house_type, rent_price"),
+    ("ix_properties_status_type_rent", "status, property_type, rent_price"),
+    ("ix_properties_owner_id", "owner_id, property_id"),
+)
+
+
+def upgrade(connection):
+    existing = {i["name"] for i in inspect(connection).get_indexes("properties")}
+    for name, columns in INDEXES:
+        if name not in existing:
+            connection.execute(text(f"CREATE INDEX {name} ON properties ({columns})"))
@@ -0,0 +1,15 @@
+"""Per-table change counters behind ETag / Last-Modified (models/table_versions.py)."""
+from sqlalchemy import BigInteger, Column, DateTime, MetaData, String, Table
+
+metadata = MetaData()
+
+table_versions = Table(
+    "table_versions", metadata,
+    Column("table_name", String(50), primary_key=True),
+    Column("version", BigInteger, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+
+def upgrade(connection):
+    metadata.create_all(connection)
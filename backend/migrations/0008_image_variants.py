@@ -0,0 +1,22 @@
+"""Resized copies of uploaded photos, built by the image pipeline (utils/images.py)."""
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table, UniqueConstraint
+
+metadata = MetaData()
+
+image_variants = Table(
+    "image_variants", metadata,
+    Column("variant_id", Integer, primary_key=True, autoincrement=True),
+    Column("source", String(255), nullable=False),
+    Column("variant", String(20), nullable=False),
+    Column("filename", String(255), nullable=False),
+    Column("width", Integer, nullable=False),
+    Column("height", Integer, nullable=False),
+    Column("format", String(10), nullable=False),
+    Column("created_at", DateTime),
+    UniqueConstraint("source", "variant", name="uq_image_variants_source_variant"),
+    Index("ix_image_variants_source", "source"),
+)
+
+
+def upgrade(connection):
+    metadata.create_all(connection)
@@ -0,0 +1,32 @@
+"""Listing photos as rows, replacing the comma-separated ``properties.images``.
+
+Only creates the table. ``0010_drop_legacy_images`` moves the old column's
+contents over; to record each photo's dimensions as well, stop here
+(``--target 0009_property_images``) and run
+``python -m backend.scripts.backfill_property_images`` first.
+"""
+from sqlalchemy import (
+    Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, UniqueConstraint,
+)
+
+metadata = MetaData()
+
+# Referenced table, for the foreign key only (created by 0001)
+Table("properties", metadata, Column("property_id", Integer, primary_key=True))
+
+property_images = Table(
+    "property_images", metadata,
+    Column("image_id", Integer, primary_key=True, autoincrement=True),
+    Column("property_id", Integer, ForeignKey("properties.property_id", ondelete="CASCADE"), nullable=False),
+    Column("ordinal", Integer, nullable=False),
+    Column("storage_key", String(255), nullable=False),
+    Column("width", Integer),
+    Column("height", Integer),
+    Column("created_at", DateTime),
+    UniqueConstraint("property_id", "ordinal", name="uq_property_images_property_ordinal"),
+    Index("ix_property_images_storage_key", "storage_key"),
+)
+
+
+def upgrade(connection):
+    metadata.create_all(connection, tables=[property_images])
@@ -0,0 +1,48 @@
+"""Copy ``properties.images`` into ``property_images``, then drop the column.
+
+Each comma-separated name becomes one row, in its original order,
+without dimensions. Listings that already have rows (from the backfill
+script) are skipped. Databases without the column are left alone.
+"""
+from sqlalchemy import Column, Integer, MetaData, String, Table, inspect, text
+
+BATCH_SIZE = 1000
+
+metadata = MetaData()
+
+property_images = Table(
+    "property_images", metadata,
+    Column("image_id", Integer, primary_key=True),
+    Column("property_id", Integer, nullable=False),
+    Column("ordinal", Integer, nullable=False),
+    Column("storage_key", String(255), nullable=False),
+)
+
+
+def upgrade(connection):
+    if "images" not in {c["name"] for c in inspect(connection).get_columns("properties")}:
+        return
+
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            text(
+                "SELECT p.property_id, p.images FROM properties p"
+                " WHERE p.property_id > :last_id AND p.images IS NOT NULL AND p.images <> ''"
+                " AND NOT EXISTS (SELECT 1 FROM property_images i WHERE i.property_id = p.property_id)"
+                " ORDER BY p.property_id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].property_id
+        new_rows = [
+            {"property_id": row.property_id, "ordinal": i, "storage_key": name}
+            for row in rows
+            for i, name in enumerate(dict.fromkeys(name for name in row.images.split(",") if name))
+        ]
+        if new_rows:
+            connection.execute(property_images.insert(), new_rows)
+
+    connection.execute(text("ALTER TABLE properties DROP COLUMN images"))
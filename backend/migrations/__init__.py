@@ -0,0 +1,65 @@
+"""Versioned schema migrations.
+
+Every ``NNNN_description.py`` module in this package defines
+``upgrade(connection)``. Applied versions are recorded in
+``schema_migrations``, so :func:`upgrade` only runs the ones a database has
+not seen yet, each in its own transaction. A migration describes the
+schema as it was at that point (its own ``Table`` objects, not the models),
+so replaying the history on an empty database always gives the same result.
+
+Run them with ``python -m backend.scripts.migrate``; the app never creates
+or alters tables itself.
+"""
+import importlib
+import pkgutil
+import re
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, inspect, select
+
+_MODULE_RE = re.compile(r"^\d{4}_\w+$")
+
+schema_migrations = Table(
+    "schema_migrations", MetaData(),
+    Column("version", String(64), primary_key=True),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def available():
+    """Migration module names, oldest first."""
+    return sorted(m.name for m in pkgutil.iter_modules(__path__) if _MODULE_RE.match(m.name))
+
+
+def applied(connection):
+    """Versions already applied to the database behind ``connection``."""
+    if not inspect(connection).has_table(schema_migrations.name):
+        return set()
+    return set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+
+def pending(engine):
+    with engine.connect() as connection:
+        done = applied(connection)
+    return [name for name in available() if name not in done]
+
+
+def upgrade(engine, target=None):
+    """Apply pending migrations up to and including ``target``; returns their names."""
+    names = available()
+    if target is not None and target not in names:
+        raise ValueError(f"Unknown migration {target!r}")
+    with engine.begin() as connection:
+        schema_migrations.create(connection, checkfirst=True)
+
+    ran = []
+    for name in pending(engine):
+        if target is not None and name > target:
+            break
+        module = importlib.import_module(f"{__name__}.{name}")
+        with engine.begin() as connection:
+            module.upgrade(connection)
+            connection.execute(schema_migrations.insert().values(
+                version=name, applied_at=datetime.now(timezone.utc)))
+        ran.append(name)
+    return ran
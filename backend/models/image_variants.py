@@ -0,0 +1,24 @@
+from ..db import db
+from datetime import datetime, timezone
+
+
+class ImageVariant(db.Model):
+    """A resized, metadata-free copy of an uploaded listing photo."""
+    __tablename__ = "image_variants"
+    __table_args__ = (
+        db.UniqueConstraint("source", "variant", name="uq_image_variants_source_variant"),
+        {'extend_existing': True},
+    )
+
+    variant_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    source = db.Column(db.String(255), nullable=False, index=True)  # original name in static/uploads
+    variant = db.Column(db.String(20), nullable=False)  # thumb / medium / full
+    filename = db.Column(db.String(255), nullable=False)  # relative to static/uploads
+    width = db.Column(db.Integer, nullable=False)
+    height = db.Column(db.Integer, nullable=False)
+    format = db.Column(db.String(10), nullable=False)  # webp or jpeg
+
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f"<ImageVariant {self.source} {self.variant} {self.width}x{self.height}>"
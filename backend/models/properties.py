@@ -1,10 +1,27 @@
 from ..db import db
 from datetime import datetime, timezone
 
+from .property_images import PropertyImage  # noqa: F401 - registers the mapper
+
 
 class Property(db.Model):
     __tablename__ = "properties"
-    __table_args__ = {'extend_existing': True}
+    # Every listing query filters on status and pages by property_id desc;
+    # the owner dashboard pages by owner_id; "nearby" scans geohash ranges;
+    # the change feed reads in change_seq order.
+    # Keep this set small: each index is paid for on every insert/update.
+    __table_args__ = (
+        db.Index("ix_properties_status_id", "status", "property_id"),
+        db.Index("ix_properties_status_city_rent", "status", "city", "rent_price"),
+        db.Index("ix_properties_status_district_city", "status", "district", "city"),
+        db.Index("ix_properties_status_area", "status", "area"),
+        db.Index("ix_properties_status_house_rent", "status", "house_type", "rent_price"),
+        db.Index("ix_properties_status_type_rent", "status", "property_type", "rent_price"),
+        db.Index("ix_properties_owner_id", "owner_id", "property_id"),
+        db.Index("ix_properties_status_geohash", "status", "geohash"),
+        db.Index("ix_properties_change_seq", "change_seq", "property_id"),
+        {'extend_existing': True},
+    )
 
     property_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     owner_id = db.Column(db.Integer, db.ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
@@ -23,12 +40,26 @@ class Property(db.Model):
     facing = db.Column(db.String(50), nullable=False)
     furnishing = db.Column(db.String(50), nullable=False)
     description = db.Column(db.Text)
-    images = db.Column(db.Text)  # filenames or URLs
     status = db.Column(db.String(20), default="Available")  # Available or Unavailable
+    latitude = db.Column(db.Float)  # optional; set together with longitude
+    longitude = db.Column(db.Float)
+    geohash = db.Column(db.String(12))  # of latitude/longitude, for "nearby" range scans
 
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc),
+                           onupdate=lambda: datetime.now(timezone.utc))
+    # properties version of the last write to this row (utils/changes.py)
+    change_seq = db.Column(db.BigInteger, nullable=False, default=0)
 
     owner = db.relationship("Users", back_populates="properties")
+    # Replaces the old comma-joined ``images`` column; listing pages load it
+    # in one batch (see utils.serializers.load_photos), never per row.
+    photos = db.relationship(
+        "PropertyImage",
+        back_populates="property",
+        order_by="PropertyImage.ordinal",
+        cascade="all, delete-orphan",
+    )
 
     def __repr__(self):
         return f"<Property {self.property_id} - {self.full_name}>"
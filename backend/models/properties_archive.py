@@ -0,0 +1,48 @@
+from ..db import db
+from datetime import datetime, timezone
+
+
+class PropertyArchive(db.Model):
+    """A listing moved out of ``properties`` by the archive job (utils/archive.py).
+
+    Same columns as Property, with its photos kept as JSON in ``photos``
+    (``[{"storage_key", "width", "height"}]`` in display order). Rows keep
+    their ``property_id`` and move back when the owner makes the listing
+    available again. Only the owner dashboard reads this table.
+    """
+    __tablename__ = "properties_archive"
+    __table_args__ = (
+        db.Index("ix_properties_archive_owner_id", "owner_id", "property_id"),
+        {'extend_existing': True},
+    )
+
+    property_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    owner_id = db.Column(db.Integer, db.ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+
+    full_name = db.Column(db.String(100), nullable=False)
+    mobile_number = db.Column(db.String(15), nullable=False)
+    address = db.Column(db.Text, nullable=False)
+    city = db.Column(db.String(100), nullable=False)
+    area = db.Column(db.String(100), nullable=False)
+    district = db.Column(db.String(100), nullable=False)
+    property_type = db.Column(db.String(50), nullable=False)
+    house_type = db.Column(db.String(50), nullable=False)
+    rent_price = db.Column(db.Numeric(10, 2), nullable=False)
+    car_parking = db.Column(db.String(20), nullable=False)
+    pets = db.Column(db.String(20), nullable=False)
+    facing = db.Column(db.String(50), nullable=False)
+    furnishing = db.Column(db.String(50), nullable=False)
+    description = db.Column(db.Text)
+    status = db.Column(db.String(20))
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    geohash = db.Column(db.String(12))
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    change_seq = db.Column(db.BigInteger, nullable=False, default=0)
+
+    photos = db.Column(db.Text)
+    archived_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f"<PropertyArchive {self.property_id}>"
@@ -0,0 +1,33 @@
+from ..db import db
+from datetime import datetime, timezone
+
+from .image_variants import ImageVariant  # noqa: F401 - target of PropertyImage.variants
+
+
+class PropertyImage(db.Model):
+    """One photo of a listing, in display order."""
+    __tablename__ = "property_images"
+    __table_args__ = (
+        db.UniqueConstraint("property_id", "ordinal", name="uq_property_images_property_ordinal"),
+        {'extend_existing': True},
+    )
+
+    image_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    property_id = db.Column(db.Integer, db.ForeignKey("properties.property_id", ondelete="CASCADE"), nullable=False)
+    ordinal = db.Column(db.Integer, nullable=False)  # 0 = cover photo
+    storage_key = db.Column(db.String(255), nullable=False, index=True)  # name in static/uploads
+    width = db.Column(db.Integer)  # filled in once the image pipeline has read the file
+    height = db.Column(db.Integer)
+
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    property = db.relationship("Property", back_populates="photos")
+    # Variants are keyed by content hash, so listings sharing a photo share them
+    variants = db.relationship(
+        "ImageVariant",
+        primaryjoin="foreign(ImageVariant.source) == PropertyImage.storage_key",
+        viewonly=True,
+    )
+
+    def __repr__(self):
+        return f"<PropertyImage {self.property_id}#{self.ordinal} {self.storage_key}>"
@@ -0,0 +1,23 @@
+from ..db import db
+from datetime import datetime, timezone
+
+
+class PropertyTombstone(db.Model):
+    """What is left of a deleted listing, so the change feed can report it.
+
+    ``change_seq`` is the properties version of the delete (see
+    utils/changes.py); ``owner_id`` lets an owner's feed pick up its own.
+    """
+    __tablename__ = "property_tombstones"
+    __table_args__ = (
+        db.Index("ix_property_tombstones_change_seq", "change_seq", "property_id"),
+        {'extend_existing': True},
+    )
+
+    property_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    owner_id = db.Column(db.Integer, nullable=False)
+    change_seq = db.Column(db.BigInteger, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f"<PropertyTombstone {self.property_id} @{self.change_seq}>"
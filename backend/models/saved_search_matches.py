@@ -0,0 +1,22 @@
+from ..db import db
+from datetime import datetime, timezone
+
+
+class SavedSearchMatch(db.Model):
+    """One inbox entry: a listing that matched a saved search when it was written."""
+    __tablename__ = "saved_search_matches"
+    __table_args__ = (
+        db.UniqueConstraint("search_id", "property_id", name="uq_saved_search_matches_search_property"),
+        db.Index("ix_saved_search_matches_user_id", "user_id", "match_id"),
+        {'extend_existing': True},
+    )
+
+    match_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    search_id = db.Column(db.Integer, db.ForeignKey("saved_searches.search_id", ondelete="CASCADE"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    property_id = db.Column(db.Integer, db.ForeignKey("properties.property_id", ondelete="CASCADE"), nullable=False)
+    seen = db.Column(db.Boolean, nullable=False, default=False)
+    matched_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f"<SavedSearchMatch {self.match_id} search={self.search_id} property={self.property_id}>"
@@ -0,0 +1,24 @@
+from ..db import db
+from datetime import datetime, timezone
+
+
+class SavedSearch(db.Model):
+    """Listing filters a user asked to be notified about.
+
+    ``filters`` holds the normalized filter JSON (see utils/saved_searches.py);
+    new and updated listings that match it land in the user's inbox.
+    """
+    __tablename__ = "saved_searches"
+    __table_args__ = (
+        db.Index("ix_saved_searches_user_id", "user_id", "search_id"),
+        {'extend_existing': True},
+    )
+
+    search_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    name = db.Column(db.String(100))
+    filters = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f"<SavedSearch {self.search_id} user={self.user_id}>"
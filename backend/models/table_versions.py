@@ -0,0 +1,44 @@
+from ..db import db
+from datetime import datetime, timezone
+
+
+class TableVersion(db.Model):
+    """Change counter per table, bumped in the same transaction as each write.
+
+    Gives every worker a cheap, shared validator for ETag/Last-Modified
+    without aggregating over the table itself.
+    """
+    __tablename__ = "table_versions"
+
+    table_name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    @classmethod
+    def bump(cls, table_name):
+        """Increment the counter and return the new version; call before the write's commit.
+
+        The UPDATE holds the row lock until commit, so concurrent writers to
+        one table commit in version order (the change feed relies on this).
+        """
+        now = datetime.now(timezone.utc)
+        updated = (
+            db.session.query(cls)
+            .filter_by(table_name=table_name)
+            .update({cls.version: cls.version + 1, cls.updated_at: now}, synchronize_session=False)
+        )
+        if not updated:
+            db.session.add(cls(table_name=table_name, version=1, updated_at=now))
+            return 1
+        return db.session.query(cls.version).filter_by(table_name=table_name).scalar()
+
+    @classmethod
+    def current(cls, table_name):
+        """Return ``(version, updated_at)``; ``(0, None)`` before the first write."""
+        row = db.session.get(cls, table_name)
+        if row is None:
+            return 0, None
+        return row.version, row.updated_at
+
+    def __repr__(self):
+        return f"<TableVersion {self.table_name}={self.version}>"
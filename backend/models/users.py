@@ -1,6 +1,6 @@
 from ..db import db
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from ..utils.passwords import password_hasher
 
 
 class Users(db.Model):
@@ -21,13 +21,13 @@ class Users(db.Model):
         cascade="all, delete-orphan"
     )
 
-    # ✅ set password (store hash only)
+    # ✅ set password (store hash only); hashed off the request thread
     def set_password(self, password: str) -> None:
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher().hash(password)
 
     # ✅ verify password
     def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
+        return password_hasher().check(self.password_hash, password)
 
     def __repr__(self):
         return f"<User id={self.user_id}, email={self.email}, profile_image={self.profile_image}>"
@@ -1,51 +1,206 @@
+import logging
 import os
 from flask import Blueprint, request, jsonify, session
 from ..db import db
 from ..models.properties import Property
+from ..models.properties_archive import PropertyArchive
+from ..utils.pagination import parse_page_args, paginate, MAX_PAGE_SIZE
+from ..utils.archive import archived_columns, delete_archived, restore_listing, serialize_archived
+from ..utils.facets import get_facets
+from ..utils.invalidation import listings_changed
+from ..utils.cache import listing_cache
+from ..utils.conditional import make_validators, not_modified, add_validators
+from ..utils.search import ranked_listings, reindex_properties
+from ..utils.changes import changes_since, decode_change_token, record_property_changes
+from ..utils.replicas import replica_reads
+from ..utils.saved_searches import match_saved_searches
+from ..utils.geo import DEFAULT_RADIUS_KM, MAX_RADIUS_KM, location_fields, nearby_listings
+from ..utils.validators import validate_property
+from ..utils.serializers import (
+    OWNER_FIELDS, PROPERTY_FIELDS, columns_for, json_response, parse_fields, property_to_dict, serialize_properties
+)
 
 property_routes = Blueprint('property_routes', __name__)
+logger = logging.getLogger(__name__)
 
 # Note: The GET/POST /api/properties endpoints are defined on the blueprint
 # within the main app factory to avoid duplication here.
 
+# ------------------------------
+# Filter panel metadata (distinct values + counts)
+# ------------------------------
+@property_routes.route("/api/properties/facets", methods=["GET"])
+def property_facets():
+    # Read from the primary: the result is cached under this worker's
+    # listings generation, which a lagging replica may not have reached
+    try:
+        return jsonify(get_facets())
+    except Exception:
+        logger.exception("facets failed")
+        return jsonify({"error": "Failed to fetch filters"}), 500
+
+# ------------------------------
+# Change feed: listings written since a token, for clients that keep a copy
+# ------------------------------
+@property_routes.route("/api/properties/changes", methods=["GET"])
+@replica_reads
+def property_changes():
+    owner_id = None
+    if request.args.get("mine") in ("1", "true"):
+        user = session.get("user")
+        if not user:
+            return jsonify({"error": "Unauthorized"}), 401
+        owner_id = user["user_id"]
+
+    try:
+        since = request.args.get("since")
+        since = decode_change_token(since) if since else None
+        limit = min(int(request.args.get("limit", MAX_PAGE_SIZE)), MAX_PAGE_SIZE)
+        if limit < 1:
+            raise ValueError("Invalid limit")
+        fields = parse_fields(request.args.get("fields"), OWNER_FIELDS if owner_id else PROPERTY_FIELDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Polling with nothing new written costs one primary-key read
+    etag, last_modified = make_validators("properties", "changes", owner_id, request.args.get("since"),
+                                          request.args.get("filters"), limit, ",".join(fields))
+    unchanged = not_modified(etag, last_modified)
+    if unchanged is not None:
+        return unchanged
+
+    try:
+        body = changes_since(since, request.args.get("filters"), fields, limit, owner_id)
+        return add_validators(json_response(body), etag, last_modified)
+    except Exception:
+        logger.exception("change feed failed since=%r", request.args.get("since"))
+        return jsonify({"error": "Failed to fetch changes"}), 500
+
+# ------------------------------
+# Keyword search (ranked, combinable with the explore filters)
+# ------------------------------
+@property_routes.route("/api/properties/search", methods=["GET"])
+def search_properties():
+    text = (request.args.get("q") or "").strip()
+    if not text:
+        return jsonify({"error": "Missing search query"}), 400
+
+    try:
+        limit = min(int(request.args.get("limit", 20)), MAX_PAGE_SIZE)
+        offset = int(request.args.get("offset", 0))
+        if limit < 1 or offset < 0:
+            raise ValueError
+    except ValueError:
+        return jsonify({"error": "Invalid limit or offset"}), 400
+    try:
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        rows, scores, has_more = ranked_listings(text, request.args.get("filters"), fields, offset, limit)
+        results = serialize_properties(rows, fields)
+        for item in results:
+            item["score"] = round(scores[item["property_id"]], 4)
+        return json_response({"results": results, "has_more": has_more})
+    except Exception:
+        logger.exception("search failed q=%r", text)
+        return jsonify({"error": "Search failed"}), 500
+
+# ------------------------------
+# Listings near a point, nearest first
+# ------------------------------
+@property_routes.route("/api/properties/nearby", methods=["GET"])
+def nearby_properties():
+    try:
+        lat = float(request.args["lat"])
+        lng = float(request.args["lng"])
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            raise ValueError
+    except (KeyError, ValueError):
+        return jsonify({"error": "lat and lng are required and must be valid coordinates"}), 400
+
+    try:
+        radius_km = float(request.args.get("radius_km", DEFAULT_RADIUS_KM))
+        limit = min(int(request.args.get("limit", 20)), MAX_PAGE_SIZE)
+        if not (0 < radius_km <= MAX_RADIUS_KM) or limit < 1:
+            raise ValueError
+    except ValueError:
+        return jsonify({"error": f"radius_km must be in (0, {MAX_RADIUS_KM:g}] and limit positive"}), 400
+    try:
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        rows, distances, has_more = nearby_listings(lat, lng, radius_km, request.args.get("filters"), fields, limit)
+        results = serialize_properties(rows, fields)
+        for item in results:
+            item["distance_km"] = round(distances[item["property_id"]], 3)
+        return json_response({"results": results, "has_more": has_more})
+    except Exception:
+        logger.exception("nearby failed lat=%s lng=%s radius_km=%s", lat, lng, radius_km)
+        return jsonify({"error": "Nearby search failed"}), 500
+
+# ------------------------------
+# Listing cache counters (for sizing LISTING_CACHE_SIZE / TTL)
+# ------------------------------
+@property_routes.route("/api/properties/cache-stats", methods=["GET"])
+def property_cache_stats():
+    return jsonify(listing_cache().stats())
+
 # ------------------------------
 # Fetch current user's properties
 # ------------------------------
 @property_routes.route("/api/myproperties", methods=["GET"])
+@replica_reads
 def my_properties():
-    print("[DEBUG] my_properties route is registered and accessed")
     user = session.get("user")
     if not user:
-        print("[DEBUG] Session Error: User not logged in")
         return jsonify({"error": "Unauthorized"}), 401
 
     try:
-        print("[DEBUG] Session User:", user)
-        props = Property.query.filter_by(owner_id=user["user_id"]).order_by(Property.property_id.desc()).all()
-        print("[DEBUG] Properties fetched for user:", props)
-        props_list = [{
-            "property_id": p.property_id,
-            "full_name": p.full_name,
-            "address": p.address,
-            "city": p.city,
-            "area": p.area,
-            "district": p.district,
-            "property_type": p.property_type,
-            "house_type": p.house_type,
-            "rent_price": str(p.rent_price),
-            "car_parking": p.car_parking,
-            "pets": p.pets,
-            "furnishing": p.furnishing,
-            "facing": p.facing,
-            "status": p.status,
-            "description": p.description,
-            "images": [img for img in p.images.split(",") if img]
-        } for p in props]
-        return jsonify({"success": True, "properties": props_list})
-    except Exception as e:
-        print("[DEBUG] Get Properties Error:", e)
+        after_id, limit = parse_page_args(request.args)
+        fields = parse_fields(request.args.get("fields"), OWNER_FIELDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # ?archived=1 lists the owner's archived listings; setting a status restores one
+    archived = request.args.get("archived") in ("1", "true")
+    etag, last_modified = make_validators("properties", "mine", user["user_id"], after_id, limit, ",".join(fields),
+                                          archived)
+    unchanged = not_modified(etag, last_modified)
+    if unchanged is not None:
+        return unchanged
+
+    try:
+        if archived:
+            query = PropertyArchive.query.filter_by(owner_id=user["user_id"]).with_entities(*archived_columns(fields))
+            props, next_cursor = paginate(query, PropertyArchive.property_id, after_id, limit)
+            items = serialize_archived(props, fields)
+        else:
+            query = Property.query.filter_by(owner_id=user["user_id"]).with_entities(*columns_for(fields))
+            props, next_cursor = paginate(query, Property.property_id, after_id, limit)
+            items = serialize_properties(props, fields)
+        logger.debug("my_properties user_id=%s archived=%s count=%d", user["user_id"], archived, len(props))
+        response = json_response({"success": True, "properties": items, "next_cursor": next_cursor})
+        return add_validators(response, etag, last_modified)
+    except Exception:
+        logger.exception("my_properties failed user_id=%s", user["user_id"])
         return jsonify({"error": "Failed to fetch properties"}), 500
 
+# ------------------------------
+# Single property (Location target of POST /api/properties)
+# ------------------------------
+@property_routes.route("/api/property/<int:property_id>", methods=["GET"])
+def get_property(property_id):
+    prop = db.session.get(Property, property_id)
+    user = session.get("user")
+    is_owner = bool(user) and prop is not None and prop.owner_id == user.get("user_id")
+    if not prop or (prop.status != "Available" and not is_owner):
+        return jsonify({"error": "Property not found"}), 404
+    return jsonify(property_to_dict(prop))
+
 # ------------------------------
 # Update property status (Available/Unavailable)
 # ------------------------------
@@ -56,19 +211,24 @@ def update_property_status(property_id):
         return jsonify({"error": "Unauthorized"}), 401
 
     try:
-        prop = Property.query.get(property_id)
-        if not prop or prop.owner_id != user["user_id"]:
-            return jsonify({"error": "Property not found or unauthorized"}), 404
-
         new_status = request.json.get("status")
         if new_status not in ["Available", "Unavailable"]:
             return jsonify({"error": "Invalid status"}), 400
 
+        # An archived listing moves back when its owner sets its status
+        prop = db.session.get(Property, property_id) or restore_listing(property_id, user["user_id"])
+        if not prop or prop.owner_id != user["user_id"]:
+            return jsonify({"error": "Property not found or unauthorized"}), 404
+
         prop.status = new_status
+        record_property_changes([prop])
         db.session.commit()
+        listings_changed()
+        reindex_properties([property_id])
+        match_saved_searches([property_id])
         return jsonify({"success": True, "message": f"Property status updated to {new_status}"})
-    except Exception as e:
-        print("Update Property Status Error:", e)
+    except Exception:
+        logger.exception("status update failed property_id=%s", property_id)
         return jsonify({"error": "Failed to update status"}), 500
 
 # ------------------------------
@@ -81,11 +241,14 @@ def update_property(property_id):
         return jsonify({"error": "Unauthorized"}), 401
 
     try:
-        prop = Property.query.get(property_id)
+        prop = db.session.get(Property, property_id)
         if not prop or prop.owner_id != user["user_id"]:
             return jsonify({"error": "Property not found or unauthorized"}), 404
 
         data = request.get_json() or {}
+        error = validate_property(data, partial=True)
+        if error:
+            return jsonify({"error": error}), 400
 
         # Allow updating a subset of fields
         updatable_fields = [
@@ -96,29 +259,37 @@ def update_property(property_id):
             if field in data and data[field] is not None:
                 setattr(prop, field, data[field])
 
+        for field, value in location_fields(data).items():
+            setattr(prop, field, value)
+
+        record_property_changes([prop])
         db.session.commit()
+        listings_changed()
+        reindex_properties([property_id])
+        match_saved_searches([property_id])
         return jsonify({"success": True, "message": "Property updated successfully"})
-    except Exception as e:
-        print("Update Property Error:", e)
+    except Exception:
+        logger.exception("property update failed property_id=%s", property_id)
         return jsonify({"error": "Failed to update property"}), 500
 
 # ------------------------------
 # Contact owner (returns phone when logged-in)
 # ------------------------------
 @property_routes.route("/api/property/<int:property_id>/contact", methods=["GET"])
+@replica_reads
 def contact_owner(property_id):
     user = session.get("user")
     if not user:
         return jsonify({"error": "Unauthorized"}), 401
 
     try:
-        prop = Property.query.get(property_id)
+        prop = db.session.get(Property, property_id)
         if not prop:
             return jsonify({"error": "Property not found"}), 404
 
         return jsonify({"success": True, "mobile_number": prop.mobile_number})
-    except Exception as e:
-        print("Contact Owner Error:", e)
+    except Exception:
+        logger.exception("contact owner failed property_id=%s", property_id)
         return jsonify({"error": "Failed to fetch contact"}), 500
 
 # ------------------------------
@@ -131,13 +302,19 @@ def delete_property(property_id):
         return jsonify({"error": "Unauthorized"}), 401
 
     try:
-        prop = Property.query.get(property_id)
+        prop = db.session.get(Property, property_id)
+        if not prop and delete_archived(property_id, user["user_id"]):
+            db.session.commit()
+            return jsonify({"success": True, "message": "Property deleted successfully"})
         if not prop or prop.owner_id != user["user_id"]:
             return jsonify({"error": "Property not found or unauthorized"}), 404
 
+        record_property_changes(deleted=[prop])
         db.session.delete(prop)
         db.session.commit()
+        listings_changed()
+        reindex_properties([property_id])
         return jsonify({"success": True, "message": "Property deleted successfully"})
-    except Exception as e:
-        print("Delete Property Error:", e)
+    except Exception:
+        logger.exception("property delete failed property_id=%s", property_id)
         return jsonify({"error": "Failed to delete property"}), 500
@@ -0,0 +1,157 @@
+import json
+import logging
+from flask import Blueprint, current_app, request, jsonify, session
+from sqlalchemy import func
+from ..db import db
+from ..models.properties import Property
+from ..models.saved_searches import SavedSearch
+from ..models.saved_search_matches import SavedSearchMatch
+from ..models.table_versions import TableVersion
+from ..utils.pagination import parse_page_args, paginate
+from ..utils.saved_searches import parse_saved_filters, saved_searches_changed
+from ..utils.serializers import columns_for, parse_fields, serialize_properties
+
+saved_search_routes = Blueprint('saved_search_routes', __name__)
+logger = logging.getLogger(__name__)
+
+
+def saved_search_to_dict(search, unseen=0):
+    return {
+        "search_id": search.search_id,
+        "name": search.name,
+        "filters": json.loads(search.filters),
+        "created_at": search.created_at.isoformat() if search.created_at else None,
+        "unseen": unseen,
+    }
+
+# ------------------------------
+# Saved searches of the logged-in user
+# ------------------------------
+@saved_search_routes.route("/api/saved-searches", methods=["GET"])
+def list_saved_searches():
+    user = session.get("user")
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    searches = SavedSearch.query.filter_by(user_id=user["user_id"]).order_by(SavedSearch.search_id).all()
+    unseen = dict(
+        db.session.query(SavedSearchMatch.search_id, func.count())
+        .filter_by(user_id=user["user_id"], seen=False)
+        .group_by(SavedSearchMatch.search_id)
+    )
+    return jsonify({"saved_searches": [saved_search_to_dict(s, unseen.get(s.search_id, 0)) for s in searches]})
+
+
+@saved_search_routes.route("/api/saved-searches", methods=["POST"])
+def create_saved_search():
+    user = session.get("user")
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    data = request.get_json(silent=True) or {}
+    try:
+        filters = parse_saved_filters(data.get("filters"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    name = (data.get("name") or "").strip()[:100] or None
+
+    existing = SavedSearch.query.filter_by(user_id=user["user_id"]).all()
+    for search in existing:
+        if search.filters == filters:
+            return jsonify(saved_search_to_dict(search)), 200
+    limit = current_app.config.get("SAVED_SEARCH_LIMIT", 20)
+    if len(existing) >= limit:
+        return jsonify({"error": f"At most {limit} saved searches per account"}), 400
+
+    try:
+        search = SavedSearch(user_id=user["user_id"], name=name, filters=filters)
+        db.session.add(search)
+        TableVersion.bump("saved_searches")
+        db.session.commit()
+        saved_searches_changed(added=[search])
+        return jsonify(saved_search_to_dict(search)), 201
+    except Exception:
+        db.session.rollback()
+        logger.exception("saved search create failed user_id=%s", user["user_id"])
+        return jsonify({"error": "Failed to save search"}), 500
+
+
+@saved_search_routes.route("/api/saved-searches/<int:search_id>", methods=["DELETE"])
+def delete_saved_search(search_id):
+    user = session.get("user")
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    search = db.session.get(SavedSearch, search_id)
+    if not search or search.user_id != user["user_id"]:
+        return jsonify({"error": "Saved search not found"}), 404
+
+    try:
+        SavedSearchMatch.query.filter_by(search_id=search_id).delete(synchronize_session=False)
+        db.session.delete(search)
+        TableVersion.bump("saved_searches")
+        db.session.commit()
+        saved_searches_changed(removed=[search_id])
+        return jsonify({"success": True})
+    except Exception:
+        db.session.rollback()
+        logger.exception("saved search delete failed search_id=%s", search_id)
+        return jsonify({"error": "Failed to delete saved search"}), 500
+
+# ------------------------------
+# Inbox: listings that matched a saved search, newest first
+# ------------------------------
+@saved_search_routes.route("/api/saved-searches/inbox", methods=["GET"])
+def saved_search_inbox():
+    user = session.get("user")
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    try:
+        after_id, limit = parse_page_args(request.args)
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Listings deleted or made unavailable since they matched drop out
+    query = (SavedSearchMatch.query
+             .join(Property, Property.property_id == SavedSearchMatch.property_id)
+             .filter(SavedSearchMatch.user_id == user["user_id"], Property.status == "Available"))
+    if request.args.get("unseen") in ("1", "true"):
+        query = query.filter(SavedSearchMatch.seen.is_(False))
+    matches, next_cursor = paginate(query, SavedSearchMatch.match_id, after_id, limit)
+
+    rows = (Property.query.filter(Property.property_id.in_({m.property_id for m in matches}))
+            .with_entities(*columns_for(fields)).all()) if matches else []
+    listings = {item["property_id"]: item for item in serialize_properties(rows, fields)}
+    unseen = SavedSearchMatch.query.filter_by(user_id=user["user_id"], seen=False).count()
+    return jsonify({
+        "matches": [{
+            "match_id": m.match_id,
+            "search_id": m.search_id,
+            "matched_at": m.matched_at.isoformat() if m.matched_at else None,
+            "seen": m.seen,
+            "property": listings[m.property_id],
+        } for m in matches],
+        "next_cursor": next_cursor,
+        "unseen": unseen,
+    })
+
+
+@saved_search_routes.route("/api/saved-searches/inbox/seen", methods=["POST"])
+def mark_inbox_seen():
+    """Mark inbox entries seen: all of them, or up to ``up_to`` (a match_id)."""
+    user = session.get("user")
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    up_to = (request.get_json(silent=True) or {}).get("up_to")
+    if up_to is not None and (not isinstance(up_to, int) or isinstance(up_to, bool)):
+        return jsonify({"error": "up_to must be a match_id"}), 400
+
+    query = SavedSearchMatch.query.filter_by(user_id=user["user_id"], seen=False)
+    if up_to is not None:
+        query = query.filter(SavedSearchMatch.match_id <= up_to)
+    updated = query.update({SavedSearchMatch.seen: True}, synchronize_session=False)
+    db.session.commit()
+    return jsonify({"success": True, "updated": updated})
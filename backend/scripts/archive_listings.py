@@ -0,0 +1,44 @@
+"""Move long-unavailable and expired listings into ``properties_archive``.
+
+This is the default way to run the job: schedule it with cron or a
+similar runner (workers only run it themselves when ``ARCHIVE_INTERVAL``
+is set). Ages, batch size and pause default to the ``ARCHIVE_*``
+settings. Owners get a listing back by setting its status.
+
+Usage: python -m backend.scripts.archive_listings [--dry-run] [--unavailable-days N]
+    [--expire-days N] [--batch-size N] [--pause SECONDS]
+"""
+import argparse
+
+from backend.app import create_app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="count the listings due, move nothing")
+    parser.add_argument("--unavailable-days", type=int, help="archive unavailable listings untouched this long")
+    parser.add_argument("--expire-days", type=int, help="archive any listing untouched this long (0 = never)")
+    parser.add_argument("--batch-size", type=int, help="listings per transaction")
+    parser.add_argument("--pause", type=float, help="seconds between batches")
+    args = parser.parse_args(argv)
+
+    overrides = {"ARCHIVE_INTERVAL": 0}  # this process runs the job itself
+    if args.unavailable_days is not None:
+        overrides["ARCHIVE_UNAVAILABLE_DAYS"] = args.unavailable_days
+    if args.expire_days is not None:
+        overrides["ARCHIVE_EXPIRE_DAYS"] = args.expire_days
+    app = create_app(**overrides)
+    archiver = app.extensions["listing_archiver"]
+    with app.app_context():
+        if args.dry_run:
+            due = archiver.pending()
+            print(f"{due} listing(s) due for the archive")
+            return due
+        report = archiver.run(batch_size=args.batch_size, pause=args.pause)
+    print(f"archived {report['archived']} listing(s) in {report['batches']} batch(es), "
+          f"{report['seconds']:.1f}s, {report['rows_per_second']:.0f} rows/s")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Copy the legacy ``properties.images`` column into ``property_images``.
+
+Each comma-separated name becomes one row, in its original order, with
+the photo's dimensions read from the file header when Pillow is
+installed. Listings that already have rows are left alone, so the script
+can be re-run safely. Once the output looks right, ``--drop-column``
+removes the old column.
+
+Run ``python -m backend.scripts.migrate --target 0009_property_images``
+first so the table exists; the next migration copies whatever is left,
+without dimensions, and drops the column.
+
+Usage: python -m backend.scripts.backfill_property_images [--dry-run] [--drop-column]
+"""
+import argparse
+import os
+
+from sqlalchemy import inspect, text
+
+from backend.app import create_app, db
+from backend.models.property_images import PropertyImage
+from backend.models.table_versions import TableVersion
+from backend.utils.images import Image
+from backend.utils.invalidation import listings_changed
+
+BATCH_SIZE = 1000
+
+
+def has_legacy_column():
+    return "images" in {c["name"] for c in inspect(db.engine).get_columns("properties")}
+
+
+# EXIF orientations that rotate the picture by 90 degrees
+_ROTATED = {5, 6, 7, 8}
+
+
+def image_size(upload_folder, name):
+    """Upright ``(width, height)`` of an upload, or ``(None, None)``."""
+    if Image is None:
+        return None, None
+    try:
+        with Image.open(os.path.join(upload_folder, name)) as image:  # reads the header only
+            width, height = image.size
+            if image.getexif().get(0x0112) in _ROTATED:
+                width, height = height, width
+            return width, height
+    except (OSError, ValueError):
+        return None, None
+
+
+def backfill(upload_folder, dry_run=False):
+    stats = {"properties": 0, "images": 0}
+    if not has_legacy_column():
+        return stats
+
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            text(
+                "SELECT property_id, images FROM properties"
+                " WHERE property_id > :last_id AND images IS NOT NULL AND images <> ''"
+                " ORDER BY property_id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].property_id
+
+        done = {
+            property_id for (property_id,) in db.session.query(PropertyImage.property_id)
+            .filter(PropertyImage.property_id.in_([row.property_id for row in rows]))
+            .distinct()
+        }
+        new_rows = []
+        for row in rows:
+            if row.property_id in done:
+                continue
+            names = list(dict.fromkeys(name for name in row.images.split(",") if name))
+            for i, name in enumerate(names):
+                width, height = image_size(upload_folder, name)
+                new_rows.append(dict(property_id=row.property_id, ordinal=i, storage_key=name,
+                                     width=width, height=height))
+            stats["properties"] += 1
+        stats["images"] += len(new_rows)
+
+        if new_rows and not dry_run:
+            db.session.execute(PropertyImage.__table__.insert(), new_rows)
+            db.session.commit()
+
+    if not dry_run and stats["images"]:
+        TableVersion.bump("properties")
+        db.session.commit()
+        listings_changed()
+    return stats
+
+
+def drop_legacy_column():
+    if has_legacy_column():
+        db.session.execute(text("ALTER TABLE properties DROP COLUMN images"))
+        db.session.commit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="report what would be copied, write nothing")
+    parser.add_argument("--drop-column", action="store_true", help="drop properties.images after the backfill")
+    args = parser.parse_args(argv)
+
+    app = create_app()
+    with app.app_context():
+        stats = backfill(app.config["UPLOAD_FOLDER"], dry_run=args.dry_run)
+        if args.drop_column and not args.dry_run:
+            drop_legacy_column()
+
+    print(f"properties backfilled: {stats['properties']}, images: {stats['images']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Build fingerprinted, precompressed static assets (see utils/assets.py).
+
+Minifies ``static/css`` and ``static/js``, names every file in
+``static/{css,js,img}`` after its content hash under ``static/dist``,
+writes ``.br``/``.gz`` copies of text assets and the manifest that
+``asset_url()`` reads. Run on each deploy, before the workers start; they
+load the manifest once at startup.
+
+Usage: python -m backend.scripts.build_assets [--static DIR] [--no-minify]
+"""
+import argparse
+import os
+
+from backend.utils.assets import ENCODING_SUFFIXES, build_assets
+from backend.utils.compression import available_encodings
+
+STATIC_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--static", default=STATIC_FOLDER, help="static folder (default: backend/static)")
+    parser.add_argument("--no-minify", dest="minify", action="store_false", help="fingerprint and compress only")
+    args = parser.parse_args(argv)
+
+    manifest = build_assets(args.static, minify=args.minify)
+    for source, target in sorted(manifest["assets"].items()):
+        before = os.path.getsize(os.path.join(args.static, source))
+        sizes = [f"{before:,} -> {os.path.getsize(os.path.join(args.static, target)):,}"]
+        for encoding in manifest["encodings"].get(target, ()):
+            path = os.path.join(args.static, target + ENCODING_SUFFIXES[encoding])
+            sizes.append(f"{encoding} {os.path.getsize(path):,}")
+        print(f"  {target:<40} {', '.join(sizes)}")
+    print(f"built {len(manifest['assets'])} asset(s) ({', '.join(available_encodings())})")
+    return manifest
+
+
+if __name__ == "__main__":
+    main()
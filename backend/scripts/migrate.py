@@ -0,0 +1,34 @@
+"""Apply pending schema migrations (see backend/migrations).
+
+Run once per deploy, before the new code starts serving; workers no longer
+create tables on boot. ``status`` lists what would run.
+
+Usage: python -m backend.scripts.migrate [upgrade|status] [--target NNNN_name]
+"""
+import argparse
+
+from backend.app import create_app, db
+from backend import migrations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", nargs="?", choices=["upgrade", "status"], default="upgrade")
+    parser.add_argument("--target", help="stop after this migration")
+    args = parser.parse_args(argv)
+
+    app = create_app()
+    with app.app_context():
+        if args.command == "status":
+            waiting = migrations.pending(db.engine)
+            for name in migrations.available():
+                print(f"  {'pending' if name in waiting else 'applied'}  {name}")
+            return waiting
+
+        ran = migrations.upgrade(db.engine, target=args.target)
+    print(f"applied {len(ran)} migration(s)" + "".join(f"\n  {name}" for name in ran))
+    return ran
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Move existing uploads to content-addressed names.
+
+Re-hashes every file referenced from ``property_images``, stores it under
+its SHA-256 name (duplicates collapse into one file) and updates the
+storage keys. Variant rows follow their source image. Files that are
+missing on disk are reported and left as they are.
+
+Usage: python -m backend.scripts.migrate_uploads [--dry-run] [--remove-old]
+"""
+import argparse
+import hashlib
+import os
+
+from backend.app import create_app, db
+from backend.models.property_images import PropertyImage
+from backend.models.image_variants import ImageVariant
+from backend.utils.changes import record_property_changes
+from backend.utils.invalidation import listings_changed
+from backend.utils.uploads import HASHED_NAME_RE, store_file
+
+BATCH_SIZE = 500
+
+
+def hashed_name(upload_folder, name, renamed, dry_run):
+    """New name for ``name`` (memoised in ``renamed``), or None if missing."""
+    if name in renamed:
+        return renamed[name]
+    path = os.path.join(upload_folder, name)
+    if not os.path.isfile(path):
+        renamed[name] = None
+        return None
+
+    ext = name.rsplit(".", 1)[-1].lower() if "." in name else "bin"
+    if dry_run:
+        with open(path, "rb") as f:
+            renamed[name] = f"{hashlib.file_digest(f, 'sha256').hexdigest()}.{ext}"
+    else:
+        with open(path, "rb") as f:
+            renamed[name] = store_file(f, upload_folder, ext)
+    return renamed[name]
+
+
+def move_variants(old, new):
+    if ImageVariant.query.filter_by(source=new).first():
+        ImageVariant.query.filter_by(source=old).delete(synchronize_session=False)
+    else:
+        ImageVariant.query.filter_by(source=old).update({ImageVariant.source: new}, synchronize_session=False)
+
+
+def migrate(upload_folder, dry_run=False, remove_old=False):
+    renamed = {}
+    touched = set()
+    stats = {"properties": 0, "missing": set()}
+
+    last_id = 0
+    while True:
+        batch = (
+            PropertyImage.query.filter(PropertyImage.image_id > last_id)
+            .order_by(PropertyImage.image_id)
+            .limit(BATCH_SIZE)
+            .all()
+        )
+        if not batch:
+            break
+        last_id = batch[-1].image_id
+
+        changed = set()
+        for photo in batch:
+            if HASHED_NAME_RE.match(photo.storage_key):
+                continue
+            new = hashed_name(upload_folder, photo.storage_key, renamed, dry_run)
+            if new is None:
+                stats["missing"].add(photo.storage_key)
+                continue
+            changed.add(photo.property_id)
+            duplicate = PropertyImage.query.filter_by(property_id=photo.property_id, storage_key=new).first()
+            if duplicate is not None and duplicate is not photo:
+                db.session.delete(photo)  # same picture uploaded twice
+            else:
+                photo.storage_key = new
+            db.session.flush()
+        stats["properties"] += len(changed)
+        touched |= changed
+
+        if dry_run:
+            db.session.rollback()
+        else:
+            db.session.commit()
+
+    if not dry_run:
+        for old, new in renamed.items():
+            if new and new != old:
+                move_variants(old, new)
+        record_property_changes(sorted(touched))  # image URLs changed
+        db.session.commit()
+        listings_changed()
+
+        if remove_old:
+            for old, new in renamed.items():
+                if new and new != old:
+                    os.remove(os.path.join(upload_folder, old))
+
+    stats["files"] = len([n for n in renamed.values() if n])
+    stats["unique"] = len({n for n in renamed.values() if n})
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="report what would change, write nothing")
+    parser.add_argument("--remove-old", action="store_true", help="delete the old files after migrating")
+    args = parser.parse_args(argv)
+
+    app = create_app()
+    with app.app_context():
+        stats = migrate(app.config["UPLOAD_FOLDER"], dry_run=args.dry_run, remove_old=args.remove_old)
+
+    print(f"properties updated: {stats['properties']}")
+    print(f"files hashed: {stats['files']} -> {stats['unique']} unique")
+    for name in sorted(stats["missing"]):
+        print(f"missing on disk (left unchanged): {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,68 +2,131 @@ let properties = [];
 let images = [];
 let currentImageIndex = 0;
 let selectedProperty = null;
+let facets = null;
+
+// Pagination state (keyset cursor from the API)
+let activeFilters = {};
+let nextCursor = null;
+let loadingPage = false;
+let pageRequest = 0;
+const PAGE_SIZE = 24;
+// Cards don't show the description; the modal fetches it on demand
+const LIST_FIELDS = [
+  "full_name", "address", "city", "area", "district", "property_type", "house_type",
+  "rent_price", "car_parking", "pets", "facing", "furnishing", "images", "status"
+].join(",");
 
 // ---------------------
 // Fetch properties (with optional filters)
 // ---------------------
 async function fetchProperties(filters = {}) {
+  activeFilters = filters;
+  nextCursor = null;
+  properties = [];
+  const initialLoad = Object.keys(filters).length === 0;
+  const facetsReady = initialLoad ? fetchFacets() : null;
+  await loadNextPage(true);
+
+  // Only refill filter panels when no filters are applied (initial load)
+  if (initialLoad) {
+    await facetsReady;
+    fillDistricts();
+    fillBHK();
+    initCitiesPanel();
+    initAreasPanel();
+    fillCarParking();
+    fillPets();
+    fillFacing();
+    fillFurnishing();
+  }
+}
+
+async function loadNextPage(firstPage = false) {
+  if (!firstPage && (loadingPage || !nextCursor)) return;
+  const request = ++pageRequest;
+  loadingPage = true;
   try {
-    const query = Object.keys(filters).length
-      ? `?filters=${encodeURIComponent(JSON.stringify(filters))}`
-      : "";
+    const params = new URLSearchParams({ limit: PAGE_SIZE, fields: LIST_FIELDS });
+    if (Object.keys(activeFilters).length) params.set("filters", JSON.stringify(activeFilters));
+    if (nextCursor) params.set("cursor", nextCursor);
 
-    const res = await fetch(`/api/properties${query}`);
+    const res = await fetch(`/api/properties?${params}`);
     const data = await res.json();
-    properties = Array.isArray(data) ? data : [];
-    renderProperties(properties);
-
-    // Only refill filter panels when no filters are applied (initial load)
-    if (Object.keys(filters).length === 0) {
-      fillDistricts(properties);
-      fillBHK(properties);
-      initCitiesPanel();
-      initAreasPanel();
-      fillCarParking();
-      fillPets();
-      fillFacing();
-      fillFurnishing();
-    }
+    if (request !== pageRequest) return; // superseded by a newer filter
+    const page = Array.isArray(data.properties) ? data.properties : [];
+    nextCursor = data.next_cursor || null;
+    properties = properties.concat(page);
+    renderProperties(page, !firstPage);
   } catch (err) {
     console.error("Failed to load properties:", err);
+  } finally {
+    if (request === pageRequest) loadingPage = false;
+  }
+}
+
+// ---------------------
+// Filter metadata (distinct values + counts, computed server-side)
+// ---------------------
+async function fetchFacets() {
+  try {
+    const res = await fetch("/api/properties/facets");
+    facets = res.ok ? await res.json() : null;
+  } catch (err) {
+    console.error("Failed to load filters:", err);
+    facets = null;
   }
 }
 
+function findDistrict(name) {
+  return ((facets && facets.districts) || []).find((d) => d.value === name);
+}
+
+// ---------------------
+// Infinite scroll
+// ---------------------
+const scrollSentinel = document.createElement("div");
+scrollSentinel.style.cssText = "grid-column:1/-1;height:1px;";
+new IntersectionObserver((entries) => {
+  if (entries.some((e) => e.isIntersecting)) loadNextPage();
+}, { rootMargin: "400px" }).observe(scrollSentinel);
+
+// Resized variant URL when the server has built one, else the original upload
+function imageSrc(p, index, size) {
+  const urls = p.image_urls && p.image_urls[index];
+  return urls ? urls[size] : `/static/uploads/${p.images[index]}`;
+}
+
 // ---------------------
 // Render cards
 // ---------------------
-function renderProperties(list) {
+function renderProperties(list, append = false) {
   const gallery = document.getElementById("propertyGallery");
-  gallery.innerHTML = "";
-  if (list.length === 0) {
+  if (!append) gallery.innerHTML = "";
+  if (!append && list.length === 0) {
     gallery.innerHTML =
       "<p style='grid-column:1/-1;text-align:center;font-size:18px;color:#555;'>No properties found.</p>";
     return;
   }
-  console.log(list);
   list.forEach((p) => {
     const card = document.createElement("div");
     card.className = "property-card";
     const imageUrl =
       p.images && p.images.length > 0
-        ? `/static/uploads/${p.images[0]}`
+        ? imageSrc(p, 0, "thumb")
         : "https://via.placeholder.com/400x250?text=No+Image";
     card.innerHTML = `
-      <img src="${imageUrl}" alt="">
+      <img src="${imageUrl}" alt="" loading="lazy">
       <div class="property-info">
         <h4>${p.full_name} - ${p.property_type} - ${p.house_type}</h4>
         <p><strong>₹${p.rent_price}</strong>/month</p>
         <p>${p.address}</p>
         <p>${p.area}, ${p.city}</p>
-        <p class="desc" style="display:none;">${p.description || ""}</p>
       </div>`;
     card.onclick = () => openModal(p);
     gallery.appendChild(card);
   });
+  // Keep the sentinel after the last card so scrolling to it loads the next page
+  gallery.appendChild(scrollSentinel);
 }
 
 // ---------------------
@@ -71,7 +134,7 @@ function renderProperties(list) {
 // ---------------------
 function openModal(p) {
   selectedProperty = p;
-  images = p.images || [];
+  images = (p.images || []).map((_, i) => imageSrc(p, i, "medium"));
   currentImageIndex = 0;
   updateCarousel();
 
@@ -86,6 +149,22 @@ function openModal(p) {
   document.getElementById("modalAddress").innerText = p.address;
   document.getElementById("modalDesc").innerText = p.description || "No description available.";
   document.getElementById("propertyModal").style.display = "flex";
+
+  if (p.description === undefined) loadDescription(p);
+}
+
+async function loadDescription(p) {
+  try {
+    const res = await fetch(`/api/property/${p.property_id}`);
+    if (!res.ok) return;
+    const full = await res.json();
+    p.description = full.description || "";
+    if (selectedProperty === p) {
+      document.getElementById("modalDesc").innerText = p.description || "No description available.";
+    }
+  } catch (err) {
+    console.error("Failed to load description:", err);
+  }
 }
 
 document.getElementById("contactBtn").addEventListener("click", async () => {
@@ -111,7 +190,7 @@ document.getElementById("contactBtn").addEventListener("click", async () => {
 function updateCarousel() {
   const carouselImg = document.getElementById("carouselImage");
   if (images.length > 0) {
-    carouselImg.src = `/static/uploads/${images[currentImageIndex]}`;
+    carouselImg.src = images[currentImageIndex];
   } else {
     carouselImg.src = "https://via.placeholder.com/400x250?text=No+Image";
   }
@@ -141,13 +220,12 @@ function toggleAccordion(btn) {
 // ---------------------
 // Filters
 // ---------------------
-function fillDistricts(list) {
+function fillDistricts() {
   const panel = document.getElementById("districtPanel");
   panel.innerHTML = "";
-  const districts = [...new Set(list.map((p) => p.district))].sort();
-  districts.forEach((d) => {
+  ((facets && facets.districts) || []).forEach((d) => {
     const label = document.createElement("label");
-    label.innerHTML = `<input type="radio" name="district" value="${d}"> ${d}`;
+    label.innerHTML = `<input type="radio" name="district" value="${d.value}"> ${d.value} (${d.count})`;
     panel.appendChild(label);
   });
 
@@ -166,11 +244,8 @@ function initCitiesPanel() {
 
 function updateCities(selectedDistrict) {
   const panel = document.getElementById("cityPanel");
-  const citiesInDistrict = [...new Set(
-    properties
-    .filter((p) => p.district === selectedDistrict)
-    .map((p) => p.city)
-  )].sort();
+  const district = findDistrict(selectedDistrict);
+  const citiesInDistrict = district ? district.cities : [];
 
   if (citiesInDistrict.length === 0) {
     panel.innerHTML = "<p>No cities available for this district</p>";
@@ -180,7 +255,7 @@ function updateCities(selectedDistrict) {
   panel.innerHTML = "";
   citiesInDistrict.forEach((city) => {
     const label = document.createElement("label");
-    label.innerHTML = `<input type="checkbox" value="${city}"> ${city}`;
+    label.innerHTML = `<input type="checkbox" value="${city.value}"> ${city.value} (${city.count})`;
     panel.appendChild(label);
   });
 }
@@ -193,10 +268,13 @@ function updateAreas(selectedDistrict) {
   const panel = document.getElementById("areasPanel");
   panel.innerHTML = "";
 
-  const areas = properties
-    .filter((p) => p.district === selectedDistrict)
-    .map((p) => p.area);
-  const uniqueAreas = [...new Set(areas)].sort();
+  // The same area can appear under several cities of a district
+  const areaCounts = {};
+  const district = findDistrict(selectedDistrict);
+  (district ? district.cities : []).forEach((c) =>
+    c.areas.forEach((a) => { areaCounts[a.value] = (areaCounts[a.value] || 0) + a.count; })
+  );
+  const uniqueAreas = Object.keys(areaCounts).sort();
 
   if (uniqueAreas.length === 0) {
     panel.innerHTML = "<p>No areas available for this district</p>";
@@ -205,21 +283,22 @@ function updateAreas(selectedDistrict) {
 
   uniqueAreas.forEach((a) => {
     const label = document.createElement("label");
-    label.innerHTML = `<input type="checkbox" value="${a}"> ${a}`;
+    label.innerHTML = `<input type="checkbox" value="${a}"> ${a} (${areaCounts[a]})`;
     panel.appendChild(label);
   });
 }
 
-function fillBHK(list) {
+function fillBHK() {
   const panel = document.getElementById("bhkPanel");
   panel.innerHTML = "";
   const bhkOrder = ["1HK", "1BHK", "2BHK", "3BHK", "4+ BHK"];
-  const bhks = [...new Set(list.map((p) => p.house_type))].filter(Boolean);
+  const counts = {};
+  ((facets && facets.house_type) || []).forEach((h) => { counts[h.value] = h.count; });
 
   bhkOrder.forEach((b) => {
-    if (bhks.includes(b)) {
+    if (counts[b]) {
       const label = document.createElement("label");
-      label.innerHTML = `<input type="checkbox" value="${b}"> ${b}`;
+      label.innerHTML = `<input type="checkbox" value="${b}"> ${b} (${counts[b]})`;
       panel.appendChild(label);
     }
   });
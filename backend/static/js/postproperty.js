@@ -21,6 +21,24 @@ window.addEventListener("DOMContentLoaded", async () => {
   }
 });
 
+// --- Optional location (enables "near me" search for this listing) ---
+document.getElementById("use-location")?.addEventListener("click", () => {
+  const status = document.getElementById("location-status");
+  if (!navigator.geolocation) {
+    status.textContent = "Location is not available in this browser.";
+    return;
+  }
+  status.textContent = "Locating…";
+  navigator.geolocation.getCurrentPosition(
+    (pos) => {
+      document.getElementById("latitude").value = pos.coords.latitude.toFixed(6);
+      document.getElementById("longitude").value = pos.coords.longitude.toFixed(6);
+      status.textContent = "Location added.";
+    },
+    () => { status.textContent = "Could not get your location."; }
+  );
+});
+
 // --- File input label update ---
 document.getElementById("upload")?.addEventListener("change", function () {
   const fileLabel = document.getElementById("file-name");
@@ -69,7 +87,7 @@ function renderExploreProperties(properties) {
       <p>Furnishing: ${p.furnishing} | Facing: ${p.facing}</p>
       <p>${p.description || ""}</p>
       <div class="images">
-        ${p.images.map(img => `<img src="/static/uploads/${img}" width="100">`).join("")}
+        ${p.images.map((img, i) => `<img src="${p.image_urls ? p.image_urls[i].thumb : `/static/uploads/${img}`}" width="100">`).join("")}
       </div>
     `;
     container.appendChild(card);
@@ -104,7 +122,7 @@ async function postProperty(event) {
   }
 
   try {
-    const response = await fetch("/api/properties", { method: "POST", body: formData });
+    const response = await fetch("/api/properties?include=list", { method: "POST", body: formData });
 
     let data;
     const contentType = response.headers.get("content-type");
@@ -1,14 +1,22 @@
 // --- Fetch User Properties ---
 async function loadProperties() {
   try {
-    const res = await fetch('/api/myproperties');
-    if (!res.ok) throw new Error("Failed to fetch properties");
-    const data = await res.json();
+    // Follow the API cursor until every page of the owner's listings is loaded
+    let properties = [];
+    let cursor = null;
+    do {
+      const url = cursor ? `/api/myproperties?cursor=${encodeURIComponent(cursor)}` : '/api/myproperties';
+      const res = await fetch(url);
+      if (!res.ok) throw new Error("Failed to fetch properties");
+      const data = await res.json();
+      properties = properties.concat(data.properties || []);
+      cursor = data.next_cursor;
+    } while (cursor);
+
     const list = document.getElementById('propertiesList');
     list.innerHTML = '';
 
     window._propsCache = [];
-    const properties = data.properties || [];
     
     // Show empty state message if no properties
     if (properties.length === 0) {
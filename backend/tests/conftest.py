@@ -0,0 +1,66 @@
+"""Shared fixtures: an in-memory app with one owner, signed in as user 1.
+
+Modules set feature settings by overriding ``app_config``, or wrap
+``app`` in a fixture of the same name for per-feature setup.
+"""
+import pytest
+
+from backend.app import create_app, db
+from backend.models.properties import Property
+from backend.models.users import Users
+
+LISTING = {
+    "full_name": "Owner", "mobile_number": "9999999999", "address": "1 Main St", "city": "Chennai",
+    "area": "Adyar", "district": "Chennai", "property_type": "Flat", "house_type": "2BHK",
+    "rent_price": "12000", "car_parking": "Available", "pets": "Allowed", "facing": "East",
+    "furnishing": "Furnished",
+}
+
+
+@pytest.fixture
+def app_config():
+    return {}
+
+
+@pytest.fixture
+def app(tmp_path, app_config):
+    app = create_app("test", UPLOAD_FOLDER=str(tmp_path), **app_config)
+    with app.app_context():
+        db.create_all()
+        db.session.add(Users(full_name="Owner", email="owner@example.com", mobile_number="9999999999"))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def login(app, user_id):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["user"] = {"user_id": user_id}
+    return client
+
+
+@pytest.fixture
+def client(app):
+    return login(app, 1)
+
+
+@pytest.fixture
+def tenant(app):
+    """A second account (user 2), signed in."""
+    db.session.add(Users(full_name="Tenant", email="tenant@example.com", mobile_number="8888888888"))
+    db.session.commit()
+    return login(app, 2)
+
+
+def create(client, **fields):
+    response = client.post("/api/properties", data={**LISTING, **fields})
+    assert response.status_code == 201
+    return response.get_json()["property_id"]
+
+
+def add_listings(*overrides):
+    """Insert one of user 1's listings per dict of ``overrides`` to LISTING."""
+    db.session.add_all(Property(owner_id=1, **{**LISTING, **fields}) for fields in overrides)
+    db.session.commit()
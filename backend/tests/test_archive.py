@@ -0,0 +1,146 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert, update
+
+from backend import migrations
+from backend.app import db
+from backend.config import Config
+from backend.models.properties import Property
+from backend.models.properties_archive import PropertyArchive
+from backend.models.property_images import PropertyImage
+from backend.models.property_tombstones import PropertyTombstone
+from backend.models.users import Users
+from backend.scripts import archive_listings
+from backend.tests.conftest import LISTING, create
+
+
+@pytest.fixture
+def app_config():
+    return {"ARCHIVE_UNAVAILABLE_DAYS": 90, "ARCHIVE_BATCH_PAUSE": 0}
+
+
+def age(property_id, days, status=None):
+    values = {"updated_at": datetime.utcnow() - timedelta(days=days)}
+    if status:
+        values["status"] = status
+    db.session.execute(update(Property).where(Property.property_id == property_id).values(**values))
+    db.session.commit()
+
+
+def mine(client, **params):
+    response = client.get("/api/myproperties", query_string=params)
+    assert response.status_code == 200
+    return [p["property_id"] for p in response.get_json()["properties"]]
+
+
+def test_archives_long_unavailable_listings_only(app, client):
+    stale, recent, available = create(client), create(client), create(client)
+    db.session.add(PropertyImage(property_id=stale, ordinal=0, storage_key="a" * 64 + ".jpg", width=4, height=3))
+    db.session.commit()
+    age(stale, 120, "Unavailable")
+    age(recent, 30, "Unavailable")
+    age(available, 400)
+    since = client.get("/api/properties/changes").get_json()["next_since"]
+
+    report = app.extensions["listing_archiver"].run()
+    assert report["archived"] == 1 and report["rows_per_second"] > 0
+
+    assert db.session.get(Property, stale) is None
+    assert PropertyImage.query.filter_by(property_id=stale).count() == 0
+    assert sorted(mine(client)) == [recent, available]
+    archived = client.get("/api/myproperties", query_string={"archived": 1}).get_json()["properties"]
+    assert [(p["property_id"], p["images"], p["archived"]) for p in archived] == [(stale, ["a" * 64 + ".jpg"], True)]
+    assert client.get("/api/properties/changes", query_string={"since": since}).get_json()["removed"] == [stale]
+    # Nothing left to do
+    assert app.extensions["listing_archiver"].run()["archived"] == 0
+
+
+def test_setting_the_status_restores_the_listing(app, client, tenant):
+    listing = create(client, rent_price="15000")
+    db.session.add(PropertyImage(property_id=listing, ordinal=0, storage_key="b" * 64 + ".jpg"))
+    db.session.commit()
+    age(listing, 200, "Unavailable")
+    app.extensions["listing_archiver"].run()
+
+    assert tenant.put(f"/api/property/{listing}/status", json={"status": "Available"}).status_code == 404
+
+    since = client.get("/api/properties/changes").get_json()["next_since"]
+    assert client.put(f"/api/property/{listing}/status", json={"status": "Available"}).status_code == 200
+    assert db.session.get(PropertyArchive, listing) is None
+    assert db.session.get(PropertyTombstone, listing) is None
+    restored = client.get(f"/api/property/{listing}").get_json()
+    assert (restored["status"], restored["rent_price"], restored["images"]) == ("Available", "15000.00",
+                                                                             ["b" * 64 + ".jpg"])
+    delta = client.get("/api/properties/changes", query_string={"since": since}).get_json()
+    assert [p["property_id"] for p in delta["changed"]] == [listing] and delta["removed"] == []
+    # Freshly written: the next run leaves it alone
+    assert app.extensions["listing_archiver"].run()["archived"] == 0
+
+
+def test_deleting_an_archived_listing(app, client, tenant):
+    listing = create(client)
+    age(listing, 100, "Unavailable")
+    app.extensions["listing_archiver"].run()
+
+    assert tenant.delete(f"/api/property/{listing}").status_code == 404
+    assert client.delete(f"/api/property/{listing}").status_code == 200
+    assert PropertyArchive.query.count() == 0
+    assert client.get("/api/myproperties", query_string={"archived": 1}).get_json()["properties"] == []
+    assert client.delete(f"/api/property/{listing}").status_code == 404
+
+
+def test_archived_ids_are_not_reused(app, client):
+    older, newest = create(client), create(client)
+    age(newest, 100, "Unavailable")
+    app.extensions["listing_archiver"].run()
+
+    fresh = create(client)
+    batch = client.post("/api/properties/batch", json={"properties": [LISTING, LISTING]}).get_json()
+    assert fresh > newest and min(batch["property_ids"]) > fresh
+    # The archived listing is still the one its id refers to
+    assert client.put(f"/api/property/{newest}/status", json={"status": "Available"}).status_code == 200
+    assert sorted(mine(client)) == [older, newest, fresh, *batch["property_ids"]]
+
+
+def test_expiry_and_batching(app, client):
+    archiver = app.extensions["listing_archiver"]
+    ids = [create(client, address=f"{i} Main St") for i in range(5)]
+    for property_id in ids:
+        age(property_id, 400)
+    assert archiver.run()["archived"] == 0  # expiry is off by default
+
+    archiver.expire_days = 365
+    assert archiver.pending() == 5
+    report = archiver.run(batch_size=2)
+    assert (report["archived"], report["batches"]) == (5, 3)
+    assert PropertyArchive.query.count() == 5 and Property.query.count() == 0
+
+    metrics = client.get("/metrics").get_data(as_text=True)
+    assert "listing_archive_rows_total 5" in metrics
+    assert "listing_archive_rows_per_second" in metrics
+
+
+def test_deleting_the_account_drops_its_archive(app, client):
+    listing = create(client)
+    age(listing, 100, "Unavailable")
+    app.extensions["listing_archiver"].run()
+    assert client.delete("/api/profile").status_code == 200
+    assert PropertyArchive.query.count() == 0
+
+
+def test_archive_command(monkeypatch, tmp_path, capsys):
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", url)
+    engine = create_engine(url)
+    migrations.upgrade(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Users), [{"full_name": "O", "email": "o@example.com", "mobile_number": "9"}])
+        conn.execute(insert(Property), [{**LISTING, "owner_id": 1, "status": "Unavailable",
+                                         "updated_at": datetime.utcnow() - timedelta(days=days)}
+                                        for days in (10, 100, 200)])
+    engine.dispose()
+
+    assert archive_listings.main(["--dry-run"]) == 2
+    assert archive_listings.main(["--unavailable-days", "5", "--pause", "0"])["archived"] == 3
+    assert "archived 3 listing(s)" in capsys.readouterr().out
@@ -0,0 +1,179 @@
+import asyncio
+import contextlib
+import io
+import json
+import threading
+
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.util.concurrency import await_only
+from werkzeug.datastructures import FileStorage, MultiDict
+from werkzeug.security import generate_password_hash
+from werkzeug.test import encode_multipart
+
+import backend.app
+from backend.asgi import create_asgi_app
+from backend.db import db
+from backend.models.properties import Property
+from backend.models.users import Users
+from backend.tests.conftest import LISTING
+from backend.utils.asgi import ASGIAdapter, async_database_uri
+
+pytest.importorskip("aiosqlite")
+
+
+@pytest.fixture
+def asgi_app(tmp_path):
+    # Schema and seed through a sync engine; the app itself only has the async driver
+    uri = f"sqlite:///{tmp_path / 'app.db'}"
+    engine = create_engine(uri)
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Users), [{"full_name": "Owner", "email": "owner@example.com",
+                                      "mobile_number": "9999999999",
+                                      "password_hash": generate_password_hash("secret", "pbkdf2:sha256:1000")}])
+        conn.execute(insert(Property), [{**LISTING, "owner_id": 1, "address": f"{i} Main St", "rent_price": 10000 + i}
+                                        for i in range(5)])
+    engine.dispose()
+    return create_asgi_app("test", SQLALCHEMY_DATABASE_URI=uri, UPLOAD_FOLDER=str(tmp_path))
+
+
+class Result:
+    def __init__(self, messages):
+        start = messages[0]
+        self.status = start["status"]
+        self.headers = {k.decode(): v.decode() for k, v in start["headers"]}
+        self.body = b"".join(m.get("body", b"") for m in messages[1:])
+        self.messages = messages
+
+    def json(self):
+        return json.loads(self.body)
+
+
+async def call(app, method, path, query="", body=b"", headers=()):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "scheme": "http",
+        "method": method, "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "headers": [(k.lower().encode(), v.encode()) for k, v in headers],
+        "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+    }
+    incoming = [{"type": "http.request", "body": body, "more_body": False}]
+    messages = []
+
+    async def receive():
+        return incoming.pop(0) if incoming else {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    return Result(messages)
+
+
+@contextlib.asynccontextmanager
+async def running(app):
+    """Drive the lifespan protocol around a block, as a server would."""
+    inbox, outbox = asyncio.Queue(), asyncio.Queue()
+
+    async def send(message):
+        await outbox.put(message["type"])
+
+    task = asyncio.create_task(app({"type": "lifespan", "asgi": {"version": "3.0"}}, inbox.get, send))
+    await inbox.put({"type": "lifespan.startup"})
+    assert await outbox.get() == "lifespan.startup.complete"
+    try:
+        yield
+    finally:
+        await inbox.put({"type": "lifespan.shutdown"})
+        assert await outbox.get() == "lifespan.shutdown.complete"
+        await task
+
+
+def test_async_database_uri():
+    assert async_database_uri("mysql+pymysql://root:p%40ss@db:3306/broklink") == \
+        "mysql+aiomysql://root:p%40ss@db:3306/broklink"
+    assert async_database_uri("sqlite:////tmp/app.db") == "sqlite+aiosqlite:////tmp/app.db"
+    assert async_database_uri("sqlite+aiosqlite://") == "sqlite+aiosqlite://"
+    with pytest.raises(ValueError):
+        async_database_uri("oracle+cx_oracle://db/app")
+
+
+def test_routes_run_on_the_async_driver(asgi_app):
+    async def scenario():
+        async with running(asgi_app):
+            listings = await call(asgi_app, "GET", "/api/properties")
+            assert listings.status == 200 and len(listings.json()["properties"]) == 5
+
+            stream = await call(asgi_app, "GET", "/api/properties", query="stream=1")
+            assert stream.headers["content-type"].startswith("application/x-ndjson")
+            assert len(stream.body.splitlines()) == 5
+            assert stream.messages[-1]["more_body"] is False
+            with asgi_app.app.app_context():
+                assert db.engine.pool.checkedout() == 0
+
+    asyncio.run(scenario())
+    with asgi_app.app.app_context():
+        assert db.engine.dialect.is_async
+
+
+def test_concurrent_requests_share_the_loop_while_queries_wait(asgi_app):
+    in_flight, peak = [0], [0]
+
+    def slow_round_trip(*args):
+        # Stand-in for network latency to MySQL: suspends this request only
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        await_only(asyncio.sleep(0.02))
+        in_flight[0] -= 1
+
+    with asgi_app.app.app_context():
+        event.listen(db.engine, "before_cursor_execute", slow_round_trip)
+
+    async def scenario():
+        async with running(asgi_app):
+            return await asyncio.gather(*(call(asgi_app, "GET", f"/api/property/{1 + i % 5}") for i in range(10)))
+
+    results = asyncio.run(scenario())
+    assert [r.status for r in results] == [200] * 10
+    assert peak[0] > 1
+
+
+def test_uploads_and_hashing_leave_the_loop(asgi_app, monkeypatch):
+    threads = []
+    real_save_upload = backend.app.save_upload
+
+    def save_upload(*args):
+        threads.append(threading.current_thread().name)
+        return real_save_upload(*args)
+
+    monkeypatch.setattr(backend.app, "save_upload", save_upload)
+
+    async def scenario():
+        async with running(asgi_app):
+            login = await call(asgi_app, "POST", "/auth/login", headers=[("Content-Type", "application/json")],
+                               body=json.dumps({"identifier": "owner@example.com", "password": "secret"}).encode())
+            assert login.status == 200
+            cookie = login.headers["set-cookie"].split(";", 1)[0]
+
+            form = MultiDict(LISTING)
+            form.add("images", FileStorage(io.BytesIO(b"\x89PNG\r\n\x1a\nfake"), "a.png", content_type="image/png"))
+            boundary, body = encode_multipart(form)
+            return await call(asgi_app, "POST", "/api/properties", body=body, headers=[
+                ("Content-Type", f"multipart/form-data; boundary={boundary}"), ("Cookie", cookie)])
+
+    created = asyncio.run(scenario())
+    assert created.status == 201, created.body
+    assert threads and threads[0].startswith("asgi-blocking")
+
+
+def test_failure_before_the_response_is_a_500():
+    app = Flask(__name__)
+    app.config["TESTING"] = True  # exceptions propagate to the server
+
+    @app.route("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    result = asyncio.run(call(ASGIAdapter(app), "GET", "/boom"))
+    assert result.status == 500 and result.body == b"Internal Server Error"
@@ -0,0 +1,80 @@
+import gzip
+import os
+import shutil
+
+import pytest
+
+from backend.app import create_app
+from backend.utils.assets import build_assets, minify_css, minify_js
+
+STATIC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+
+
+@pytest.fixture
+def static_copy(tmp_path):
+    folder = tmp_path / "static"
+    for top in ("css", "js", "img"):
+        shutil.copytree(os.path.join(STATIC, top), folder / top)
+    return folder
+
+
+def test_minify_css():
+    source = 'a  >  b { color: red ; /* note */ content: "a  ;  b" }\n.x :hover , .y { margin : 0 }'
+    assert minify_css(source) == 'a>b{color:red;content:"a  ;  b"}.x :hover,.y{margin :0}'
+
+
+def test_minify_js_keeps_strings_and_line_breaks():
+    source = (
+        "function f(a) {\n"
+        "    // comment\n"
+        "    var url = 'http://x/y';  /* inline */ var t = `a  ${ {b: 1}.b }  // kept`;\n"
+        "    return a / 2 + /\\/[/]/g.test(url)\n"
+        "}\n"
+    )
+    assert minify_js(source) == (
+        "function f(a) {\n"
+        "var url = 'http://x/y'; var t = `a  ${ {b: 1}.b }  // kept`;\n"
+        "return a / 2 + /\\/[/]/g.test(url)\n"
+        "}\n"
+    )
+
+
+def test_build_writes_fingerprinted_files_and_manifest(static_copy):
+    manifest = build_assets(str(static_copy))
+    target = manifest["assets"]["css/style.css"]
+    assert target.startswith("dist/css/style.") and target.endswith(".css")
+    built = (static_copy / target).read_bytes()
+    assert len(built) < (static_copy / "css/style.css").stat().st_size
+    assert gzip.decompress((static_copy / (target + ".gz")).read_bytes()) == built
+    assert "gzip" in manifest["encodings"][target]
+
+    logo = manifest["assets"]["img/logo.png"]
+    assert logo not in manifest["encodings"]  # already compressed
+    assert build_assets(str(static_copy))["assets"] == manifest["assets"]  # same input, same names
+
+
+def test_templates_use_the_manifest(static_copy, tmp_path):
+    manifest = build_assets(str(static_copy))
+    app = create_app("test", UPLOAD_FOLDER=str(tmp_path), ASSET_MANIFEST=str(static_copy / "dist" / "manifest.json"))
+    app.static_folder = str(static_copy)
+    client = app.test_client()
+
+    page = client.get("/login").get_data(as_text=True)
+    css = manifest["assets"]["css/style.css"]
+    assert f"/static/{css}" in page and "/static/css/style.css" not in page
+
+    response = client.get(f"/static/{css}", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert response.mimetype == "text/css"
+    assert gzip.decompress(response.data) == (static_copy / css).read_bytes()
+    response.close()
+
+    plain = client.get(f"/static/{css}")
+    assert "Content-Encoding" not in plain.headers and plain.data == (static_copy / css).read_bytes()
+    plain.close()
+
+
+def test_without_a_build_templates_use_plain_files(tmp_path):
+    app = create_app("test", UPLOAD_FOLDER=str(tmp_path), ASSET_MANIFEST=str(tmp_path / "missing.json"))
+    assert "/static/css/style.css" in app.test_client().get("/login").get_data(as_text=True)
@@ -0,0 +1,26 @@
+import json
+
+from backend.benchmarks import bench_endpoints
+
+
+def test_benchmark_smoke_run(tmp_path):
+    out = tmp_path / "results.json"
+    bench_endpoints.main([
+        "--users", "5", "--properties", "50", "--requests", "5", "--warmup", "1",
+        "--scenarios", "list,list_filtered,myproperties,create", "--concurrency", "2", "--out", str(out),
+    ])
+
+    report = json.loads(out.read_text())
+    assert set(report["results"]) == {"client", "server"}
+    for rows in report["results"].values():
+        assert set(rows) == {"list", "list_filtered", "myproperties", "create"}
+        for row in rows.values():
+            assert row["errors"] == 0
+            assert row["p50_ms"] <= row["p95_ms"] <= row["p99_ms"]
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert bench_endpoints.percentile(values, 50) == 50
+    assert bench_endpoints.percentile(values, 99) == 99
+    assert bench_endpoints.percentile([7], 95) == 7
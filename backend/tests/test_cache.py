@@ -0,0 +1,48 @@
+import json
+import time
+
+import pytest
+from backend.tests.conftest import add_listings
+from backend.utils.cache import LRUCache, normalize_filters
+
+
+@pytest.fixture
+def app(app):
+    add_listings(*({"city": city, "district": city} for city in ("Chennai", "Madurai", "Chennai")))
+    return app
+
+
+def test_lru_evicts_oldest_and_expires():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    cache.get("a")
+    cache.set("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.evictions == 1
+
+    cache.set("d", b"4", ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("d") is None
+    assert cache.expirations == 1
+
+
+def test_normalize_filters_is_order_insensitive():
+    a = json.dumps({"cities": ["Madurai", "Chennai"], "bhk": [], "pets": ""})
+    b = json.dumps({"cities": ["Chennai", "Madurai"]})
+    assert normalize_filters(a) == normalize_filters(b)
+    assert normalize_filters("not json") == normalize_filters(None) == ""
+
+
+def test_listing_cache_hits_and_invalidates_on_write(client):
+    url = '/api/properties?filters={"cities":["Chennai"]}'
+    first = client.get(url).get_json()
+    assert client.get(url).get_json() == first
+    stats = client.get("/api/properties/cache-stats").get_json()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    client.put(f"/api/property/{first['properties'][0]['property_id']}/status", json={"status": "Unavailable"})
+    after = client.get(url).get_json()
+    assert len(after["properties"]) == len(first["properties"]) - 1
+    assert client.get("/api/properties/cache-stats").get_json()["misses"] == 2
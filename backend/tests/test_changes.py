@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+from backend.app import db
+from backend.models.property_tombstones import PropertyTombstone
+from backend.tests.conftest import LISTING, create
+from backend.utils.changes import decode_change_token, encode_change_token
+
+
+def feed(client, since=None, **params):
+    if since:
+        params["since"] = since
+    response = client.get("/api/properties/changes", query_string=params)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_token_round_trip():
+    assert decode_change_token(encode_change_token(7)) == (7, None)
+    assert decode_change_token(encode_change_token(7, 42)) == (7, 42)
+    with pytest.raises(ValueError):
+        decode_change_token("bm9wZQ")
+
+
+def test_feed_reports_inserts_updates_unavailable_and_deletes(client):
+    first, second = create(client), create(client, city="Madurai")
+    sync = feed(client)
+    assert [p["property_id"] for p in sync["changed"]] == [first, second] and sync["removed"] == []
+    token = sync["next_since"]
+    assert feed(client, token) == {"changed": [], "removed": [], "next_since": token, "has_more": False}
+
+    third = create(client)
+    client.put(f"/api/property/{first}", json={"rent_price": 9000})
+    client.put(f"/api/property/{second}/status", json={"status": "Unavailable"})
+    delta = feed(client, token)
+    changed = [(p["property_id"], p["rent_price"]) for p in delta["changed"]]
+    assert changed == [(third, "12000.00"), (first, "9000.00")]
+    assert delta["removed"] == [second]
+
+    client.delete(f"/api/property/{third}")
+    delta = feed(client, delta["next_since"])
+    assert delta["changed"] == [] and delta["removed"] == [third]
+    assert db.session.get(PropertyTombstone, third).owner_id == 1
+
+
+def test_filters_and_owner_scope(client):
+    token = feed(client)["next_since"]
+    chennai = create(client)
+    madurai = create(client, city="Madurai")
+    client.put(f"/api/property/{chennai}/status", json={"status": "Unavailable"})
+
+    filtered = feed(client, token, filters=json.dumps({"cities": ["Madurai"]}))
+    assert [p["property_id"] for p in filtered["changed"]] == [madurai] and filtered["removed"] == [chennai]
+
+    mine = feed(client, token, mine=1)
+    assert [(p["property_id"], p["status"]) for p in mine["changed"]] == [(madurai, "Available"),
+                                                                           (chennai, "Unavailable")]
+    assert "mobile_number" in mine["changed"][0]
+
+
+def test_pages_split_inside_a_batch(client):
+    token = feed(client)["next_since"]
+    items = [{**LISTING, "rent_price": 1000 + i} for i in range(5)]
+    ids = client.post("/api/properties/batch", json={"properties": items}).get_json()["property_ids"]
+
+    seen, since = [], token
+    while True:
+        page = feed(client, since, limit=2)
+        seen += [p["property_id"] for p in page["changed"]]
+        since = page["next_since"]
+        if not page["has_more"]:
+            break
+    assert seen == ids
+    assert feed(client, since)["changed"] == []
+
+
+def test_account_deletion_tombstones_listings(client):
+    listing = create(client)
+    token = feed(client)["next_since"]
+    assert client.delete("/api/profile").status_code == 200
+    anonymous = client.application.test_client()
+    assert feed(anonymous, token)["removed"] == [listing]
+
+
+def test_unchanged_poll_is_not_modified(client):
+    create(client)
+    token = feed(client)["next_since"]
+    first = client.get("/api/properties/changes", query_string={"since": token})
+    again = client.get("/api/properties/changes", query_string={"since": token},
+                       headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+
+
+def test_bad_arguments(client):
+    assert client.get("/api/properties/changes?since=garbage").status_code == 400
+    assert client.get("/api/properties/changes?limit=0").status_code == 400
+    assert client.application.test_client().get("/api/properties/changes?mine=1").status_code == 401
@@ -0,0 +1,73 @@
+import gzip
+
+import pytest
+from sqlalchemy import update
+
+from backend.app import create_app, db
+from backend.models.properties import Property
+from backend.tests.conftest import add_listings
+from backend.utils.invalidation import listings_changed
+
+
+@pytest.fixture
+def app(app):
+    add_listings(*({} for _ in range(20)))
+    return app
+
+
+def test_json_is_gzipped_when_accepted(app):
+    client = app.test_client()
+    plain = client.get("/api/properties")
+    assert "Content-Encoding" not in plain.headers and "Accept-Encoding" in plain.headers["Vary"]
+
+    response = client.get("/api/properties", headers={"Accept-Encoding": "gzip, deflate"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert int(response.headers["Content-Length"]) < len(plain.data) / 4
+    assert gzip.decompress(response.data) == plain.data
+    assert response.headers["ETag"] == plain.headers["ETag"]
+
+    text = client.get("/metrics").get_data(as_text=True)
+    assert 'http_compressed_responses_total{encoding="gzip"} 1' in text
+
+
+def test_cached_page_is_not_recompressed(app, monkeypatch):
+    compressor = app.extensions["compression"]
+    client = app.test_client()
+    first = client.get("/api/properties", headers={"Accept-Encoding": "gzip"})
+    monkeypatch.setattr("backend.utils.compression.compress", pytest.fail)
+    second = client.get("/api/properties", headers={"Accept-Encoding": "gzip"})
+    assert second.data == first.data and compressor.responses == {"gzip": 2}
+
+
+def test_body_change_under_the_same_etag_is_recompressed(app):
+    client = app.test_client()
+    first = client.get("/api/properties", headers={"Accept-Encoding": "gzip"})
+    # Rewritten without a TableVersion bump, as the image pipeline does
+    with app.app_context():
+        db.session.execute(update(Property).values(city="Madurai"))
+        db.session.commit()
+        listings_changed()
+
+    second = client.get("/api/properties", headers={"Accept-Encoding": "gzip"})
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert gzip.decompress(second.data) == client.get("/api/properties").data
+    assert b"Madurai" in gzip.decompress(second.data)
+
+
+def test_small_refused_and_html_bodies(app):
+    client = app.test_client()
+    # Below COMPRESS_MIN_SIZE
+    assert "Content-Encoding" not in client.get("/api/session", headers={"Accept-Encoding": "gzip"}).headers
+    # Explicitly refused
+    refused = client.get("/api/properties", headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert "Content-Encoding" not in refused.headers
+
+    page = client.get("/explore", headers={"Accept-Encoding": "gzip"})
+    assert page.headers["Content-Encoding"] == "gzip" and b"<html" in gzip.decompress(page.data).lower()
+
+
+def test_disabled(tmp_path):
+    app = create_app("test", UPLOAD_FOLDER=str(tmp_path), COMPRESSION_ENABLED=False)
+    page = app.test_client().get("/explore", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in page.headers and "compression" not in app.extensions
@@ -0,0 +1,61 @@
+import pytest
+from backend.app import db
+from backend.models.users import Users
+from backend.tests.conftest import add_listings
+
+
+@pytest.fixture
+def app(app):
+    add_listings({})
+    return app
+
+
+@pytest.mark.parametrize("url", ["/api/properties", "/api/myproperties", "/api/profile"])
+def test_if_none_match_returns_304(client, url):
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    second = client.get(url, headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.data == b""
+    assert second.headers["ETag"] == etag
+
+
+def test_listing_etag_changes_after_write(client):
+    etag = client.get("/api/properties").headers["ETag"]
+    client.put("/api/property/1", json={"rent_price": 15000})
+
+    response = client.get("/api/properties", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.get_json()["properties"][0]["rent_price"].startswith("15000")
+
+
+def test_profile_etag_changes_after_update(client):
+    etag = client.get("/api/profile").headers["ETag"]
+    client.put("/api/profile", json={"full_name": "Renamed"})
+
+    response = client.get("/api/profile", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.get_json()["full_name"] == "Renamed"
+
+
+def test_if_modified_since(client):
+    client.put("/api/property/1", json={"rent_price": 13000})
+    last_modified = client.get("/api/properties").headers["Last-Modified"]
+    response = client.get("/api/properties", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+
+def test_profile_etag_ignores_other_accounts(app, client):
+    etag = client.get("/api/profile").headers["ETag"]
+    with app.app_context():
+        db.session.add(Users(full_name="Other", email="other@example.com", mobile_number="8888888888"))
+        db.session.commit()
+    other = app.test_client()
+    with other.session_transaction() as sess:
+        sess["user"] = {"user_id": 2}
+    other.put("/api/profile", json={"full_name": "Renamed"})
+
+    assert client.get("/api/profile", headers={"If-None-Match": etag}).status_code == 304
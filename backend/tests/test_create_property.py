@@ -0,0 +1,81 @@
+from backend.app import db
+from backend.models.properties import Property
+from backend.tests.conftest import LISTING
+
+
+def test_create_returns_only_new_resource(client):
+    client.post("/api/properties", data=LISTING)
+    response = client.post("/api/properties", data=LISTING)
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body["property"]["property_id"] == body["property_id"] == 2
+    assert "properties" not in body
+    assert response.headers["Location"].endswith("/api/property/2")
+    assert client.get(response.headers["Location"]).get_json()["city"] == "Chennai"
+
+
+def test_create_include_list(client):
+    client.post("/api/properties", data=LISTING)
+    body = client.post("/api/properties?include=list", data=LISTING).get_json()
+    assert [p["property_id"] for p in body["properties"]] == [2, 1]
+
+
+def test_create_rejects_bad_enum(client):
+    response = client.post("/api/properties", data={**LISTING, "pets": "Cats only"})
+    assert response.status_code == 400
+
+
+def test_update_is_validated_before_it_is_applied(app, client):
+    listing = client.post("/api/properties", data=LISTING).get_json()["property_id"]
+    for bad in ({"pets": "Cats only"}, {"car_parking": "Maybe"}, {"city": ""}, {"rent_price": "-5"},
+                {"city": "Madurai", "latitude": "13.0"}):
+        assert client.put(f"/api/property/{listing}", json=bad).status_code == 400
+    assert client.put(f"/api/property/{listing}", json={"pets": "Any", "facing": None}).status_code == 200
+    with app.app_context():
+        prop = db.session.get(Property, listing)
+        assert (prop.city, prop.pets, prop.facing) == ("Chennai", "Any", "East")
+
+
+def test_batch_create(app, client):
+    items = [{**LISTING, "address": f"{i} Main St"} for i in range(25)]
+    response = client.post("/api/properties/batch", json={"properties": items})
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body["created"] == 25
+    assert body["property_ids"] == list(range(1, 26))
+    with app.app_context():
+        assert Property.query.count() == 25
+
+
+def test_batch_is_all_or_nothing(app, client):
+    items = [LISTING, {**LISTING, "rent_price": None}]
+    response = client.post("/api/properties/batch", json={"properties": items})
+
+    assert response.status_code == 400
+    assert response.get_json()["index"] == 1
+    with app.app_context():
+        assert Property.query.count() == 0
+
+
+def test_non_finite_rent_is_rejected(app, client):
+    for rent in ("nan", "inf", "-inf", "-1"):
+        assert client.post("/api/properties", data={**LISTING, "rent_price": rent}).status_code == 400
+        response = client.post("/api/properties/batch", json={"properties": [{**LISTING, "rent_price": rent}]})
+        assert response.status_code == 400
+    listing = client.post("/api/properties", data=LISTING).get_json()["property_id"]
+    assert client.put(f"/api/property/{listing}", json={"rent_price": "nan"}).status_code == 400
+    with app.app_context():
+        assert Property.query.count() == 1
+
+
+def test_database_errors_are_not_echoed(app, client, monkeypatch):
+    def fail():
+        raise RuntimeError("secret table detail")
+
+    monkeypatch.setattr(db.session, "commit", fail)
+    for response in (client.post("/api/properties", data=LISTING),
+                     client.post("/api/properties/batch", json={"properties": [LISTING]})):
+        assert response.status_code == 500
+        assert "secret" not in response.get_data(as_text=True)
@@ -0,0 +1,39 @@
+import pytest
+from backend.tests.conftest import add_listings
+
+
+@pytest.fixture
+def app(app):
+    add_listings(
+        {},
+        {"area": "Velachery", "rent_price": 4500, "house_type": "1BHK"},
+        {"city": "Tambaram", "district": "Chengalpattu", "area": "West Tambaram"},
+        {"status": "Unavailable", "house_type": "3BHK"},
+    )
+    return app
+
+
+def test_facets_counts_available_listings(client):
+    data = client.get("/api/properties/facets").get_json()
+
+    districts = {d["value"]: d for d in data["districts"]}
+    assert districts["Chennai"]["count"] == 2
+    chennai = districts["Chennai"]["cities"][0]
+    assert chennai["value"] == "Chennai"
+    assert {a["value"]: a["count"] for a in chennai["areas"]} == {"Adyar": 1, "Velachery": 1}
+
+    assert {h["value"]: h["count"] for h in data["house_type"]} == {"1BHK": 1, "2BHK": 2}
+    assert data["rent_price"]["buckets"] == [
+        {"min": 0, "max": 5000, "count": 1},
+        {"min": 10000, "max": 15000, "count": 2},
+    ]
+
+
+def test_facets_refresh_after_writes(client):
+    assert {h["value"] for h in client.get("/api/properties/facets").get_json()["house_type"]} == {"1BHK", "2BHK"}
+
+    client.put("/api/property/4/status", json={"status": "Available"})
+    assert {h["value"] for h in client.get("/api/properties/facets").get_json()["house_type"]} == {"1BHK", "2BHK", "3BHK"}
+
+    client.delete("/api/property/2")
+    assert {h["value"] for h in client.get("/api/properties/facets").get_json()["house_type"]} == {"2BHK", "3BHK"}
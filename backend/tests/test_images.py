@@ -0,0 +1,42 @@
+import io
+
+import pytest
+from backend.models.image_variants import ImageVariant
+from backend.tests.conftest import LISTING
+
+PIL = pytest.importorskip("PIL")
+from PIL import Image  # noqa: E402
+
+
+def jpeg_with_exif(size=(3000, 2000)):
+    exif = Image.Exif()
+    exif[0x010F] = "SecretCam"  # Make
+    buf = io.BytesIO()
+    Image.new("RGB", size, "orange").save(buf, "JPEG", exif=exif.tobytes())
+    buf.seek(0)
+    return buf
+
+
+def test_upload_builds_variants_in_background(app, client, tmp_path):
+    response = client.post("/api/properties", data={**LISTING, "images": (jpeg_with_exif(), "house.jpg")})
+    assert response.status_code == 201
+    created = response.get_json()["property"]
+    stored = created["images"][0]
+    assert stored != "house.jpg" and stored.endswith(".jpg")
+    assert created["image_urls"][0]["thumb"] == "/static/uploads/" + stored  # not processed yet
+
+    app.extensions["image_pipeline"].wait()
+
+    with app.app_context():
+        variants = {v.variant: v for v in ImageVariant.query.filter_by(source=stored)}
+    assert set(variants) == {"thumb", "medium", "full"}
+    assert (variants["thumb"].width, variants["thumb"].height) == (400, 267)
+    assert variants["full"].width == 2048
+
+    with Image.open(tmp_path / variants["thumb"].filename) as thumb:
+        assert "exif" not in thumb.info
+
+    listing = client.get("/api/properties").get_json()["properties"][0]
+    assert listing["images"] == [stored]
+    assert listing["image_urls"][0]["thumb"] == "/static/uploads/" + variants["thumb"].filename
+    assert listing["image_urls"][0]["original"] == "/static/uploads/" + stored
@@ -0,0 +1,91 @@
+import logging
+
+import pytest
+from flask import jsonify
+
+from backend.app import create_app, db
+from backend.models.properties import Property
+from backend.tests.conftest import LISTING
+from backend.utils.instrumentation import normalize_statement
+
+
+@pytest.fixture
+def app_config(tmp_path):
+    return {"SERVER_TIMING_HEADER": True, "PROFILE_DIR": str(tmp_path / "profiles")}
+
+
+@pytest.fixture
+def app(app):
+    @app.route("/test/n-plus-one")
+    def n_plus_one():
+        # One query per listing, the pattern the detector exists for
+        ids = [pid for (pid,) in Property.query.with_entities(Property.property_id)]
+        return jsonify([db.session.get(Property, pid, populate_existing=True).city for pid in ids])
+
+    db.session.add_all(Property(owner_id=1, **LISTING) for _ in range(6))
+    db.session.commit()
+    return app
+
+
+def metric(text, name, **labels):
+    wanted = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    for line in text.splitlines():
+        if line.startswith(f"{name}{{{wanted}}} "):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+def test_metrics_aggregate_requests(app):
+    client = app.test_client()
+    for _ in range(3):
+        assert client.get("/api/properties").status_code == 200
+
+    response = client.get("/metrics")
+    assert response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+    endpoint = "property_routes.get_properties"
+    assert metric(text, "http_requests_total", endpoint=endpoint, method="GET", status="200") == 3
+    assert metric(text, "http_request_duration_seconds_count", endpoint=endpoint) == 3
+    assert metric(text, "http_request_duration_seconds_bucket", endpoint=endpoint, le="+Inf") == 3
+    assert metric(text, "db_statements_total", endpoint=endpoint) >= 3
+    assert metric(text, "http_response_size_bytes_total", endpoint=endpoint) > 0
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    assert 'endpoint="metrics"' not in text
+
+
+def test_server_timing_header(app):
+    response = app.test_client().get("/api/properties")
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=") and "serialize;dur=" in timing and "total;dur=" in timing
+
+
+def test_flags_n_plus_one(app, caplog):
+    client = app.test_client()
+    with caplog.at_level(logging.WARNING, logger="backend"):
+        client.get("/test/n-plus-one")
+    assert any("possible N+1 endpoint=n_plus_one count=6" in r.getMessage() for r in caplog.records)
+
+    client.get("/api/properties")
+    text = client.get("/metrics").get_data(as_text=True)
+    assert metric(text, "n_plus_one_requests_total", endpoint="n_plus_one") == 1
+    assert metric(text, "n_plus_one_requests_total", endpoint="property_routes.get_properties") is None
+
+
+def test_sampled_profiles_are_written(app, tmp_path, monkeypatch):
+    monkeypatch.setattr("backend.utils.instrumentation.random.random", lambda: 0.0)
+    assert app.config["PROFILE_SAMPLE_RATE"] == 0  # off unless configured
+    assert not (tmp_path / "profiles").exists()
+
+    sampled = create_app("test", PROFILE_SAMPLE_RATE=1.0, PROFILE_DIR=str(tmp_path / "profiles"))
+    with sampled.app_context():
+        db.create_all()
+        sampled.test_client().get("/api/properties/facets")
+        db.session.remove()
+    profiles = list((tmp_path / "profiles").glob("*.prof"))
+    assert len(profiles) == 1 and "property_facets" in profiles[0].name
+
+
+def test_normalize_statement_collapses_in_lists():
+    a = normalize_statement("SELECT * FROM t\n WHERE id IN (?, ?, ?)")
+    b = normalize_statement("SELECT * FROM t WHERE id IN (?)")
+    assert a == b == "SELECT * FROM t WHERE id IN (?)"
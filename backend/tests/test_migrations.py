@@ -0,0 +1,117 @@
+import importlib
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from backend import migrations
+from backend.app import create_app, db
+from backend.config import Config
+from backend.scripts import migrate
+
+
+def schema(engine):
+    inspector = inspect(engine)
+    return {
+        table: (
+            {c["name"] for c in inspector.get_columns(table)},
+            {i["name"] for i in inspector.get_indexes(table)},
+        )
+        for table in inspector.get_table_names() if table != "schema_migrations"
+    }
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    yield engine
+    engine.dispose()
+
+
+def test_upgrade_builds_the_model_schema(engine, tmp_path):
+    assert migrations.upgrade(engine) == migrations.available()
+    assert migrations.upgrade(engine) == []
+    assert migrations.pending(engine) == []
+
+    models = create_engine(f"sqlite:///{tmp_path / 'models.db'}")
+    db.metadata.create_all(models)
+    assert schema(engine) == schema(models)
+    models.dispose()
+
+
+def test_upgrade_adopts_a_create_all_database(engine):
+    db.metadata.create_all(engine)
+    assert migrations.upgrade(engine)[0] == "0001_initial_schema"
+
+
+def test_unknown_target(engine):
+    with pytest.raises(ValueError):
+        migrations.upgrade(engine, target="9999_nope")
+
+
+def test_create_app_has_no_side_effects(tmp_path):
+    uploads = tmp_path / "uploads"
+    app = create_app("test", SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'app.db'}", UPLOAD_FOLDER=str(uploads))
+    with app.app_context():
+        assert inspect(db.engine).get_table_names() == []
+        db.engine.dispose()
+    assert not uploads.exists()
+    # The archive job only runs in workers that opt in
+    assert create_app(SQLALCHEMY_DATABASE_URI="sqlite://").extensions["listing_archiver"]._thread is None
+
+
+def test_migrate_command(monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'app.db'}")
+    assert migrate.main(["status"]) == migrations.available()
+    assert migrate.main([]) == migrations.available()
+    assert migrate.main(["status"]) == []
+    assert "applied  0001_initial_schema" in capsys.readouterr().out
+
+
+def test_change_feed_columns_backfill_existing_rows(engine):
+    migrations.upgrade(engine, target="0001_initial_schema")
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO users (user_id, full_name, email, mobile_number) VALUES (1, 'O', 'o@x', '9')"))
+        conn.execute(text(
+            "INSERT INTO properties (owner_id, full_name, mobile_number, address, city, area, district,"
+            " property_type, house_type, rent_price, car_parking, pets, facing, furnishing, created_at)"
+            " VALUES (1, 'O', '9', 'a', 'c', 'a', 'd', 'Flat', '2BHK', 1, 'Any', 'Any', 'E', 'F', '2024-01-01')"
+        ))
+    assert migrations.upgrade(engine)[0] == "0002_listing_change_feed"
+    with engine.connect() as conn:
+        row = conn.execute(text("SELECT updated_at, change_seq FROM properties")).one()
+    assert tuple(row) == ("2024-01-01", 0)
+
+
+def test_location_columns_reach_databases_without_them(engine):
+    migrations.upgrade(engine, target="0004_properties_archive")
+    assert "geohash" not in schema(engine)["properties"][0]
+    assert migrations.upgrade(engine, target="0005_listing_location") == ["0005_listing_location"]
+    columns, indexes = schema(engine)["properties"]
+    assert {"latitude", "longitude", "geohash"} <= columns and "ix_properties_status_geohash" in indexes
+
+
+def test_upgrade_brings_a_baseline_database_up_to_date(engine, tmp_path):
+    # What the app's startup create_all built before migrations existed
+    importlib.import_module("backend.migrations.0001_initial_schema").metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO users (user_id, full_name, email, mobile_number) VALUES (1, 'O', 'o@x', '9')"))
+        conn.execute(text(
+            "INSERT INTO properties (owner_id, full_name, mobile_number, address, city, area, district,"
+            " property_type, house_type, rent_price, car_parking, pets, facing, furnishing, images, status,"
+            " created_at) VALUES (1, 'O', '9', 'a', 'c', 'a', 'd', 'Flat', '2BHK', 1, 'Any', 'Any', 'E', 'F',"
+            " 'x.jpg,y.jpg,x.jpg', 'Available', '2024-01-01')"
+        ))
+
+    assert migrations.upgrade(engine) == migrations.available()
+    models = create_engine(f"sqlite:///{tmp_path / 'models.db'}")
+    db.metadata.create_all(models)
+    assert schema(engine) == schema(models)
+    models.dispose()
+
+    app = create_app("test", SQLALCHEMY_DATABASE_URI=str(engine.url), UPLOAD_FOLDER=str(tmp_path))
+    with app.app_context():
+        response = app.test_client().get("/api/properties")
+        assert response.status_code == 200
+        assert response.get_json()["properties"][0]["images"] == ["x.jpg", "y.jpg"]
+        db.session.remove()
+        db.engine.dispose()
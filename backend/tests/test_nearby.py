@@ -0,0 +1,110 @@
+import json
+import random
+
+import pytest
+
+from backend.app import db
+from backend.models.properties import Property
+from backend.tests.conftest import LISTING
+from backend.utils.geo import (
+    bounding_box, covering_ranges, encode_geohash, haversine_km, location_fields, nearby_listings,
+)
+from backend.utils.serializers import PROPERTY_FIELDS
+
+ADYAR = (13.0012, 80.2565)
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def add_listing(lat=None, lng=None, **extra):
+    prop = Property(owner_id=1, **{**LISTING, **extra}, **location_fields({"latitude": lat, "longitude": lng}))
+    db.session.add(prop)
+    db.session.commit()
+    return prop.property_id
+
+
+def test_geohash_matches_reference():
+    assert encode_geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert encode_geohash(*ADYAR).startswith(encode_geohash(*ADYAR, 5))
+
+
+def test_covering_ranges_contain_every_point_in_the_box():
+    rng = random.Random(3)
+    for _ in range(200):
+        lat, lng, radius = rng.uniform(8, 13), rng.uniform(76, 80), rng.choice([0.5, 3, 10, 50])
+        box = bounding_box(lat, lng, radius)
+        ranges = covering_ranges(box)
+        for _ in range(20):
+            point = encode_geohash(rng.uniform(box[0], box[2]), rng.uniform(box[1], box[3]))
+            assert any(low <= point and (high is None or point < high) for low, high in ranges)
+
+
+def test_covering_range_bounds_are_base32_cells():
+    for box in (bounding_box(*ADYAR, 3), bounding_box(*ADYAR, 50), (80.0, 170.0, 90.0, 180.0)):
+        for low, high in covering_ranges(box):
+            assert set(low) <= set(BASE32) and (high is None or set(high) <= set(BASE32))
+            assert high is None or len(high) == len(low) and low < high
+    # The cell in the far north-east corner has nothing after it
+    assert covering_ranges((89.99, 179.99, 90.0, 180.0))[-1][1] is None
+
+
+def test_nearby_returns_listings_in_radius_nearest_first(client):
+    far = add_listing(13.0827, 80.2707)  # Chennai Central, ~9 km away
+    near = add_listing(13.0067, 80.2570)  # ~0.6 km
+    nearest = add_listing(13.0020, 80.2560)  # ~0.1 km
+    add_listing()  # no location
+
+    body = client.get("/api/properties/nearby", query_string={"lat": ADYAR[0], "lng": ADYAR[1]}).get_json()
+    assert [r["property_id"] for r in body["results"]] == [nearest, near]
+    assert body["results"][0]["distance_km"] < body["results"][1]["distance_km"] < 3
+    assert body["has_more"] is False
+
+    body = client.get("/api/properties/nearby",
+                      query_string={"lat": ADYAR[0], "lng": ADYAR[1], "radius_km": 10, "limit": 2}).get_json()
+    assert [r["property_id"] for r in body["results"]] == [nearest, near]
+    assert body["has_more"] is True
+    assert far not in [r["property_id"] for r in body["results"]]
+
+
+def test_nearby_honours_filters_and_fields(client):
+    add_listing(13.0020, 80.2560, house_type="1BHK")
+    two_bhk = add_listing(13.0067, 80.2570)
+
+    body = client.get("/api/properties/nearby", query_string={
+        "lat": ADYAR[0], "lng": ADYAR[1], "filters": json.dumps({"bhk": ["2BHK"]}), "fields": "rent_price",
+    }).get_json()
+    assert body["results"] == [{"property_id": two_bhk, "rent_price": "12000.00", "distance_km": 0.614}]
+
+
+def test_nearby_matches_brute_force(app):
+    rng = random.Random(11)
+    points = [(rng.uniform(12.8, 13.2), rng.uniform(80.0, 80.4)) for _ in range(400)]
+    db.session.add_all(Property(owner_id=1, **LISTING, **location_fields({"latitude": lat, "longitude": lng}))
+                       for lat, lng in points)
+    db.session.commit()
+
+    for radius in (1, 3, 8):
+        rows, distances, _ = nearby_listings(*ADYAR, radius, None, PROPERTY_FIELDS, 1000)
+        expected = sorted(i + 1 for i, (lat, lng) in enumerate(points) if haversine_km(*ADYAR, lat, lng) <= radius)
+        assert sorted(row.property_id for row in rows) == expected
+        assert list(distances.values()) == sorted(distances.values())
+
+
+@pytest.mark.parametrize("args", [
+    {}, {"lat": "abc", "lng": "80"}, {"lat": "95", "lng": "80"},
+    {"lat": "13", "lng": "80", "radius_km": "0"}, {"lat": "13", "lng": "80", "radius_km": "500"},
+])
+def test_nearby_rejects_bad_arguments(client, args):
+    assert client.get("/api/properties/nearby", query_string=args).status_code == 400
+
+
+def test_create_and_update_location(client):
+    created = client.post("/api/properties", data={**LISTING, "latitude": "13.0012", "longitude": "80.2565"})
+    property_id = created.get_json()["property_id"]
+    assert db.session.get(Property, property_id).geohash == encode_geohash(*ADYAR)
+
+    assert client.post("/api/properties", data={**LISTING, "latitude": "13.0"}).status_code == 400
+    assert client.put(f"/api/property/{property_id}", json={"latitude": 200, "longitude": 0}).status_code == 400
+
+    client.put(f"/api/property/{property_id}", json={"latitude": 13.0827, "longitude": 80.2707})
+    db.session.expire_all()
+    assert db.session.get(Property, property_id).geohash == encode_geohash(13.0827, 80.2707)
@@ -0,0 +1,53 @@
+import pytest
+from backend.tests.conftest import add_listings
+from backend.utils.pagination import encode_cursor, decode_cursor
+
+
+@pytest.fixture
+def app(app):
+    add_listings(*({"address": f"{i} Main St", "rent_price": 10000 + i,
+                    "status": "Unavailable" if i == 3 else "Available"} for i in range(7)))
+    return app
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(42)) == 42
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_properties_pages_cover_all_available(client):
+    seen, cursor = [], None
+    while True:
+        url = "/api/properties?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        data = client.get(url).get_json()
+        assert len(data["properties"]) <= 2
+        seen += [p["property_id"] for p in data["properties"]]
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == sorted(seen, reverse=True)
+    assert len(seen) == 6
+
+
+def test_properties_pagination_with_filters(client):
+    url = '/api/properties?limit=3&filters={"cities":["Chennai"]}'
+    data = client.get(url).get_json()
+    assert len(data["properties"]) == 3
+    assert data["next_cursor"]
+
+
+def test_invalid_page_args(client):
+    assert client.get("/api/properties?cursor=bogus").status_code == 400
+    assert client.get("/api/properties?limit=0").status_code == 400
+
+
+def test_myproperties_paginated(client):
+    with client.session_transaction() as sess:
+        sess["user"] = {"user_id": 1}
+    data = client.get("/api/myproperties?limit=5").get_json()
+    assert len(data["properties"]) == 5
+    rest = client.get(f"/api/myproperties?limit=5&cursor={data['next_cursor']}").get_json()
+    assert len(rest["properties"]) == 2
+    assert rest["next_cursor"] is None
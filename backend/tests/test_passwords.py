@@ -0,0 +1,78 @@
+import pytest
+from werkzeug.security import generate_password_hash
+
+from backend.app import create_app, db
+from backend.models.users import Users
+from backend.utils.passwords import canonical_method
+
+LOGIN = {"identifier": "owner@example.com", "password": "secret"}
+
+
+def make_app(tmp_path, **overrides):
+    app = create_app("test", UPLOAD_FOLDER=str(tmp_path), **overrides)
+    with app.app_context():
+        db.create_all()
+        db.session.add(Users(full_name="Owner", email="owner@example.com", mobile_number="9999999999",
+                             password_hash=generate_password_hash("secret", "pbkdf2:sha256:1000")))
+        db.session.commit()
+    return app
+
+
+def stored_hash(app):
+    with app.app_context():
+        return db.session.get(Users, 1).password_hash
+
+
+def test_canonical_method():
+    assert canonical_method("scrypt") == "scrypt:32768:8:1"
+    assert canonical_method("pbkdf2:sha512").startswith("pbkdf2:sha512:")
+    assert canonical_method("pbkdf2:sha256:1000") == "pbkdf2:sha256:1000"
+
+
+def test_login_rehashes_when_the_cost_changes(tmp_path):
+    app = make_app(tmp_path, PASSWORD_HASH_METHOD="pbkdf2:sha256:2000")
+    client = app.test_client()
+    assert client.post("/auth/login", json=LOGIN).status_code == 200
+    upgraded = stored_hash(app)
+    assert upgraded.startswith("pbkdf2:sha256:2000$")
+
+    assert client.post("/auth/login", json=LOGIN).status_code == 200
+    assert stored_hash(app) == upgraded  # already current: no second rehash
+    assert client.post("/auth/login", json={**LOGIN, "password": "wrong"}).status_code == 401
+
+
+def test_hashing_in_the_process_pool(tmp_path):
+    app = make_app(tmp_path, PASSWORD_HASH_WORKERS=1)
+    hasher = app.extensions["password_hasher"]
+    try:
+        client = app.test_client()
+        assert client.post("/auth/signup", json={
+            "full_name": "New", "email": "new@example.com", "mobile_number": "8888888888", "password": "pw",
+        }).get_json()["success"]
+        assert client.post("/auth/login", json={"identifier": "new@example.com", "password": "pw"}).status_code == 200
+        text = client.get("/metrics").get_data(as_text=True)
+        assert "password_hash_total 2" in text and "password_hash_queue_depth 0" in text
+    finally:
+        hasher.shutdown()
+
+
+def test_saturated_hasher_answers_503(tmp_path):
+    app = make_app(tmp_path, PASSWORD_HASH_MAX_PENDING=1, PASSWORD_HASH_QUEUE_TIMEOUT=0)
+    hasher = app.extensions["password_hasher"]
+    hasher._slots.acquire()  # another login is hashing
+    try:
+        response = app.test_client().post("/auth/login", json=LOGIN)
+    finally:
+        hasher._slots.release()
+    assert response.status_code == 503 and response.headers["Retry-After"] == "1"
+    assert hasher.rejected == 1
+
+    assert app.test_client().post("/auth/login", json=LOGIN).status_code == 200
+
+
+@pytest.mark.parametrize("method", ["scrypt", "pbkdf2:sha256:1000"])
+def test_needs_rehash(tmp_path, method):
+    app = make_app(tmp_path, PASSWORD_HASH_METHOD=method)
+    hasher = app.extensions["password_hasher"]
+    assert hasher.needs_rehash(generate_password_hash("x", "pbkdf2:sha256:1000")) == (method == "scrypt")
+    assert not hasher.needs_rehash(None)
@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy import exc
+
+from backend.app import create_app, db
+from backend.config import DevelopmentConfig, ProductionConfig, TestingConfig, get_config
+from backend.utils.pool import TimedQueuePool, engine_options
+
+
+def metric(text, name, **labels):
+    wanted = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    for line in text.splitlines():
+        if line.startswith(f"{name}{{{wanted}}} "):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+@pytest.fixture
+def file_app(tmp_path):
+    app = create_app(
+        "test", SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'pool.db'}", UPLOAD_FOLDER=str(tmp_path),
+        DB_POOL_SIZE=2, DB_MAX_OVERFLOW=0, DB_POOL_TIMEOUT=0.05, DB_POOL_WARMUP=2,
+    )
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_get_config_profiles(monkeypatch):
+    monkeypatch.delenv("APP_ENV", raising=False)
+    assert get_config() is DevelopmentConfig
+    assert get_config("test") is get_config("Testing") is TestingConfig
+    monkeypatch.setenv("APP_ENV", "prod")
+    assert get_config() is ProductionConfig
+    with pytest.raises(ValueError, match="staging"):
+        get_config("staging")
+
+
+def test_production_requires_database_url(monkeypatch):
+    monkeypatch.setattr(ProductionConfig, "SQLALCHEMY_DATABASE_URI", None)
+    with pytest.raises(RuntimeError, match="SQLALCHEMY_DATABASE_URI"):
+        create_app("prod")
+
+
+def test_engine_options():
+    config = {key: getattr(DevelopmentConfig, key) for key in dir(DevelopmentConfig) if key.isupper()}
+
+    memory = engine_options({**config, "SQLALCHEMY_DATABASE_URI": "sqlite://"})
+    assert memory == {"pool_pre_ping": True}
+
+    mysql = engine_options({**config, "SQLALCHEMY_DATABASE_URI": "mysql+pymysql://u:p@db/broklink",
+                            "SQLALCHEMY_ENGINE_OPTIONS": {"pool_recycle": 60}})
+    assert mysql["poolclass"] is TimedQueuePool
+    assert mysql["pool_size"] == DevelopmentConfig.DB_POOL_SIZE
+    assert mysql["pool_recycle"] == 60  # explicit options win
+
+
+def test_startup_warms_the_pool(file_app):
+    pool = db.engine.pool
+    assert isinstance(pool, TimedQueuePool)
+    assert pool.checkedin() == 2 and pool.checkedout() == 0
+    assert pool.stats.checkouts >= 2
+
+
+def test_pool_metrics(file_app):
+    client = file_app.test_client()
+    assert client.get("/api/properties").status_code == 200
+    db.session.remove()  # the fixture's app context outlives the request
+
+    held = db.engine.connect()
+    try:
+        text = client.get("/metrics").get_data(as_text=True)
+    finally:
+        held.close()
+    assert metric(text, "db_pool_size", bind="default") == 2
+    assert metric(text, "db_pool_checked_out", bind="default") == 1
+    assert metric(text, "db_pool_saturation", bind="default") == 0.5
+    assert metric(text, "db_pool_checkouts_total", bind="default") >= 3
+    assert metric(text, "db_pool_checkout_wait_seconds_bucket", bind="default", le="+Inf") >= 3
+    assert metric(text, "db_pool_checkout_timeouts_total", bind="default") == 0
+
+
+def test_checkout_timeouts_are_counted(file_app):
+    held = [db.engine.connect() for _ in range(2)]
+    try:
+        with pytest.raises(exc.TimeoutError):
+            db.engine.connect()
+    finally:
+        for connection in held:
+            connection.close()
+    text = file_app.extensions["metrics"].render()
+    assert metric(text, "db_pool_checkout_timeouts_total", bind="default") == 1
@@ -0,0 +1,96 @@
+import io
+import json
+
+import pytest
+from sqlalchemy import event, text
+
+from backend.app import db
+from backend.models.properties import Property
+from backend.models.property_images import PropertyImage
+from backend.models.image_variants import ImageVariant
+from backend.scripts.backfill_property_images import backfill, drop_legacy_column, has_legacy_column
+from backend.tests.conftest import LISTING
+
+
+@pytest.fixture
+def app(app):
+    app.extensions["image_pipeline"].enabled = False
+    return app
+
+
+def add_listing(*names):
+    prop = Property(owner_id=1, **LISTING, photos=[
+        PropertyImage(ordinal=i, storage_key=name) for i, name in enumerate(names)
+    ])
+    db.session.add(prop)
+    db.session.commit()
+    return prop.property_id
+
+
+def test_upload_order_is_kept(client):
+    files = [(io.BytesIO(data), name) for data, name in ((b"cover", "a.jpg"), (b"kitchen", "b.png"))]
+    created = client.post("/api/properties", data={**LISTING, "images": files}).get_json()["property"]
+
+    photos = PropertyImage.query.order_by(PropertyImage.ordinal).all()
+    assert [p.storage_key for p in photos] == created["images"]
+    assert created["images"][1].endswith(".png")
+    assert created["image_urls"][0]["original"] == "/static/uploads/" + created["images"][0]
+
+
+def test_listing_page_loads_photos_in_one_query(app, client):
+    for i in range(30):
+        add_listing(f"{i}-a.jpg", f"{i}-b.jpg")
+    db.session.add(ImageVariant(source="29-a.jpg", variant="thumb", filename="variants/29-a__thumb400.webp",
+                                width=400, height=300, format="webp"))
+    db.session.commit()
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        page = client.get("/api/properties?limit=24").get_json()["properties"]
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+
+    assert len(page) == 24
+    assert page[0]["images"] == ["29-a.jpg", "29-b.jpg"]
+    assert page[0]["image_urls"][0]["thumb"] == "/static/uploads/variants/29-a__thumb400.webp"
+    assert page[0]["image_urls"][1]["thumb"] == "/static/uploads/29-b.jpg"
+    assert sum("FROM property_images" in s for s in statements) == 1
+    assert sum("FROM properties" in s for s in statements) == 1
+
+
+def test_filter_listings_with_photos(client):
+    with_photo = add_listing("a.jpg")
+    add_listing()
+
+    filters = json.dumps({"withPhotos": True})
+    page = client.get("/api/properties", query_string={"filters": filters}).get_json()["properties"]
+    assert [p["property_id"] for p in page] == [with_photo]
+
+
+def test_deleting_listing_removes_photos(client):
+    property_id = add_listing("a.jpg", "b.jpg")
+    assert client.delete(f"/api/property/{property_id}").status_code == 200
+    assert PropertyImage.query.count() == 0
+
+
+def test_backfill_from_legacy_column(app, tmp_path):
+    db.session.execute(text("ALTER TABLE properties ADD COLUMN images TEXT"))
+    first = add_listing()
+    second = add_listing("kept.jpg")
+    db.session.execute(text("UPDATE properties SET images = 'x.jpg,y.jpg,x.jpg' WHERE property_id = :id"),
+                       {"id": first})
+    db.session.execute(text("UPDATE properties SET images = 'old.jpg' WHERE property_id = :id"), {"id": second})
+    db.session.commit()
+
+    assert backfill(str(tmp_path), dry_run=True) == {"properties": 1, "images": 2}
+    assert PropertyImage.query.count() == 1
+
+    assert backfill(str(tmp_path)) == {"properties": 1, "images": 2}
+    assert [p.storage_key for p in db.session.get(Property, first).photos] == ["x.jpg", "y.jpg"]
+    assert [p.storage_key for p in db.session.get(Property, second).photos] == ["kept.jpg"]
+    assert backfill(str(tmp_path)) == {"properties": 0, "images": 0}
+
+    drop_legacy_column()
+    assert not has_legacy_column()
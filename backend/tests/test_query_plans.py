@@ -0,0 +1,135 @@
+"""Query-plan regression tests for the listing filters.
+
+Every filter combination is sent through the real endpoint, the SQL it runs
+is captured from the engine and re-run under EXPLAIN. A plan that reads the
+whole ``properties`` table fails the test.
+
+Runs on an in-memory SQLite database by default; point
+``EXPLAIN_DATABASE_URI`` at a scratch MySQL database to check MySQL plans.
+"""
+import json
+import os
+import random
+
+import pytest
+from sqlalchemy import event
+
+from backend.app import create_app, db
+from backend.config import Config
+from backend.models.users import Users
+from backend.models.properties import Property
+
+CITIES = ["Chennai", "Coimbatore", "Madurai", "Salem", "Trichy", "Erode", "Vellore", "Tirunelveli"]
+AREAS = ["Adyar", "Anna Nagar", "Gandhipuram", "Peelamedu", "KK Nagar", "Thillai Nagar"]
+HOUSE_TYPES = ["1HK", "1BHK", "2BHK", "3BHK", "4+ BHK"]
+PROPERTY_TYPES = ["House", "Flat", "PG", "Hostel"]
+
+FILTER_CASES = [
+    {},
+    {"cities": ["Chennai"]},
+    {"cities": ["Chennai", "Madurai"], "minBudget": "5000", "maxBudget": "15000"},
+    {"districts": ["Coimbatore"]},
+    {"districts": ["Coimbatore"], "cities": ["Coimbatore"]},
+    {"areas": ["Adyar"]},
+    {"bhk": ["2BHK"]},
+    {"bhk": ["2BHK", "3BHK"], "minBudget": "8000", "maxBudget": "20000"},
+    {"propertyTypes": ["Flat"]},
+    {"propertyTypes": ["PG", "Hostel"], "minBudget": "2000", "maxBudget": "6000"},
+    {"minBudget": "5000", "maxBudget": "9000"},
+    {"cities": ["Salem"], "bhk": ["1BHK"], "furnishing": ["Furnished"], "pets": "Allowed"},
+]
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", os.environ.get("EXPLAIN_DATABASE_URI", "sqlite://"))
+    app = create_app()
+    app.config.update({"TESTING": True})
+
+    with app.app_context():
+        db.create_all()
+        rng = random.Random(7)
+        owners = [Users(full_name=f"Owner {i}", email=f"owner{i}@example.com", mobile_number="9999999999")
+                  for i in range(50)]
+        db.session.add_all(owners)
+        db.session.flush()
+        for i in range(3000):
+            city = rng.choice(CITIES)
+            db.session.add(Property(
+                owner_id=rng.choice(owners).user_id, full_name="Owner", mobile_number="9999999999",
+                address=f"{i} Main St", city=city, area=rng.choice(AREAS), district=city,
+                property_type=rng.choice(PROPERTY_TYPES), house_type=rng.choice(HOUSE_TYPES),
+                rent_price=rng.randrange(2000, 40000, 500),
+                car_parking=rng.choice(["Available", "NotAvailable"]),
+                pets=rng.choice(["Allowed", "Strictly Not Allowed"]),
+                facing="East", furnishing=rng.choice(["Furnished", "Unfurnished"]),
+                status="Available" if rng.random() < 0.8 else "Unavailable",
+            ))
+        db.session.commit()
+        db.session.execute(db.text("ANALYZE"))
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def capture_statements(app, fn):
+    """Run ``fn`` and return the (sql, params) pairs that touched properties."""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if "FROM properties" in statement:
+            captured.append((statement, parameters))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return captured
+
+
+def full_scans(statement, parameters):
+    """Return the EXPLAIN rows that read the properties table in full."""
+    with db.engine.connect() as conn:
+        if conn.dialect.name == "sqlite":
+            rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+            return [r[-1] for r in rows if r[-1].startswith("SCAN properties")]
+        rows = conn.exec_driver_sql("EXPLAIN " + statement, parameters).mappings().fetchall()
+        return [dict(r) for r in rows if r["table"] == "properties" and r["type"] == "ALL"]
+
+
+@pytest.mark.parametrize("filters", FILTER_CASES, ids=lambda f: ",".join(sorted(f)) or "no-filters")
+def test_listing_filters_use_an_index(app, filters):
+    client = app.test_client()
+    query = f"?filters={json.dumps(filters)}" if filters else ""
+    statements = capture_statements(app, lambda: client.get(f"/api/properties{query}"))
+    assert statements
+
+    with app.app_context():
+        for statement, parameters in statements:
+            assert not full_scans(statement, parameters), statement
+
+
+def test_my_properties_uses_owner_index(app):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["user"] = {"user_id": 3}
+    statements = capture_statements(app, lambda: client.get("/api/myproperties"))
+    assert statements
+
+    with app.app_context():
+        for statement, parameters in statements:
+            assert not full_scans(statement, parameters), statement
+
+
+def test_nearby_uses_geohash_index(app):
+    client = app.test_client()
+    args = {"lat": 13.0, "lng": 80.25, "radius_km": 3}
+    statements = capture_statements(app, lambda: client.get("/api/properties/nearby", query_string=args))
+    assert statements
+
+    with app.app_context():
+        for statement, parameters in statements:
+            assert not full_scans(statement, parameters), statement
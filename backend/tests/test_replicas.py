@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import insert
+
+from backend.app import db
+from backend.db import STICKY_SESSION_KEY
+from backend.models.users import Users
+from backend.models.properties import Property
+from backend.tests.conftest import LISTING
+
+OWNER = {"user_id": 1, "full_name": "Owner", "email": "owner@example.com", "mobile_number": "9999999999"}
+
+
+@pytest.fixture
+def app_config(tmp_path):
+    # Two SQLite files stand in for the primary and a (lagging) replica
+    return {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'primary.db'}",
+            "REPLICA_DATABASE_URIS": [f"sqlite:///{tmp_path / 'replica.db'}"]}
+
+
+@pytest.fixture
+def app(app):
+    replica = app.extensions["replicas"]["replica_0"]
+    db.metadata.create_all(replica)
+    db.session.add(Property(owner_id=1, **{**LISTING, "city": "Primary"}))
+    db.session.commit()
+    with replica.begin() as connection:
+        connection.execute(insert(Users), [OWNER])
+        connection.execute(insert(Property), [{"owner_id": 1, **LISTING, "city": "Replica"}])
+    yield app
+    replica.dispose()
+
+
+def cities(response):
+    return [p["city"] for p in response.get_json()["properties"]]
+
+
+def test_read_routes_use_the_replica(client):
+    assert list(client.application.extensions["replicas"]) == ["replica_0"]
+    assert cities(client.get("/api/properties")) == ["Replica"]
+    assert cities(client.get("/api/myproperties")) == ["Replica"]
+    assert client.get("/api/property/1/contact").status_code == 200
+    # Facets are cached per listings generation, so they come from the primary
+    facets = client.get("/api/properties/facets").get_json()
+    assert [c["value"] for c in facets["districts"][0]["cities"]] == ["Primary"]
+    assert 'db_pool_size{bind="replica_0"}' in client.get("/metrics").get_data(as_text=True)
+
+
+def test_unmarked_routes_use_the_primary(client):
+    assert client.get("/api/property/1").get_json()["city"] == "Primary"
+
+
+def test_writes_go_to_the_primary_and_stick(app, client):
+    response = client.post("/api/properties", data={**LISTING, "city": "New"})
+    assert response.status_code == 201
+    db.session.remove()
+    with app.extensions["replicas"]["replica_0"].connect() as connection:
+        assert connection.execute(Property.__table__.select()).all()[0].city == "Replica"
+
+    # The writer reads its own write from the primary...
+    with client.session_transaction() as sess:
+        assert sess[STICKY_SESSION_KEY] > 0
+    assert cities(client.get("/api/myproperties")) == ["New", "Primary"]
+
+    # ...until the sticky window lapses and reads return to the replica
+    with client.session_transaction() as sess:
+        sess[STICKY_SESSION_KEY] = 0
+    assert cities(client.get("/api/myproperties")) == ["Replica"]
+
+    # Other clients never stuck
+    other = app.test_client()
+    assert cities(other.get("/api/properties")) == ["Replica"]
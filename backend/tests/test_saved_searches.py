@@ -0,0 +1,167 @@
+from types import SimpleNamespace
+
+import pytest
+
+from backend.app import db
+from backend.models.saved_searches import SavedSearch
+from backend.models.table_versions import TableVersion
+from backend.tests.conftest import LISTING, create
+from backend.utils.saved_searches import SavedSearchIndex, parse_saved_filters
+
+
+@pytest.fixture
+def app_config():
+    return {"SAVED_SEARCH_LIMIT": 3}
+
+
+@pytest.fixture
+def owner(client):
+    return client
+
+
+def save(client, filters, status=201):
+    response = client.post("/api/saved-searches", json={"name": "Mine", "filters": filters})
+    assert response.status_code == status, response.get_json()
+    return response.get_json()["search_id"]
+
+
+def inbox(client, **params):
+    response = client.get("/api/saved-searches/inbox", query_string=params)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def matched(client):
+    return [(m["search_id"], m["property"]["property_id"]) for m in inbox(client)["matches"]]
+
+
+def test_parse_saved_filters():
+    assert parse_saved_filters({"cities": ["Chennai"], "minBudget": 0, "maxBudget": 0}) == '{"cities":["Chennai"]}'
+    assert parse_saved_filters('{"bhk": ["2BHK"], "withPhotos": false}') == '{"bhk":["2BHK"]}'
+    for bad in ({}, {"withPhotos": False}, {"colour": "red"}, {"cities": "Chennai"}, {"minBudget": 5000},
+                {"minBudget": 9000, "maxBudget": 5000}, {"pets": 1}, "not json", ["cities"]):
+        with pytest.raises(ValueError):
+            parse_saved_filters(bad)
+
+
+def test_create_list_and_delete(tenant, owner):
+    assert tenant.post("/api/saved-searches", json={"filters": {}}).status_code == 400
+    first = save(tenant, {"cities": ["Chennai"]})
+    # The same filters in another order are the same search
+    assert save(tenant, {"cities": ["Chennai"], "withPhotos": False}, status=200) == first
+    save(tenant, {"bhk": ["1BHK"]})
+    save(tenant, {"bhk": ["3BHK"]})
+    assert tenant.post("/api/saved-searches", json={"filters": {"bhk": ["4BHK"]}}).status_code == 400
+
+    listed = tenant.get("/api/saved-searches").get_json()["saved_searches"]
+    assert [s["filters"] for s in listed][0] == {"cities": ["Chennai"]}
+    assert owner.delete(f"/api/saved-searches/{first}").status_code == 404
+    assert tenant.delete(f"/api/saved-searches/{first}").status_code == 200
+    assert len(tenant.get("/api/saved-searches").get_json()["saved_searches"]) == 2
+    assert tenant.application.test_client().get("/api/saved-searches").status_code == 401
+
+
+def test_listing_writes_land_in_the_inbox(tenant, owner):
+    chennai = save(tenant, {"cities": ["chennai"], "bhk": ["2BHK"]})
+    budget = save(tenant, {"minBudget": 8000, "maxBudget": 10000})
+    save(tenant, {"withPhotos": True})  # unanchored; these listings have no photos
+
+    first = create(owner)
+    second = create(owner, city="Madurai", rent_price="9000")
+    assert sorted(matched(tenant)) == [(chennai, first), (budget, second)]
+
+    # An edit into the budget matches once, however often it is repeated
+    owner.put(f"/api/property/{first}", json={"rent_price": 9500})
+    owner.put(f"/api/property/{first}", json={"rent_price": 9600})
+    assert sorted(matched(tenant)) == [(chennai, first), (budget, first), (budget, second)]
+
+
+def test_budget_created_and_status_flip_match(tenant, owner):
+    budget = save(tenant, {"minBudget": 8000, "maxBudget": 10000})
+    listing = create(owner, rent_price="9000")
+    assert matched(tenant) == [(budget, listing)]
+
+    owner.put(f"/api/property/{listing}/status", json={"status": "Unavailable"})
+    assert inbox(tenant)["matches"] == []  # unavailable listings drop out
+    other = save(tenant, {"districts": ["Chennai"]})
+    owner.put(f"/api/property/{listing}/status", json={"status": "Available"})
+    assert sorted(matched(tenant)) == [(budget, listing), (other, listing)]
+
+
+def test_owner_never_matches_their_own_listing(owner):
+    save(owner, {"cities": ["Chennai"]})
+    create(owner)
+    assert inbox(owner)["matches"] == []
+
+
+def test_batch_writes_match(tenant, owner):
+    search = save(tenant, {"bhk": ["3BHK"]})
+    response = owner.post("/api/properties/batch", json={"properties": [
+        {**LISTING, "address": f"{i} Main St", "house_type": "3BHK" if i % 2 else "2BHK"} for i in range(4)]})
+    assert response.status_code == 201
+    ids = response.get_json()["property_ids"]
+    assert sorted(matched(tenant)) == [(search, ids[1]), (search, ids[3])]
+
+
+def test_inbox_pages_and_marks_seen(tenant, owner):
+    search = save(tenant, {"cities": ["Chennai"]})
+    ids = [create(owner, address=f"{i} Main St") for i in range(5)]
+
+    page = inbox(tenant, limit=2, fields="property_id,city")
+    assert [m["property"]["property_id"] for m in page["matches"]] == ids[:-3:-1]
+    assert page["matches"][0]["property"] == {"property_id": ids[-1], "city": "Chennai"}
+    assert page["unseen"] == 5
+    rest = inbox(tenant, cursor=page["next_cursor"], limit=10)
+    assert [m["property"]["property_id"] for m in rest["matches"]] == ids[-3::-1]
+    assert rest["next_cursor"] is None
+
+    oldest_two = rest["matches"][-2]["match_id"]
+    assert tenant.post("/api/saved-searches/inbox/seen", json={"up_to": oldest_two}).get_json()["updated"] == 2
+    assert len(inbox(tenant, unseen=1)["matches"]) == 3
+    listed = tenant.get("/api/saved-searches").get_json()["saved_searches"]
+    assert [(s["search_id"], s["unseen"]) for s in listed] == [(search, 3)]
+    assert tenant.post("/api/saved-searches/inbox/seen", json={}).get_json()["updated"] == 3
+    assert tenant.post("/api/saved-searches/inbox/seen", json={"up_to": "all"}).status_code == 400
+
+
+def test_deleting_a_search_or_account_clears_matches(app, tenant, owner):
+    search = save(tenant, {"cities": ["Chennai"]})
+    create(owner)
+    assert tenant.delete(f"/api/saved-searches/{search}").status_code == 200
+    assert inbox(tenant)["matches"] == []
+
+    save(tenant, {"cities": ["Chennai"]})
+    create(owner)
+    assert tenant.delete("/api/profile").status_code == 200
+    assert len(app.extensions["saved_search_index"]) == 0
+
+
+def test_index_rebuilds_after_another_workers_write(app, tenant, owner):
+    save(tenant, {"cities": ["Chennai"]})
+    create(owner)
+    # Another worker adding a search leaves this index a version behind
+    db.session.add(SavedSearch(user_id=2, filters='{"cities":["Madurai"]}'))
+    TableVersion.bump("saved_searches")
+    db.session.commit()
+    create(owner, city="Madurai")
+    assert len(matched(tenant)) == 2
+
+
+def test_index_only_examines_searches_sharing_a_value():
+    index = SavedSearchIndex()
+    cities = [f"City{i}" for i in range(500)]
+    for i, city in enumerate(cities):
+        index.add(i, 2, {"cities": [city], "bhk": ["2BHK"]})
+    index.add(1000, 2, {"minBudget": 11000, "maxBudget": 13000})
+    index.add(1001, 2, {"furnishing": ["Furnished"]})
+
+    listing = SimpleNamespace(owner_id=1, rent_price=12000, **{k: v for k, v in LISTING.items()
+                                                              if k != "rent_price"})
+    listing.city = "city42"
+    found, examined = index.match(listing)
+    assert sorted(s.search_id for s in found) == [42, 1000, 1001]
+    assert examined == 3
+
+    index.remove(42)
+    assert [s.search_id for s in index.match(listing)[0]] in ([1000, 1001], [1001, 1000])
+    assert ("city", "city42") not in index.postings
@@ -0,0 +1,107 @@
+import pytest
+from backend.app import db
+from backend.models.users import Users
+from backend.models.properties import Property
+from backend.tests.conftest import add_listings
+from backend.utils.changes import record_property_changes
+from backend.utils.search import SearchIndex
+
+LISTINGS = [
+    dict(address="12 Beach Road", area="Besant Nagar", city="Chennai", description="Sea facing flat near the beach"),
+    dict(address="4 Temple Street", area="Mylapore", city="Chennai", description="Quiet lane near the temple"),
+    dict(address="9 Race Course", area="Race Course", city="Coimbatore", description="Gated community, beach trips weekly"),
+]
+
+
+@pytest.fixture
+def app(app):
+    add_listings(*({**listing, "district": listing["city"]} for listing in LISTINGS))
+    return app
+
+
+def ids(response):
+    return [r["property_id"] for r in response.get_json()["results"]]
+
+
+def test_bm25_prefers_field_matches():
+    index = SearchIndex()
+
+    class Row:
+        def __init__(self, property_id, **fields):
+            self.property_id = property_id
+            for f in ("area", "city", "district", "full_name", "address", "description"):
+                setattr(self, f, fields.get(f, ""))
+
+    index.add(Row(1, description="adyar is close by"))
+    index.add(Row(2, area="Adyar"))
+    assert [doc for doc, _ in index.search("adyar")] == [2, 1]
+    index.remove(2)
+    assert [doc for doc, _ in index.search("adyar")] == [1]
+
+
+def test_search_ranks_and_prefix_matches(client):
+    assert ids(client.get("/api/properties/search?q=beach")) == [1, 3]
+    assert ids(client.get("/api/properties/search?q=myla")) == [2]
+    assert ids(client.get("/api/properties/search?q=chennai tem")) == [2]
+
+
+def test_search_combines_with_filters(client):
+    url = '/api/properties/search?q=beach&filters={"cities":["Coimbatore"]}'
+    assert ids(client.get(url)) == [3]
+
+
+def test_search_follows_writes(client):
+    assert ids(client.get("/api/properties/search?q=temple")) == [2]
+
+    client.put("/api/property/2/status", json={"status": "Unavailable"})
+    assert ids(client.get("/api/properties/search?q=temple")) == []
+
+    client.put("/api/property/1", json={"description": "Near the old temple"})
+    client.put("/api/property/2/status", json={"status": "Available"})
+    assert sorted(ids(client.get("/api/properties/search?q=temple"))) == [1, 2]
+
+    client.delete("/api/property/1")
+    assert ids(client.get("/api/properties/search?q=temple")) == [2]
+
+
+def test_search_requires_query(client):
+    assert client.get("/api/properties/search").status_code == 400
+
+
+def test_index_catches_up_on_other_workers_writes(app, client):
+    assert ids(client.get("/api/properties/search?q=temple")) == [2]
+    index = app.extensions["search_index"]
+
+    # Another worker edits one listing and deletes another; this one never hears of it
+    with app.app_context():
+        edited = db.session.get(Property, 1)
+        edited.description = "Walk to the temple"
+        record_property_changes([edited])
+        db.session.commit()
+        gone = db.session.get(Property, 2)
+        record_property_changes(deleted=[gone])
+        db.session.delete(gone)
+        db.session.commit()
+
+    assert ids(client.get("/api/properties/search?q=temple")) == [1]
+    # A local write after a gap applies the missing range too
+    with app.app_context():
+        record_property_changes([db.session.get(Property, 3)])
+        db.session.commit()
+    client.put("/api/property/1/status", json={"status": "Unavailable"})
+    assert ids(client.get("/api/properties/search?q=beach")) == [3]
+    assert app.extensions["search_index"] is index
+
+
+def test_deleting_an_account_drops_only_its_listings(app, client):
+    with app.app_context():
+        other = Users(full_name="Other", email="other@example.com", mobile_number="8888888888")
+        db.session.add(other)
+        db.session.get(Property, 3).owner_id = 2
+        db.session.commit()
+    assert sorted(ids(client.get("/api/properties/search?q=beach"))) == [1, 3]
+    index = app.extensions["search_index"]
+
+    assert client.delete("/api/profile").status_code == 200
+    assert app.extensions["search_index"] is index
+    assert ids(client.get("/api/properties/search?q=beach")) == [3]
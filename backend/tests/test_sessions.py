@@ -0,0 +1,101 @@
+import pytest
+from sqlalchemy import event
+
+from backend.app import create_app, db
+from backend.models.users import Users
+from backend.utils.sessions import MemorySessionStore, SQLiteSessionStore
+
+
+@pytest.fixture
+def app(app):
+    db.session.get(Users, 1).set_password("secret")
+    db.session.commit()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    response = client.post("/auth/login", json={"identifier": "owner@example.com", "password": "secret"})
+    assert response.status_code == 200
+    db.session.remove()  # forget the login's User object; reads must hit the cache or the database
+    return client
+
+
+@pytest.fixture
+def user_selects(app):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    yield statements
+    event.remove(db.engine, "before_cursor_execute", count)
+
+
+def test_cookie_carries_only_a_signed_id(app, client):
+    cookie = client.get_cookie("session")
+    assert "owner@example.com" not in cookie.value and len(cookie.value) < 80
+    assert client.get("/api/session").get_json() == {
+        "loggedIn": True,
+        "user": {"user_id": 1, "full_name": "Owner", "email": "owner@example.com", "mobile_number": "9999999999"},
+    }
+
+    client.set_cookie("session", cookie.value[:-2] + "xx")  # tampered signature
+    assert client.get("/api/session").status_code == 401
+
+
+def test_login_rotates_the_session_id(app):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["visited"] = True
+    before = client.get_cookie("session").value
+    client.post("/auth/login", json={"identifier": "owner@example.com", "password": "secret"})
+    assert client.get_cookie("session").value != before
+    with client.session_transaction() as sess:
+        assert sess["visited"] is True and sess["user"] == {"user_id": 1}
+
+
+def test_profile_reads_are_cached_and_invalidated(client, user_selects):
+    assert client.get("/api/profile").get_json()["full_name"] == "Owner"
+    assert client.get("/api/session").status_code == 200
+    assert user_selects == []  # login already cached the record
+
+    assert client.put("/api/profile", json={"full_name": "New Name"}).status_code == 200
+    assert client.get("/api/profile").get_json()["full_name"] == "New Name"
+    assert client.get("/api/session").get_json()["user"]["full_name"] == "New Name"
+
+
+def test_deleted_account_logs_out(client):
+    assert client.delete("/api/profile").status_code == 200
+    assert client.get("/api/session").status_code == 401
+    assert client.get("/api/profile").status_code == 401
+
+
+@pytest.mark.parametrize("make_store", [
+    lambda tmp_path: MemorySessionStore(),
+    lambda tmp_path: SQLiteSessionStore(str(tmp_path / "sessions" / "sessions.db")),
+])
+def test_stores(make_store, tmp_path):
+    store = make_store(tmp_path)
+    store.set("a", {"user": {"user_id": 1}}, ttl=60)
+    assert store.get("a") == {"user": {"user_id": 1}}
+    assert store.get("missing") is None
+
+    store.set("b", {"x": 1}, ttl=0)
+    assert store.get("b") is None  # expired
+    store.delete("a")
+    assert store.get("a") is None
+
+
+def test_sqlite_store_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    SQLiteSessionStore(path).set("sid", {"user": {"user_id": 7}}, ttl=60)
+    assert SQLiteSessionStore(path).get("sid") == {"user": {"user_id": 7}}
+
+
+def test_unknown_session_store():
+    with pytest.raises(ValueError, match="SESSION_STORE"):
+        create_app("test", SESSION_STORE="redis")
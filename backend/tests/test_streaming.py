@@ -0,0 +1,54 @@
+import json
+
+import pytest
+from backend.app import db
+from backend.models.image_variants import ImageVariant
+from backend.models.property_images import PropertyImage
+from backend.tests.conftest import add_listings
+
+
+@pytest.fixture
+def app(app):
+    add_listings(*({"address": f"{i} Main St", "city": "Chennai" if i % 2 else "Madurai",
+                    "status": "Unavailable" if i % 10 == 0 else "Available"} for i in range(60)))
+    return app
+
+
+def test_ndjson_stream_via_accept_header(client):
+    response = client.get("/api/properties", headers={"Accept": "application/x-ndjson"})
+    assert response.mimetype == "application/x-ndjson"
+    assert response.is_streamed
+
+    rows = [json.loads(line) for line in response.data.splitlines()]
+    assert len(rows) == 54
+    ids = [r["property_id"] for r in rows]
+    assert ids == sorted(ids, reverse=True)
+
+
+def test_stream_honours_filters_and_fields(client):
+    url = '/api/properties?stream=1&fields=city&filters={"cities":["Madurai"]}'
+    rows = [json.loads(line) for line in client.get(url).data.splitlines()]
+    assert len(rows) == 24
+    assert all(r == {"property_id": r["property_id"], "city": "Madurai"} for r in rows)
+
+
+def test_chunked_json_array(client):
+    body = client.get("/api/properties?stream=json").get_json()
+    assert len(body["properties"]) == 54
+
+
+def test_stream_includes_image_urls(app, client):
+    with app.app_context():
+        db.session.add_all([PropertyImage(property_id=2, ordinal=0, storage_key="a.jpg"),
+                            PropertyImage(property_id=2, ordinal=1, storage_key="b.jpg"),
+                            ImageVariant(source="a.jpg", variant="thumb", filename="variants/a-thumb.webp",
+                                         width=4, height=3, format="webp")])
+        db.session.commit()
+
+    rows = {r["property_id"]: r for r in (json.loads(line) for line in
+                                          client.get("/api/properties?stream=1").data.splitlines())}
+    assert rows[2]["images"] == ["a.jpg", "b.jpg"]
+    assert [urls["thumb"] for urls in rows[2]["image_urls"]] == ["/static/uploads/variants/a-thumb.webp",
+                                                                 "/static/uploads/b.jpg"]
+    assert rows[2]["image_urls"] == client.get("/api/property/2").get_json()["image_urls"]
+    assert rows[3]["image_urls"] == []
@@ -0,0 +1,89 @@
+import hashlib
+import io
+import os
+
+import pytest
+from backend.app import db
+from backend.models.properties import Property
+from backend.models.property_images import PropertyImage
+from backend.models.image_variants import ImageVariant
+from backend.scripts.migrate_uploads import migrate
+from backend.tests.conftest import LISTING
+from backend.utils.uploads import IMMUTABLE_CACHE_CONTROL
+
+PHOTO = b"not really a jpeg, but the bytes are all that matter here"
+PHOTO_NAME = hashlib.sha256(PHOTO).hexdigest() + ".jpg"
+
+
+@pytest.fixture
+def app(app):
+    app.extensions["image_pipeline"].enabled = False
+    return app
+
+
+def post_listing(client, *files):
+    return client.post("/api/properties", data={**LISTING, "images": [(io.BytesIO(b), n) for b, n in files]})
+
+
+def test_identical_uploads_share_one_file(client, tmp_path):
+    first = post_listing(client, (PHOTO, "a.jpg")).get_json()["property"]
+    second = post_listing(client, (PHOTO, "b.JPG"), (PHOTO, "c.jpg")).get_json()["property"]
+
+    assert first["images"] == [PHOTO_NAME]
+    assert second["images"] == [PHOTO_NAME]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [PHOTO_NAME]
+
+
+def test_rejects_unsupported_extension(client, tmp_path):
+    response = post_listing(client, (b"#!/bin/sh", "run.sh"))
+    assert response.status_code == 400
+    assert Property.query.count() == 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_hashed_uploads_are_cached_immutably(app, client, tmp_path):
+    static_uploads = os.path.join(app.static_folder, "uploads")
+    app.config["UPLOAD_FOLDER"] = static_uploads
+    os.makedirs(static_uploads, exist_ok=True)
+    post_listing(client, (PHOTO, "a.jpg"))
+    try:
+        response = client.get("/static/uploads/" + PHOTO_NAME)
+        assert response.status_code == 200
+        assert response.headers["Cache-Control"] == IMMUTABLE_CACHE_CONTROL
+        etag = response.headers["ETag"]
+        response.close()
+
+        revalidated = client.get("/static/uploads/" + PHOTO_NAME, headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["Cache-Control"] == IMMUTABLE_CACHE_CONTROL
+    finally:
+        os.remove(os.path.join(static_uploads, PHOTO_NAME))
+
+
+def test_migration_renames_and_dedupes(app, tmp_path):
+    (tmp_path / "old1.jpg").write_bytes(PHOTO)
+    (tmp_path / "old2.jpg").write_bytes(PHOTO)
+    db.session.add_all([
+        Property(owner_id=1, **LISTING, photos=[
+            PropertyImage(ordinal=i, storage_key=name) for i, name in enumerate(["old1.jpg", "old2.jpg", "gone.jpg"])
+        ]),
+        ImageVariant(source="old1.jpg", variant="thumb", filename="variants/old1__thumb400.webp",
+                     width=400, height=300, format="webp"),
+    ])
+    db.session.commit()
+
+    keys = lambda: [photo.storage_key for photo in Property.query.one().photos]  # noqa: E731
+
+    dry = migrate(str(tmp_path), dry_run=True)
+    assert dry["properties"] == 1 and dry["unique"] == 1
+    assert keys() == ["old1.jpg", "old2.jpg", "gone.jpg"]
+    assert not (tmp_path / PHOTO_NAME).exists()
+
+    stats = migrate(str(tmp_path), remove_old=True)
+    assert stats["missing"] == {"gone.jpg"}
+    db.session.expire_all()
+    assert keys() == [PHOTO_NAME, "gone.jpg"]
+    assert ImageVariant.query.one().source == PHOTO_NAME
+    assert sorted(p.name for p in tmp_path.iterdir()) == [PHOTO_NAME]
+
+    assert migrate(str(tmp_path))["properties"] == 0
@@ -0,0 +1,270 @@
+import json
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, delete, func, insert, or_, select
+
+from ..db import db
+from ..models.properties import Property
+from ..models.properties_archive import PropertyArchive
+from ..models.property_images import PropertyImage
+from ..models.property_tombstones import PropertyTombstone
+from ..models.saved_search_matches import SavedSearchMatch
+from .asgi import call_in_loop
+from .changes import record_property_changes
+from .images import image_urls
+from .invalidation import listings_changed
+from .search import reindex_properties
+from .serializers import serialize_property
+
+logger = logging.getLogger(__name__)
+
+# Property columns copied to and from properties_archive
+ARCHIVED_COLUMNS = tuple(c.name for c in Property.__table__.columns)
+
+
+def archive_criteria(unavailable_days, expire_days, now=None):
+    """SQL condition for listings due for the archive, or None if both ages are off.
+
+    Unavailable listings qualify ``unavailable_days`` after their last
+    write, any listing ``expire_days`` after it (0 turns either off).
+    """
+    now = (now or datetime.now(timezone.utc)).replace(tzinfo=None)
+    last_write = func.coalesce(Property.updated_at, Property.created_at)
+    conditions = []
+    if unavailable_days > 0:
+        conditions.append(and_(Property.status == "Unavailable",
+                               last_write < now - timedelta(days=unavailable_days)))
+    if expire_days > 0:
+        conditions.append(last_write < now - timedelta(days=expire_days))
+    return or_(*conditions) if conditions else None
+
+
+def archive_batch(criteria, after_id, batch_size):
+    """Move up to ``batch_size`` due listings with ids above ``after_id``.
+
+    One short transaction: copy the rows (and their photos) into
+    properties_archive, leave change feed tombstones, delete them. The
+    rows are locked with SKIP LOCKED, so a listing an owner is editing
+    is left for the next run rather than waited for. Returns
+    ``(archived ids, last id scanned)``; the last id is None when there
+    is nothing further to scan.
+    """
+    rows = (db.session.execute(
+        select(Property.__table__)
+        .where(Property.property_id > after_id, criteria)
+        .order_by(Property.property_id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all())
+    if not rows:
+        db.session.rollback()
+        return [], None
+
+    ids = [row.property_id for row in rows]
+    photos = {}
+    for image in (PropertyImage.query.filter(PropertyImage.property_id.in_(ids))
+                  .order_by(PropertyImage.property_id, PropertyImage.ordinal)):
+        photos.setdefault(image.property_id, []).append(
+            {"storage_key": image.storage_key, "width": image.width, "height": image.height})
+
+    now = datetime.now(timezone.utc)
+    db.session.execute(insert(PropertyArchive), [
+        {**row._mapping, "photos": json.dumps(photos[row.property_id]) if row.property_id in photos else None,
+         "archived_at": now}
+        for row in rows
+    ])
+    # Gone from every public and owner query: tell change feed clients to drop them
+    record_property_changes(deleted=rows)
+    db.session.execute(delete(PropertyImage).where(PropertyImage.property_id.in_(ids)))
+    db.session.execute(delete(SavedSearchMatch).where(SavedSearchMatch.property_id.in_(ids)))
+    db.session.execute(delete(Property).where(Property.property_id.in_(ids)))
+    db.session.commit()
+    return ids, ids[-1] if len(rows) == batch_size else None
+
+
+def restore_listing(property_id, owner_id):
+    """Move an archived listing back into ``properties``; None if ``owner_id`` has none.
+
+    Adds the Property (same id, same photos) to the session and drops the
+    archive row and its tombstone; the caller records the change and
+    commits, as for any other listing write.
+    """
+    archived = db.session.get(PropertyArchive, property_id)
+    if archived is None or archived.owner_id != owner_id:
+        return None
+
+    prop = Property(**{name: getattr(archived, name) for name in ARCHIVED_COLUMNS})
+    for ordinal, photo in enumerate(json.loads(archived.photos) if archived.photos else ()):
+        prop.photos.append(PropertyImage(ordinal=ordinal, **photo))
+    db.session.add(prop)
+    db.session.delete(archived)
+    db.session.execute(delete(PropertyTombstone).where(PropertyTombstone.property_id == property_id))
+    db.session.flush()
+    return prop
+
+
+def delete_archived(property_id, owner_id):
+    """Delete ``owner_id``'s archived listing; False if they have none.
+
+    The listing left the change feed when it was archived, so its
+    tombstone already stands; the caller commits.
+    """
+    archived = db.session.get(PropertyArchive, property_id)
+    if archived is None or archived.owner_id != owner_id:
+        return False
+    db.session.delete(archived)
+    return True
+
+
+def archived_columns(fields):
+    """PropertyArchive columns to SELECT for ``fields`` (``photos`` stands in for images)."""
+    return [getattr(PropertyArchive, "photos" if f == "images" else f) for f in fields]
+
+
+def serialize_archived(rows, fields):
+    """Owner dashboard dicts for archived rows, shaped like serialize_properties'."""
+    items = []
+    for row in rows:
+        keys = [photo["storage_key"] for photo in json.loads(row.photos)] if "images" in fields and row.photos else []
+        item = serialize_property(row, fields, keys)
+        if "images" in fields:
+            item["image_urls"] = [image_urls(key) for key in keys]
+        item["archived"] = True
+        items.append(item)
+    return items
+
+
+class ArchiveStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.archived = 0
+        self.seconds = 0.0
+        self.runs = 0
+        self.last_rate = 0.0
+
+    def record(self, archived, seconds):
+        with self._lock:
+            self.archived += archived
+            self.seconds += seconds
+            self.runs += 1
+            self.last_rate = archived / seconds if seconds else 0.0
+
+    def metrics(self):
+        """Prometheus families (see Metrics.add_collector)."""
+        with self._lock:
+            return [
+                ("listing_archive_runs_total", "Archive job runs", "counter", [({}, self.runs)]),
+                ("listing_archive_rows_total", "Listings moved to properties_archive", "counter",
+                 [({}, self.archived)]),
+                ("listing_archive_seconds_total", "Time spent in archive runs, pauses included", "counter",
+                 [({}, self.seconds)]),
+                ("listing_archive_rows_per_second", "Throughput of the last archive run", "gauge",
+                 [({}, self.last_rate)]),
+            ]
+
+
+class ListingArchiver:
+    """Moves long-unavailable and expired listings into properties_archive.
+
+    The CLI in ``backend/scripts/archive_listings.py`` runs it on demand;
+    that is the default. Opting in with ``ARCHIVE_INTERVAL`` starts a
+    daemon thread in each worker that runs the job that often (the first
+    run after a random part of the interval, so workers started together
+    do not run at once).
+    """
+
+    def __init__(self, app):
+        self.app = app
+        config = app.config
+        self.interval = config.get("ARCHIVE_INTERVAL", 0)
+        self.unavailable_days = config.get("ARCHIVE_UNAVAILABLE_DAYS", 90)
+        self.expire_days = config.get("ARCHIVE_EXPIRE_DAYS", 0)
+        self.batch_size = config.get("ARCHIVE_BATCH_SIZE", 500)
+        self.batch_pause = config.get("ARCHIVE_BATCH_PAUSE", 0.2)
+        self.stats = ArchiveStats()
+        self._run_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._schedule, name="listing-archive", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Finish the current batch and end the scheduled runs."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _schedule(self):
+        delay = self.interval * random.uniform(0.5, 1.0)
+        while not self._stopping.wait(delay):
+            try:
+                self.run()
+            except Exception:
+                logger.exception("listing archive run failed")
+            delay = self.interval
+
+    def run(self, batch_size=None, pause=None):
+        """Archive every due listing, batch by batch; returns the run's report."""
+        batch_size = batch_size or self.batch_size
+        pause = self.batch_pause if pause is None else pause
+        criteria = archive_criteria(self.unavailable_days, self.expire_days)
+        report = {"archived": 0, "batches": 0, "seconds": 0.0, "rows_per_second": 0.0}
+        if criteria is None:
+            return report
+
+        with self._run_lock:
+            started = time.perf_counter()
+            after_id = 0
+            while after_id is not None and not self._stopping.is_set():
+                # Under ASGI with an async driver the queries must run on the loop
+                ids, after_id = call_in_loop(self.app, self._batch, criteria, after_id, batch_size)
+                if ids:
+                    report["archived"] += len(ids)
+                    report["batches"] += 1
+                if after_id is not None and pause:
+                    self._stopping.wait(pause)  # let other writers at the table
+            report["seconds"] = time.perf_counter() - started
+        if report["seconds"]:
+            report["rows_per_second"] = report["archived"] / report["seconds"]
+        self.stats.record(report["archived"], report["seconds"])
+        logger.info("listing archive archived=%d batches=%d seconds=%.1f rows_per_sec=%.1f",
+                    report["archived"], report["batches"], report["seconds"], report["rows_per_second"])
+        return report
+
+    def pending(self):
+        """Listings the next run would archive."""
+        criteria = archive_criteria(self.unavailable_days, self.expire_days)
+        if criteria is None:
+            return 0
+        return db.session.query(func.count(Property.property_id)).filter(criteria).scalar()
+
+    def _batch(self, criteria, after_id, batch_size):
+        with self.app.app_context():
+            try:
+                ids, last_id = archive_batch(criteria, after_id, batch_size)
+                if ids:
+                    listings_changed()
+                    reindex_properties(ids)
+                return ids, last_id
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
+
+
+def init_archive(app):
+    archiver = ListingArchiver(app)
+    app.extensions["listing_archiver"] = archiver
+    metrics = app.extensions.get("metrics")
+    if metrics is not None:
+        metrics.add_collector(archiver.stats.metrics)
+    archiver.start()
@@ -0,0 +1,247 @@
+import asyncio
+import contextlib
+import contextvars
+import functools
+import logging
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, has_app_context
+from sqlalchemy.engine import make_url
+from sqlalchemy.util.concurrency import await_only, greenlet_spawn, in_greenlet
+
+from ..db import app_engines
+from .pool import warm_pools
+
+logger = logging.getLogger(__name__)
+
+# Sync driver -> asyncio driver for the same database
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "mysql+mysqldb": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+# Request bodies larger than this are spooled to a temporary file
+BODY_SPOOL_BYTES = 1024 * 1024
+
+
+def async_database_uri(uri):
+    """``uri`` with its driver swapped for the asyncio one (as is if already async)."""
+    url = make_url(uri)
+    if url.get_dialect().is_async:
+        return uri
+    driver = ASYNC_DRIVERS.get(url.drivername)
+    if driver is None:
+        raise ValueError(f"No asyncio driver known for {url.drivername!r}; set ASYNC_DATABASE_URL")
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+# ------------------------
+# Helpers for code that runs under both servers
+# ------------------------
+def run_blocking(fn, *args):
+    """Call ``fn(*args)`` without stalling the ASGI event loop.
+
+    Under ASGI every request runs on the loop's thread, so a file write or
+    a hash computed inline would hold up all of them. There, ``fn`` runs in
+    the server's thread pool (with the caller's Flask context) while the
+    request's greenlet waits. Under WSGI, in scripts and in background
+    threads it is a plain call.
+    """
+    server = current_app.extensions.get("asgi") if has_app_context() else None
+    if server is None or not in_greenlet():
+        return fn(*args)
+    call = functools.partial(contextvars.copy_context().run, fn, *args)
+    return await_only(asyncio.get_running_loop().run_in_executor(server.executor, call))
+
+
+def call_in_loop(app, fn, *args):
+    """Call ``fn(*args)`` where the app's database driver can run.
+
+    Async driver connections belong to the ASGI server's event loop, so a
+    background thread (e.g. the image pipeline) hands its database work to
+    the loop and waits for the result. Otherwise it is a plain call.
+    """
+    server = app.extensions.get("asgi")
+    if server is None or server.loop is None or in_greenlet():
+        return fn(*args)
+    return asyncio.run_coroutine_threadsafe(greenlet_spawn(fn, *args), server.loop).result()
+
+
+@contextlib.contextmanager
+def hold(lock):
+    """``with lock:`` that waits cooperatively inside an ASGI request.
+
+    Requests there share one thread; blocking on a lock held by another
+    request (suspended in a query) would stop the loop for good.
+    """
+    if in_greenlet():
+        while not lock.acquire(blocking=False):
+            await_only(asyncio.sleep(0.001))
+    else:
+        lock.acquire()
+    try:
+        yield
+    finally:
+        lock.release()
+
+
+# ------------------------
+# Server adapter
+# ------------------------
+def wsgi_environ(scope, body):
+    """WSGI environ for an ASGI ``http`` scope; ``body`` is the buffered request body."""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    root_path = scope.get("root_path", "")
+    path = scope["path"]
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": root_path.encode("utf-8").decode("latin-1"),
+        "PATH_INFO": path.encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        "wsgi.input_terminated": True,  # buffered in full; chunked bodies have no Content-Length
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope.get("headers", ()):
+        key = name.decode("latin-1").upper().replace("-", "_")
+        if key not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            key = "HTTP_" + key
+        value = value.decode("latin-1")
+        if key in environ:
+            value = environ[key] + ("; " if key == "HTTP_COOKIE" else ",") + value
+        environ[key] = value
+    return environ
+
+
+class ASGIAdapter:
+    """Serves the Flask app over ASGI, one greenlet per request on the event loop.
+
+    The routes stay synchronous. With an asyncio database driver, each
+    query suspends the request's greenlet (SQLAlchemy's ``await_only``)
+    and the loop serves other requests meanwhile, so a slow round trip no
+    longer occupies a worker thread. Other blocking work goes through
+    :func:`run_blocking`. Request bodies are buffered before the app runs.
+    Responses, streamed ones included, are sent as the app produces them.
+    """
+
+    def __init__(self, app, blocking_workers=8):
+        self.app = app
+        self.executor = ThreadPoolExecutor(max_workers=blocking_workers, thread_name_prefix="asgi-blocking")
+        self.loop = None
+        app.extensions["asgi"] = self
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] != "http":
+            raise RuntimeError(f"Unsupported ASGI scope type {scope['type']!r}")
+        if self.loop is None:
+            self.loop = asyncio.get_running_loop()
+
+        body = await self._read_body(receive)
+        try:
+            await greenlet_spawn(self._handle, scope, body, send)
+        finally:
+            body.close()
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self.loop = asyncio.get_running_loop()
+                try:
+                    await greenlet_spawn(warm_pools, self.app, True)
+                except Exception as e:
+                    logger.exception("ASGI startup failed")
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                # Their jobs save through this loop (call_in_loop), so wait off it
+                archiver = self.app.extensions.get("listing_archiver")
+                if archiver is not None:
+                    await self.loop.run_in_executor(self.executor, archiver.stop)
+                pipeline = self.app.extensions.get("image_pipeline")
+                if pipeline is not None:
+                    await self.loop.run_in_executor(self.executor, pipeline.wait)
+                await greenlet_spawn(self._dispose_engines)
+                self.executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def _dispose_engines(self):
+        with self.app.app_context():
+            for engine in app_engines().values():
+                engine.dispose()
+
+    @staticmethod
+    async def _read_body(receive):
+        body = tempfile.SpooledTemporaryFile(max_size=BODY_SPOOL_BYTES)
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break  # client went away; the app sees a short body
+            body.write(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        body.seek(0)
+        return body
+
+    def _handle(self, scope, body, send):
+        # Runs in the request's greenlet: await_only() suspends it until the
+        # loop has done the awaited work.
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and response.get("started"):
+                raise exc_info[1].with_traceback(exc_info[2])
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+
+        def send_body(chunk, more):
+            if not response.get("started"):
+                response["started"] = True
+                await_only(send({"type": "http.response.start", "status": response["status"],
+                                 "headers": response["headers"]}))
+            await_only(send({"type": "http.response.body", "body": chunk, "more_body": more}))
+
+        try:
+            result = self.app(wsgi_environ(scope, body), start_response)
+        except Exception:
+            logger.exception("unhandled error path=%s", scope["path"])
+            response.update(status=500, headers=[(b"content-type", b"text/plain")])
+            send_body(b"Internal Server Error", False)
+            return
+
+        try:
+            # Hold one chunk back so the last one goes out with more_body=False
+            pending = None
+            for chunk in result:
+                if not chunk:
+                    continue
+                if pending is not None:
+                    send_body(pending, True)
+                pending = chunk
+            send_body(pending or b"", False)
+        finally:
+            if hasattr(result, "close"):
+                result.close()
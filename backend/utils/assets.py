@@ -0,0 +1,248 @@
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+
+from flask import current_app, request, send_from_directory, url_for
+
+from .compression import available_encodings, compress
+from .uploads import IMMUTABLE_CACHE_CONTROL
+
+DIST_DIR = "dist"
+MANIFEST_NAME = "manifest.json"
+ASSET_DIRS = ("css", "js", "img")
+# Precompressed siblings are written for text assets only
+TEXT_EXTENSIONS = {".css", ".js", ".svg"}
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+# ------------------------
+# Minification
+# ------------------------
+def minify_css(source):
+    """Drop comments and the whitespace around CSS punctuation; strings are kept."""
+    # Split into strings and code, comments turned into spaces
+    parts, code = [], []
+    for string, comment, text in re.findall(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|(/\*.*?\*/)|([^"\'/]+|/)',
+                                            source, re.S):
+        if string:
+            parts.extend(["".join(code), string])
+            code = []
+        else:
+            code.append(text or " ")
+    parts.append("".join(code))
+
+    out = []
+    for index, part in enumerate(parts):
+        if index % 2:
+            out.append(part)
+            continue
+        part = re.sub(r"\s+", " ", part)
+        # Not before ":" - "a :hover" and "a:hover" select different things
+        part = re.sub(r"\s*([{};,>])\s*", r"\1", part)
+        out.append(re.sub(r":\s+", ":", part))
+    return "".join(out).replace(";}", "}").strip()
+
+
+def minify_js(source):
+    """Strip comments and indentation from JavaScript, keeping line breaks.
+
+    Deliberately conservative: every newline stays (so automatic semicolon
+    insertion behaves exactly as before), and strings, template literals
+    and regex literals are copied untouched. It saves most of what a full
+    minifier would on hand-written files without a Node toolchain.
+    """
+    out = []
+    i, n = 0, len(source)
+    last = ""  # last significant character, to tell a regex from a division
+    template_depth = []  # brace depth at each ${ inside a template literal
+    at_line_start = True
+
+    while i < n:
+        ch = source[i]
+        if at_line_start and ch in " \t":
+            i += 1
+            continue
+        at_line_start = False
+
+        if ch == "/" and source.startswith("//", i):
+            i = source.find("\n", i)
+            i = n if i < 0 else i
+            continue
+        if ch == "/" and source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            end = n if end < 0 else end + 2
+            # Keep the tokens apart, and a line break where the comment had one
+            gap = "\n" if "\n" in source[i:end] else " "
+            if out and out[-1] not in (" ", "\n"):
+                out.append(gap)
+            i = end
+            continue
+        if ch in "'\"" or (ch == "/" and (not last or last in "(,=:[!&|?{};+-*%<>~^")):
+            j = i + 1
+            while j < n and source[j] != ch:
+                if source[j] == "\\":
+                    j += 1
+                elif ch == "/" and source[j] == "[":  # character class may hold a /
+                    j = source.find("]", j)
+                    j = n if j < 0 else j
+                elif source[j] == "\n" and ch == "/":
+                    break
+                j += 1
+            if ch == "/":
+                while j + 1 < n and source[j + 1].isalpha():  # flags
+                    j += 1
+            out.append(source[i:j + 1])
+            last = ch
+            i = j + 1
+            continue
+        if ch == "`" or (ch == "}" and template_depth and template_depth[-1] == 0):
+            if ch == "}":
+                template_depth.pop()
+            j = i + 1
+            while j < n and source[j] != "`" and not source.startswith("${", j):
+                j += 2 if source[j] == "\\" else 1
+            if source.startswith("${", j):
+                template_depth.append(0)
+                out.append(source[i:j + 2])
+                i = j + 2
+                last = "{"
+            else:
+                out.append(source[i:j + 1])
+                i = j + 1
+                last = "`"
+            continue
+        if template_depth and ch in "{}":
+            template_depth[-1] += 1 if ch == "{" else -1
+
+        if ch == "\n":
+            while out and out[-1] in (" ", "\t"):
+                out.pop()
+            if out and out[-1] != "\n":
+                out.append("\n")
+            at_line_start = True
+        elif ch in " \t":
+            if out and out[-1] not in (" ", "\n"):
+                out.append(" ")
+        else:
+            out.append(ch)
+            last = ch
+        i += 1
+    return "".join(out).strip() + "\n"
+
+
+MINIFIERS = {".css": minify_css, ".js": minify_js}
+
+
+# ------------------------
+# Build step
+# ------------------------
+def fingerprinted_name(relpath, data):
+    root, ext = os.path.splitext(relpath)
+    return f"{root}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+
+
+def build_assets(static_folder, dirs=ASSET_DIRS, minify=True, level=9, brotli_quality=11):
+    """Minify, fingerprint and precompress ``static/{css,js,img}`` into ``static/dist``.
+
+    Each asset is written as ``dist/<dir>/<name>.<hash>.<ext>``, where the
+    hash covers the bytes served, with ``.br``/``.gz`` siblings for text
+    files when they are smaller. ``dist/manifest.json`` maps source names
+    to those files. The previous build is removed first. Returns the
+    manifest.
+    """
+    dist = os.path.join(static_folder, DIST_DIR)
+    if os.path.isdir(dist):
+        shutil.rmtree(dist)
+    manifest = {"assets": {}, "encodings": {}}
+
+    for top in dirs:
+        for root, _, files in os.walk(os.path.join(static_folder, top)):
+            for name in sorted(files):
+                source = os.path.join(root, name)
+                relpath = os.path.relpath(source, static_folder).replace(os.sep, "/")
+                ext = os.path.splitext(name)[1].lower()
+                with open(source, "rb") as f:
+                    data = f.read()
+                if minify and ext in MINIFIERS:
+                    data = MINIFIERS[ext](data.decode("utf-8")).encode("utf-8")
+
+                target = f"{DIST_DIR}/{fingerprinted_name(relpath, data)}"
+                path = os.path.join(static_folder, target)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(data)
+                manifest["assets"][relpath] = target
+
+                if ext not in TEXT_EXTENSIONS:
+                    continue
+                for encoding in available_encodings():
+                    body = compress(data, encoding, level, brotli_quality)
+                    if len(body) < len(data):
+                        with open(path + ENCODING_SUFFIXES[encoding], "wb") as f:
+                            f.write(body)
+                        manifest["encodings"].setdefault(target, []).append(encoding)
+
+    with open(os.path.join(dist, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(path):
+    """The build manifest, or an empty one when assets were not built."""
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {"assets": {}, "encodings": {}}
+    return {"assets": manifest.get("assets", {}), "encodings": manifest.get("encodings", {})}
+
+
+# ------------------------
+# Serving
+# ------------------------
+def asset_url(filename):
+    """``url_for('static', ...)`` for the fingerprinted copy of ``filename``.
+
+    Falls back to the plain file when the build step has not run (e.g. in
+    development), so templates work either way.
+    """
+    manifest = current_app.extensions["asset_manifest"]
+    return url_for("static", filename=manifest["assets"].get(filename, filename))
+
+
+def init_assets(app):
+    """Config: ``ASSET_MANIFEST`` (default ``static/dist/manifest.json``)."""
+    path = app.config.get("ASSET_MANIFEST") or os.path.join(app.static_folder, DIST_DIR, MANIFEST_NAME)
+    manifest = load_manifest(path)
+    app.extensions["asset_manifest"] = manifest
+    app.jinja_env.globals["asset_url"] = asset_url
+    fingerprinted = set(manifest["assets"].values())
+
+    @app.before_request
+    def serve_precompressed():
+        if request.endpoint != "static":
+            return None
+        filename = request.view_args.get("filename", "")
+        encodings = manifest["encodings"].get(filename)
+        if not encodings:
+            return None
+        encoding = request.accept_encodings.best_match(encodings)
+        if encoding is None:
+            return None
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        response = send_from_directory(app.static_folder, filename + ENCODING_SUFFIXES[encoding], mimetype=mimetype)
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    @app.after_request
+    def cache_fingerprinted_assets(response):
+        if request.endpoint == "static" and response.status_code in (200, 304):
+            filename = (request.view_args or {}).get("filename", "")
+            if filename in fingerprinted:
+                # The name changes whenever the content does
+                response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+                response.vary.add("Accept-Encoding")
+        return response
@@ -0,0 +1,142 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+from .invalidation import listings_generation
+
+
+class LRUCache:
+    """In-process LRU store with a per-entry TTL.
+
+    This is the default backend for :class:`ResponseCache`. Any object with
+    the same ``get``/``set``/``clear`` methods can stand in for it (e.g. a
+    shared store in front of several workers).
+    """
+
+    def __init__(self, maxsize=512, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.evictions = 0
+        self.expirations = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ResponseCache:
+    """Ready-to-send response bodies keyed on the normalized request.
+
+    Keys carry the listings generation, so a write anywhere makes every
+    older entry unreachable; the backend's LRU ages them out.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else LRUCache()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key(self, namespace, *parts):
+        return f"{namespace}:{listings_generation()}:" + "|".join(str(p) for p in parts)
+
+    def get(self, key):
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self.backend.set(key, value)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": getattr(self.backend, "evictions", None),
+            "expirations": getattr(self.backend, "expirations", None),
+            "size": len(self.backend) if hasattr(self.backend, "__len__") else None,
+            "maxsize": getattr(self.backend, "maxsize", None),
+        }
+
+
+def normalize_filters(filters_param):
+    """Canonical string for a ``filters`` query value.
+
+    Empty values are dropped and lists sorted so equivalent payloads from
+    explore.js share one cache entry. Unparseable input normalizes to no
+    filters, which is how get_properties treats it too.
+    """
+    if not filters_param:
+        return ""
+    try:
+        filters = json.loads(filters_param)
+    except ValueError:
+        return ""
+    if not isinstance(filters, dict):
+        return ""
+
+    normalized = {}
+    for name, value in filters.items():
+        if value in (None, "", [], {}):
+            continue
+        if isinstance(value, list):
+            value = sorted(value, key=str)
+        normalized[name] = value
+    return json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+
+
+def init_listing_cache(app):
+    backend = app.config.get("LISTING_CACHE_BACKEND")
+    if backend is None:
+        backend = LRUCache(
+            maxsize=app.config.get("LISTING_CACHE_SIZE", 512),
+            ttl=app.config.get("LISTING_CACHE_TTL", 30),
+        )
+    app.extensions["listing_cache"] = ResponseCache(backend)
+
+
+def listing_cache():
+    return current_app.extensions["listing_cache"]
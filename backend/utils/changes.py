@@ -0,0 +1,165 @@
+import base64
+import binascii
+from datetime import datetime, timezone
+
+from sqlalchemy import and_, delete, func, insert, or_, select, update
+
+from ..db import db
+from ..models.properties import Property
+from ..models.properties_archive import PropertyArchive
+from ..models.property_tombstones import PropertyTombstone
+from ..models.table_versions import TableVersion
+from .listing_filters import listing_query
+from .serializers import columns_for, serialize_properties
+
+# Rows per UPDATE ... IN (...) when stamping by id
+STAMP_BATCH_SIZE = 500
+
+
+# ------------------------
+# Tokens
+# ------------------------
+def encode_change_token(seq, after_id=None):
+    """Opaque ``since`` token: everything up to ``seq`` (and, within ``seq``, up to ``after_id``)."""
+    raw = f"chg:{seq}" if after_id is None else f"chg:{seq}:{after_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_change_token(token):
+    """Return ``(seq, after_id)``; ``after_id`` is None at a version boundary."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        prefix, *parts = base64.urlsafe_b64decode(padded.encode()).decode().split(":")
+        if prefix != "chg" or len(parts) not in (1, 2):
+            raise ValueError
+        seq = int(parts[0])
+        return seq, int(parts[1]) if len(parts) == 2 else None
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise ValueError("Invalid since token")
+
+
+# ------------------------
+# Writes
+# ------------------------
+def claim_property_ids(count):
+    """``count`` ids above every listing id issued so far; call after the version bump.
+
+    Archived and deleted listings keep their ids, but SQLite (and MySQL
+    5.7 after a restart) would hand out the highest of them again. The
+    bump's row lock serializes listing writers, so the ids are free.
+    """
+    floor = max(
+        db.session.scalar(select(func.max(model.property_id))) or 0
+        for model in (Property, PropertyArchive, PropertyTombstone)
+    )
+    return list(range(floor + 1, floor + 1 + count))
+
+
+def record_property_changes(changed=(), deleted=()):
+    """Bump the properties version and stamp this transaction's writes with it.
+
+    Use in place of ``TableVersion.bump("properties")``, before the commit.
+    ``changed`` holds Property objects (new or modified) or ids of rows
+    written without the ORM; ``deleted`` holds the deleted listings (objects
+    or rows with ``property_id`` and ``owner_id``), which leave tombstones.
+    New Property objects get their ids here. Rows inserted with Core
+    statements take the returned version as their ``change_seq`` and their
+    ids from ``claim_property_ids``.
+    """
+    # Not flushed before the bump: new listings must not take an id yet
+    with db.session.no_autoflush:
+        seq = TableVersion.bump("properties")
+        new = [item for item in changed if isinstance(item, Property) and item.property_id is None]
+        for item, property_id in zip(new, claim_property_ids(len(new)) if new else ()):
+            item.property_id = property_id
+    now = datetime.now(timezone.utc)
+
+    ids = []
+    for item in changed:
+        if isinstance(item, Property):
+            item.change_seq = seq
+            item.updated_at = now
+        else:
+            ids.append(item)
+    for start in range(0, len(ids), STAMP_BATCH_SIZE):
+        chunk = ids[start:start + STAMP_BATCH_SIZE]
+        db.session.execute(
+            update(Property).where(Property.property_id.in_(chunk)).values(change_seq=seq, updated_at=now),
+            execution_options={"synchronize_session": False},
+        )
+
+    if deleted:
+        rows = [{"property_id": d.property_id, "owner_id": d.owner_id, "change_seq": seq, "deleted_at": now}
+                for d in deleted]
+        # Replaces an older tombstone if a database reused the id
+        db.session.execute(delete(PropertyTombstone).where(
+            PropertyTombstone.property_id.in_([r["property_id"] for r in rows])))
+        db.session.execute(insert(PropertyTombstone), rows)
+    return seq
+
+
+# ------------------------
+# Feed
+# ------------------------
+def _after(model, since):
+    seq, after_id = since
+    if after_id is None:
+        return model.change_seq > seq
+    # Range-scannable on (change_seq, property_id), unlike a row comparison
+    return and_(model.change_seq >= seq, or_(model.change_seq > seq, model.property_id > after_id))
+
+
+def _window(model, since, limit, owner_id):
+    query = db.session.query(model.change_seq, model.property_id)
+    if since is not None:
+        query = query.filter(_after(model, since))
+    if owner_id is not None:
+        query = query.filter(model.owner_id == owner_id)
+    return query.order_by(model.change_seq, model.property_id).limit(limit + 1).all()
+
+
+def changes_since(since, filters_param, fields, limit, owner_id=None):
+    """One page of the listing change feed after ``since`` (a decoded token).
+
+    Walks writes in ``(change_seq, property_id)`` order. Each listing
+    written in the window appears once: under ``changed`` if it currently
+    matches (Available and ``filters``, or owned by ``owner_id``), otherwise
+    under ``removed`` - deleted, made unavailable, or edited out of the
+    filters. Clients drop ``removed`` ids, upsert ``changed`` rows and poll
+    again with ``next_since``. Without ``since`` the page is a full sync:
+    current rows only, no removals.
+    """
+    events = [(seq, pid, False) for seq, pid in _window(Property, since, limit, owner_id)]
+    if since is not None:
+        events += [(seq, pid, True) for seq, pid in _window(PropertyTombstone, since, limit, owner_id)]
+    events.sort()
+    has_more = len(events) > limit
+    events = events[:limit]
+
+    # An id both tombstoned and live (reused by the database): last write wins
+    latest = {pid: deleted for _, pid, deleted in events}
+    live = [pid for pid, deleted in latest.items() if not deleted]
+    rows = []
+    if live:
+        if owner_id is not None:
+            query = Property.query.filter_by(owner_id=owner_id)
+        else:
+            query = listing_query(filters_param)
+        rows = (query.filter(Property.property_id.in_(live))
+                .with_entities(*columns_for(fields))
+                .order_by(Property.change_seq, Property.property_id)
+                .all())
+    shown = {row.property_id for row in rows}
+
+    if events:
+        next_since = encode_change_token(events[-1][0], events[-1][1])
+    elif since is not None:
+        next_since = encode_change_token(*since)
+    else:
+        next_since = encode_change_token(TableVersion.current("properties")[0])
+    return {
+        "changed": serialize_properties(rows, fields),
+        "removed": sorted(pid for pid in latest if pid not in shown) if since is not None else [],
+        "next_since": next_since,
+        "has_more": has_more,
+    }
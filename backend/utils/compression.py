@@ -0,0 +1,119 @@
+import gzip
+import hashlib
+import threading
+
+from flask import request
+
+try:  # optional; without it only gzip is offered
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+from .cache import LRUCache
+
+# Bodies worth compressing: JSON and HTML repeat the same keys, enum values
+# and markup on every row. Images are compressed already.
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/html", "text/plain", "text/css", "application/javascript"}
+
+
+def available_encodings():
+    """Codings we can produce, in order of preference."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def compress(data, encoding, level=6, brotli_quality=4):
+    if encoding == "br":
+        return brotli.compress(data, quality=brotli_quality)
+    # mtime=0: the same body always gives the same bytes
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+class ResponseCompressor:
+    """Negotiated gzip/brotli for dynamic responses above ``min_size`` bytes.
+
+    Streamed and file responses are left alone (static assets are
+    precompressed at build time, see utils/assets.py). Compressed bodies of
+    responses that carry an ETag (the shared, cacheable pages) are kept in
+    a small LRU, keyed on a digest of the uncompressed body, so a cached
+    listing page is not recompressed on every hit. The weak ETag is not
+    enough: a body can change under the same tag (e.g. image variants
+    landing) without a table version bump.
+    """
+
+    def __init__(self, min_size=500, level=6, brotli_quality=4, mimetypes=COMPRESSIBLE_MIMETYPES, cache_size=256):
+        self.min_size = min_size
+        self.level = level
+        self.brotli_quality = brotli_quality
+        self.mimetypes = set(mimetypes)
+        self.cache = LRUCache(maxsize=cache_size, ttl=3600) if cache_size else None
+        self._lock = threading.Lock()
+        self.responses = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def negotiate(self):
+        return request.accept_encodings.best_match(available_encodings())
+
+    def __call__(self, response):
+        if response.mimetype not in self.mimetypes:
+            return response
+        # Caches must keep one copy per coding, whichever this client gets
+        response.vary.add("Accept-Encoding")
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or "Content-Encoding" in response.headers or "no-transform" in response.cache_control):
+            return response
+        encoding = self.negotiate()
+        if encoding is None or (response.content_length or 0) < self.min_size:
+            return response
+
+        data = response.get_data()
+        cacheable = self.cache is not None and "ETag" in response.headers
+        key = (encoding, hashlib.blake2b(data, digest_size=16).digest()) if cacheable else None
+        body = self.cache.get(key) if key else None
+        if body is None:
+            body = compress(data, encoding, self.level, self.brotli_quality)
+            if key:
+                self.cache.set(key, body)
+        if len(body) >= len(data):
+            return response
+
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+        with self._lock:
+            self.responses[encoding] = self.responses.get(encoding, 0) + 1
+            self.bytes_in += len(data)
+            self.bytes_out += len(body)
+        return response
+
+    def metrics(self):
+        """Prometheus families (see Metrics.add_collector)."""
+        with self._lock:
+            responses, bytes_in, bytes_out = dict(self.responses), self.bytes_in, self.bytes_out
+        return [
+            ("http_compressed_responses_total", "Responses sent compressed, by coding.", "counter",
+             [({"encoding": name}, count) for name, count in sorted(responses.items())]),
+            ("http_compression_input_bytes_total", "Body bytes before compression.", "counter", [({}, bytes_in)]),
+            ("http_compression_output_bytes_total", "Body bytes after compression.", "counter", [({}, bytes_out)]),
+        ]
+
+
+def init_compression(app):
+    """Config: ``COMPRESSION_ENABLED``, ``COMPRESS_MIN_SIZE``,
+    ``COMPRESS_LEVEL``, ``COMPRESS_BROTLI_QUALITY``, ``COMPRESS_CACHE_SIZE``.
+
+    Call after ``init_instrumentation`` so request metrics count the bytes
+    actually sent.
+    """
+    if not app.config.get("COMPRESSION_ENABLED", True):
+        return
+    compressor = ResponseCompressor(
+        min_size=app.config.get("COMPRESS_MIN_SIZE", 500),
+        level=app.config.get("COMPRESS_LEVEL", 6),
+        brotli_quality=app.config.get("COMPRESS_BROTLI_QUALITY", 4),
+        cache_size=app.config.get("COMPRESS_CACHE_SIZE", 256),
+    )
+    app.extensions["compression"] = compressor
+    app.after_request(compressor)
+    metrics = app.extensions.get("metrics")
+    if metrics is not None:
+        metrics.add_collector(compressor.metrics)
@@ -0,0 +1,50 @@
+import hashlib
+
+from flask import current_app, request
+
+from ..models.table_versions import TableVersion
+
+
+def make_validators(table_name, *parts):
+    """ETag and Last-Modified for a response derived from ``table_name``.
+
+    The ETag combines the table's change counter with whatever else shapes
+    the body (filters, cursor, user), so it costs one primary-key read.
+    """
+    version, updated_at = TableVersion.current(table_name)
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()[:16]
+    return f"{table_name}-{version}-{digest}", updated_at
+
+
+def record_validators(kind, record):
+    """ETag for a response that is exactly ``record`` (one row's public fields).
+
+    Derived from the row itself, so writes to other rows of the table
+    leave it valid. There is no Last-Modified.
+    """
+    digest = hashlib.sha1(repr(sorted(record.items())).encode()).hexdigest()[:16]
+    return f"{kind}-{digest}", None
+
+
+def not_modified(etag, last_modified):
+    """Return a 304 response if the client's copy is still current."""
+    if request.if_none_match:
+        fresh = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since and last_modified:
+        fresh = last_modified.replace(microsecond=0, tzinfo=None) <= request.if_modified_since.replace(tzinfo=None)
+    else:
+        fresh = False
+
+    if not fresh:
+        return None
+    response = current_app.response_class(status=304)
+    return add_validators(response, etag, last_modified)
+
+
+def add_validators(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified
+    # Cacheable, but always revalidated; bodies can depend on the session
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
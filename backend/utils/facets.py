@@ -0,0 +1,104 @@
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import func
+
+from ..db import db
+from ..models.properties import Property
+from .invalidation import listings_generation
+
+RENT_BUCKET_SIZE = 5000
+# Safety net for writes made by other worker processes, which do not bump
+# this process's generation counter.
+FACETS_TTL_SECONDS = 60
+
+_cache_lock = threading.Lock()
+
+
+def _value_counts(column):
+    rows = (
+        db.session.query(column, func.count())
+        .filter(Property.status == "Available")
+        .group_by(column)
+        .order_by(column)
+        .all()
+    )
+    return [{"value": value, "count": count} for value, count in rows if value]
+
+
+def _location_tree():
+    rows = (
+        db.session.query(Property.district, Property.city, Property.area, func.count())
+        .filter(Property.status == "Available")
+        .group_by(Property.district, Property.city, Property.area)
+        .order_by(Property.district, Property.city, Property.area)
+        .all()
+    )
+
+    districts = {}
+    for district, city, area, count in rows:
+        d = districts.setdefault(district, {"value": district, "count": 0, "cities": {}})
+        c = d["cities"].setdefault(city, {"value": city, "count": 0, "areas": []})
+        c["areas"].append({"value": area, "count": count})
+        c["count"] += count
+        d["count"] += count
+
+    return [
+        {**d, "cities": list(d["cities"].values())}
+        for d in districts.values()
+    ]
+
+
+def _rent_histogram():
+    # Group on the bucket's lower bound; the modulo keeps this portable
+    # between SQLite and MySQL (no FLOOR in older SQLite builds).
+    lower = Property.rent_price - (Property.rent_price % RENT_BUCKET_SIZE)
+    rows = (
+        db.session.query(lower, func.count())
+        .filter(Property.status == "Available")
+        .group_by(lower)
+        .all()
+    )
+
+    buckets = {}
+    for start, count in rows:
+        if start is None:
+            continue
+        start = int(float(start) // RENT_BUCKET_SIZE) * RENT_BUCKET_SIZE
+        buckets[start] = buckets.get(start, 0) + count
+
+    return {
+        "bucket_size": RENT_BUCKET_SIZE,
+        "buckets": [
+            {"min": start, "max": start + RENT_BUCKET_SIZE, "count": buckets[start]}
+            for start in sorted(buckets)
+        ],
+    }
+
+
+def compute_facets():
+    """Distinct values and counts for every explore filter panel."""
+    return {
+        "districts": _location_tree(),
+        "house_type": _value_counts(Property.house_type),
+        "property_type": _value_counts(Property.property_type),
+        "furnishing": _value_counts(Property.furnishing),
+        "facing": _value_counts(Property.facing),
+        "rent_price": _rent_histogram(),
+    }
+
+
+def get_facets():
+    """Cached facets, rebuilt after any listing write or once the TTL lapses."""
+    generation = listings_generation()
+    now = time.monotonic()
+    cache = current_app.extensions.setdefault("facets_cache", {"generation": None, "expires": 0.0, "data": None})
+    with _cache_lock:
+        if cache["generation"] == generation and now < cache["expires"]:
+            return cache["data"]
+
+    data = compute_facets()
+    with _cache_lock:
+        cache.update(generation=generation, expires=now + FACETS_TTL_SECONDS, data=data)
+    return data
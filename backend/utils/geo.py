@@ -0,0 +1,156 @@
+import math
+
+from sqlalchemy import and_, or_
+
+from ..models.properties import Property
+from .listing_filters import listing_query
+from .serializers import columns_for
+
+# Stored precision (~5 m cells); queries use a prefix of it
+GEOHASH_PRECISION = 9
+# Coarsest/finest prefix used to cover a search circle
+MIN_QUERY_PRECISION = 2
+MAX_QUERY_PRECISION = 7
+# Upper bound on cells per query; fewer, larger cells beyond this
+MAX_COVER_CELLS = 32
+DEFAULT_RADIUS_KM = 3.0
+MAX_RADIUS_KM = 50.0
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def _bits(precision):
+    """Latitude and longitude bits in a geohash of ``precision`` characters."""
+    total = 5 * precision
+    return total // 2, total - total // 2
+
+
+def _cell(lat, lng, precision):
+    lat_bits, lng_bits = _bits(precision)
+    i = min(int((lat + 90.0) / 180.0 * (1 << lat_bits)), (1 << lat_bits) - 1)
+    j = min(int((lng + 180.0) / 360.0 * (1 << lng_bits)), (1 << lng_bits) - 1)
+    return i, j
+
+
+def _interleave(i, j, precision):
+    """Z-order number of grid cell (lat row ``i``, lng column ``j``).
+
+    Bits alternate starting with longitude, which is what makes it a
+    geohash: its base-32 digits are the geohash characters.
+    """
+    lat_bits, lng_bits = _bits(precision)
+    z = 0
+    for k in range(5 * precision):
+        if k % 2 == 0:
+            lng_bits -= 1
+            bit = (j >> lng_bits) & 1
+        else:
+            lat_bits -= 1
+            bit = (i >> lat_bits) & 1
+        z = (z << 1) | bit
+    return z
+
+
+def _to_geohash(z, precision):
+    chars = []
+    for _ in range(precision):
+        chars.append(_BASE32[z & 31])
+        z >>= 5
+    return "".join(reversed(chars))
+
+
+def encode_geohash(lat, lng, precision=GEOHASH_PRECISION):
+    return _to_geohash(_interleave(*_cell(lat, lng, precision), precision), precision)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat, lng, radius_km):
+    """``(min_lat, min_lng, max_lat, max_lng)`` enclosing the circle.
+
+    Clamped at the poles and the antimeridian rather than wrapping, which
+    is fine for a single-country catalog.
+    """
+    dlat = radius_km / KM_PER_DEGREE
+    dlng = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+    return (max(lat - dlat, -90.0), max(lng - dlng, -180.0),
+            min(lat + dlat, 90.0), min(lng + dlng, 180.0))
+
+
+def covering_ranges(box):
+    """Geohash ``[(low, high)]`` ranges whose cells cover ``box``.
+
+    Uses the finest prefix length that needs at most MAX_COVER_CELLS
+    cells, and merges cells that are adjacent in geohash order, so each
+    range is one index range scan. ``high`` is the first cell past the
+    range (None after the last cell), so the bounds hold only base32
+    characters and compare the same under any collation, MySQL's
+    accent- and case-insensitive default included.
+    """
+    min_lat, min_lng, max_lat, max_lng = box
+    for precision in range(MAX_QUERY_PRECISION, MIN_QUERY_PRECISION - 1, -1):
+        i0, j0 = _cell(min_lat, min_lng, precision)
+        i1, j1 = _cell(max_lat, max_lng, precision)
+        if (i1 - i0 + 1) * (j1 - j0 + 1) <= MAX_COVER_CELLS or precision == MIN_QUERY_PRECISION:
+            break
+
+    cells = sorted(_interleave(i, j, precision) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1))
+    ranges = []
+    start = prev = cells[0]
+    for z in cells[1:]:
+        if z != prev + 1:
+            ranges.append((start, prev))
+            start = z
+        prev = z
+    ranges.append((start, prev))
+    end = 32 ** precision
+    return [(_to_geohash(lo, precision), _to_geohash(hi + 1, precision) if hi + 1 < end else None)
+            for lo, hi in ranges]
+
+
+def location_fields(data):
+    """Column values for the ``latitude``/``longitude`` in ``data``.
+
+    Empty when no location was given; call validate_property first.
+    """
+    if data.get("latitude") in (None, "") or data.get("longitude") in (None, ""):
+        return {}
+    lat, lng = float(data["latitude"]), float(data["longitude"])
+    return {"latitude": lat, "longitude": lng, "geohash": encode_geohash(lat, lng)}
+
+
+def nearby_listings(lat, lng, radius_km, filters_param, fields, limit):
+    """Available listings within ``radius_km`` of a point, nearest first.
+
+    The geohash index narrows the search to the cells around the circle,
+    the bounding box trims their edges and the exact haversine distance
+    decides the rest. Returns ``(rows, distances, has_more)``.
+    """
+    box = bounding_box(lat, lng, radius_km)
+    columns = columns_for(fields)
+    columns += [getattr(Property, f) for f in ("latitude", "longitude") if f not in fields]
+
+    query = (
+        listing_query(filters_param)
+        .with_entities(*columns)
+        .filter(or_(*(and_(Property.geohash >= low, Property.geohash < high) if high else Property.geohash >= low
+                      for low, high in covering_ranges(box))))
+        .filter(Property.latitude.between(box[0], box[2]), Property.longitude.between(box[1], box[3]))
+    )
+
+    matches = []
+    for row in query:
+        distance = haversine_km(lat, lng, row.latitude, row.longitude)
+        if distance <= radius_km:
+            matches.append((distance, -row.property_id, row))
+    matches.sort(key=lambda m: m[:2])
+
+    rows = [row for _, _, row in matches[:limit]]
+    distances = {row.property_id: distance for distance, _, row in matches[:limit]}
+    return rows, distances, len(matches) > limit
@@ -0,0 +1,148 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:  # optional; without Pillow originals are served as-is
+    from PIL import Image, ImageOps, features
+except ImportError:  # pragma: no cover - depends on the environment
+    Image = None
+
+from ..db import db
+from ..models.image_variants import ImageVariant
+from ..models.property_images import PropertyImage
+from .asgi import call_in_loop
+from .invalidation import listings_changed
+
+logger = logging.getLogger(__name__)
+
+# Longest edge in pixels for each variant
+VARIANT_SIZES = {"thumb": 400, "medium": 1024, "full": 2048}
+VARIANT_QUALITY = {"thumb": 70, "medium": 80, "full": 85}
+VARIANT_DIR = "variants"
+UPLOAD_URL = "/static/uploads/"
+
+
+def _output_format():
+    if Image is not None and features.check("webp"):
+        return "webp", "WEBP"
+    return "jpeg", "JPEG"
+
+
+def make_variants(upload_folder, source):
+    """Write the resized variants of ``source``.
+
+    Returns ``((width, height), variants)``: the upright size of the
+    original and the metadata of each variant.
+
+    Pixels are re-encoded from scratch, so EXIF (GPS, camera serials) and
+    other metadata never reach the variants.
+    """
+    ext, pil_format = _output_format()
+    out_dir = os.path.join(upload_folder, VARIANT_DIR)
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.splitext(source)[0]
+
+    with Image.open(os.path.join(upload_folder, source)) as original:
+        image = ImageOps.exif_transpose(original)
+        image = image.convert("RGBA" if pil_format == "WEBP" and image.mode in ("RGBA", "LA", "P") else "RGB")
+
+        variants = []
+        for name, edge in VARIANT_SIZES.items():
+            resized = image.copy()
+            resized.thumbnail((edge, edge), Image.LANCZOS)
+            # The edge size is part of the name, so changing VARIANT_SIZES
+            # never serves a stale file from an immutable cache entry
+            filename = f"{VARIANT_DIR}/{stem}__{name}{edge}.{ext}"
+            resized.save(os.path.join(upload_folder, filename), pil_format,
+                         quality=VARIANT_QUALITY[name], optimize=True)
+            variants.append(dict(source=source, variant=name, filename=filename,
+                                 width=resized.width, height=resized.height, format=ext))
+    return image.size, variants
+
+
+class ImagePipeline:
+    """Background thread pool that builds image variants after upload.
+
+    Pillow releases the GIL while decoding and resampling, so threads are
+    enough and no broker or extra process is needed.
+    """
+
+    def __init__(self, app, max_workers=2):
+        self.app = app
+        self.enabled = Image is not None
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="images")
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def submit(self, filenames):
+        if not self.enabled or not filenames:
+            return None
+        future = self._executor.submit(self._process, list(filenames))
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._discard)
+        return future
+
+    def _discard(self, future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def wait(self):
+        """Block until every submitted job has finished (tests, CLI)."""
+        with self._lock:
+            pending = list(self._pending)
+        for future in pending:
+            future.result()
+
+    def _process(self, filenames):
+        upload_folder = self.app.config["UPLOAD_FOLDER"]
+        rows, sizes = [], {}
+        for source in filenames:
+            try:
+                sizes[source], variants = make_variants(upload_folder, source)
+                rows.extend(variants)
+            except Exception:
+                logger.exception("image processing failed source=%s", source)
+
+        if rows:
+            # Under ASGI with an async driver the queries must run on the loop
+            call_in_loop(self.app, self._save, rows, sizes)
+
+    def _save(self, rows, sizes):
+        with self.app.app_context():
+            try:
+                sources = {row["source"] for row in rows}
+                ImageVariant.query.filter(ImageVariant.source.in_(sources)).delete(synchronize_session=False)
+                db.session.add_all(ImageVariant(**row) for row in rows)
+                for source, (width, height) in sizes.items():
+                    PropertyImage.query.filter_by(storage_key=source).update(
+                        {PropertyImage.width: width, PropertyImage.height: height}, synchronize_session=False)
+                db.session.commit()
+                # Drop this process's cached listing bodies so they pick up the
+                # new URLs. The table version is left alone: URLs pointing at
+                # the original stay valid, so clients holding an ETag are not
+                # wrong, and other workers' search indexes need no rebuild.
+                listings_changed()
+            except Exception:
+                db.session.rollback()
+                logger.exception("image variant save failed")
+            finally:
+                db.session.remove()
+
+
+def init_image_pipeline(app):
+    app.extensions["image_pipeline"] = ImagePipeline(app, app.config.get("IMAGE_WORKERS", 2))
+
+
+def image_urls(storage_key, variants=()):
+    """``{"thumb", "medium", "full", "original"}`` URLs for one photo.
+
+    ``variants`` are its ``(variant, filename)`` pairs; sizes that are not
+    ready yet point at the original upload.
+    """
+    original = UPLOAD_URL + storage_key
+    urls = {"thumb": original, "medium": original, "full": original, "original": original}
+    for variant, filename in variants:
+        urls[variant] = UPLOAD_URL + filename
+    return urls
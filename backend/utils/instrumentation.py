@@ -0,0 +1,286 @@
+import cProfile
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+
+from ..db import app_engines
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the request duration histogram
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Collapse expanded IN lists and whitespace so repeats of one query compare equal
+_IN_LIST_RE = re.compile(r"IN \((?:\?|%s|:\w+)(?:, ?(?:\?|%s|:\w+))*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_statement(statement):
+    return _IN_LIST_RE.sub("IN (?)", _SPACE_RE.sub(" ", statement).strip())
+
+
+class RequestStats:
+    """What one request spent: SQL, serialization, bytes sent."""
+
+    __slots__ = ("started", "sql_count", "sql_time", "serialize_time", "statements")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.serialize_time = 0.0
+        self.statements = Counter()
+
+    def repeated_selects(self, threshold):
+        """SELECTs run at least ``threshold`` times - the shape of an N+1."""
+        return [(s, n) for s, n in self.statements.items() if n >= threshold and s.startswith("SELECT")]
+
+
+def current_stats():
+    if has_request_context():
+        return g.get("request_stats")
+    return None
+
+
+@contextmanager
+def serialization_timer():
+    """Charge the enclosed block to serialization, minus any SQL it runs."""
+    stats = current_stats()
+    if stats is None:
+        yield
+        return
+    start, sql_before = time.perf_counter(), stats.sql_time
+    try:
+        yield
+    finally:
+        stats.serialize_time += (time.perf_counter() - start) - (stats.sql_time - sql_before)
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """``jsonify`` with its encoding time counted as serialization."""
+
+    def dumps(self, obj, **kwargs):
+        with serialization_timer():
+            return super().dumps(obj, **kwargs)
+
+
+class Metrics:
+    """Per-process request aggregates, rendered in Prometheus text format.
+
+    Other modules can contribute gauges with :meth:`add_collector`; a
+    collector returns ``[(name, help, type, [(labels, value)])]``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = Counter()  # (endpoint, method, status) -> count
+        self.durations = defaultdict(lambda: [0] * (len(DURATION_BUCKETS) + 1))  # endpoint -> bucket counts
+        self.duration_sum = Counter()
+        self.sql_statements = Counter()
+        self.sql_seconds = Counter()
+        self.serialize_seconds = Counter()
+        self.response_bytes = Counter()
+        self.n_plus_one = Counter()
+        self._collectors = []
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+
+    def observe(self, endpoint, method, status, duration, stats, size, n_plus_one):
+        with self._lock:
+            self.requests[(endpoint, method, str(status))] += 1
+            buckets = self.durations[endpoint]
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    buckets[i] += 1
+                    break
+            else:
+                buckets[-1] += 1
+            self.duration_sum[endpoint] += duration
+            self.sql_statements[endpoint] += stats.sql_count
+            self.sql_seconds[endpoint] += stats.sql_time
+            self.serialize_seconds[endpoint] += stats.serialize_time
+            self.response_bytes[endpoint] += size
+            if n_plus_one:
+                self.n_plus_one[endpoint] += 1
+
+    def render(self):
+        lines = []
+
+        def family(name, help_text, kind, samples, suffix=""):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(_sample(name + suffix, labels, value) for labels, value in samples)
+
+        with self._lock:
+            family("http_requests_total", "Requests handled.", "counter", [
+                ({"endpoint": e, "method": m, "status": s}, n) for (e, m, s), n in sorted(self.requests.items())
+            ])
+
+            buckets = []
+            for endpoint, counts in sorted(self.durations.items()):
+                cumulative = 0
+                for bound, count in zip(DURATION_BUCKETS + ("+Inf",), counts):
+                    cumulative += count
+                    buckets.append(({"endpoint": endpoint, "le": bound}, cumulative))
+            family("http_request_duration_seconds", "Request latency.", "histogram", buckets, suffix="_bucket")
+            for endpoint, total in sorted(self.duration_sum.items()):
+                lines.append(_sample("http_request_duration_seconds_sum", {"endpoint": endpoint}, f"{total:.6f}"))
+                lines.append(_sample("http_request_duration_seconds_count", {"endpoint": endpoint},
+                                     sum(self.durations[endpoint])))
+
+            for name, help_text, values, fmt in (
+                ("db_statements_total", "SQL statements executed.", self.sql_statements, "{}"),
+                ("db_duration_seconds_total", "Time spent in SQL.", self.sql_seconds, "{:.6f}"),
+                ("serialization_duration_seconds_total", "Time spent encoding responses.",
+                 self.serialize_seconds, "{:.6f}"),
+                ("http_response_size_bytes_total", "Response body bytes (streamed bodies excluded).",
+                 self.response_bytes, "{}"),
+                ("n_plus_one_requests_total", "Requests that repeated one SELECT past the threshold.",
+                 self.n_plus_one, "{}"),
+            ):
+                family(name, help_text, "counter",
+                       [({"endpoint": e}, fmt.format(v)) for e, v in sorted(values.items())])
+
+        for collector in self._collectors:
+            for name, help_text, kind, samples in collector():
+                family(name, help_text, kind, samples)
+        return "\n".join(lines) + "\n"
+
+
+def _sample(name, labels, value):
+    if not labels:
+        return f"{name} {value}"
+    label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+    return f"{name}{{{label_text}}} {value}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# -- sampled profiling -----------------------------------------------------
+
+# Only one cProfile may be active per interpreter, so at most one request
+# is profiled at a time; others that draw the sample are skipped.
+_profile_lock = threading.Lock()
+
+
+def _start_profile(rate):
+    if rate <= 0 or random.random() >= rate or not _profile_lock.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:  # another profiler (e.g. a debugger) is active
+        _profile_lock.release()
+        return None
+    return profiler
+
+
+def _finish_profile(profiler, directory, endpoint, duration):
+    try:
+        profiler.disable()
+        os.makedirs(directory, exist_ok=True)
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{endpoint or 'unknown'}-{duration * 1000:.0f}ms.prof"
+        path = os.path.join(directory, name.replace("/", "_"))
+        profiler.dump_stats(path)
+        logger.info("profile written path=%s", path)
+    finally:
+        _profile_lock.release()
+
+
+# -- wiring ------------------------------------------------------------------
+
+def _install_sql_hooks(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._instrumentation_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_instrumentation_start", None)
+        stats = current_stats()
+        if stats is not None and started is not None:
+            elapsed = time.perf_counter() - started
+            stats.sql_count += 1
+            stats.sql_time += elapsed
+            stats.statements[normalize_statement(statement)] += 1
+
+
+def init_instrumentation(app):
+    """Per-request SQL/serialization accounting, ``/metrics`` and sampling.
+
+    Config: ``METRICS_ENABLED``, ``N_PLUS_ONE_THRESHOLD``,
+    ``SERVER_TIMING_HEADER``, ``PROFILE_SAMPLE_RATE``, ``PROFILE_DIR``.
+    """
+    metrics = Metrics()
+    app.extensions["metrics"] = metrics
+    app.json = TimedJSONProvider(app)
+    with app.app_context():
+        for engine in app_engines().values():
+            _install_sql_hooks(engine)
+
+    threshold = app.config.get("N_PLUS_ONE_THRESHOLD", 5)
+    sample_rate = app.config.get("PROFILE_SAMPLE_RATE", 0.0)
+    profile_dir = app.config.get("PROFILE_DIR") or os.path.join(app.instance_path, "profiles")
+
+    @app.before_request
+    def start_request_stats():
+        g.request_stats = RequestStats()
+        g.profiler = _start_profile(sample_rate)
+
+    @app.after_request
+    def finish_request_stats(response):
+        stats = g.pop("request_stats", None)
+        if stats is None:
+            return response
+        duration = time.perf_counter() - stats.started
+        endpoint = request.endpoint or "unmatched"
+
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            _finish_profile(profiler, profile_dir, endpoint, duration)
+
+        repeated = stats.repeated_selects(threshold)
+        for statement, count in repeated:
+            logger.warning("possible N+1 endpoint=%s count=%d statement=%s", endpoint, count, statement[:200])
+
+        size = 0 if response.is_streamed else (response.content_length or 0)
+        if endpoint != "metrics":
+            metrics.observe(endpoint, request.method, response.status_code, duration, stats, size, bool(repeated))
+
+        logger.debug(
+            "request endpoint=%s method=%s status=%d duration_ms=%.2f sql=%d db_ms=%.2f serialize_ms=%.2f bytes=%d",
+            endpoint, request.method, response.status_code, duration * 1000, stats.sql_count,
+            stats.sql_time * 1000, stats.serialize_time * 1000, size,
+        )
+        if app.config.get("SERVER_TIMING_HEADER"):
+            response.headers["Server-Timing"] = (
+                f"db;dur={stats.sql_time * 1000:.2f};desc=\"{stats.sql_count} queries\", "
+                f"serialize;dur={stats.serialize_time * 1000:.2f}, total;dur={duration * 1000:.2f}"
+            )
+        return response
+
+    @app.teardown_request
+    def release_profiler(exc):
+        # after_request did not run (the request failed before a response)
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            profiler.disable()
+            _profile_lock.release()
+
+    if app.config.get("METRICS_ENABLED", True):
+        def metrics_view():
+            return app.response_class(metrics.render(), mimetype="text/plain; version=0.0.4")
+        app.add_url_rule("/metrics", "metrics", metrics_view)
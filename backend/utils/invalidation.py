@@ -0,0 +1,19 @@
+import threading
+
+# Bumped by every route that writes to the properties table. Anything derived
+# from listings (facets, cached responses) remembers the generation it was
+# built at and is stale as soon as the number moves.
+_generation = 0
+_lock = threading.Lock()
+
+
+def listings_changed():
+    """Record a write to the properties table."""
+    global _generation
+    with _lock:
+        _generation += 1
+        return _generation
+
+
+def listings_generation():
+    return _generation
@@ -0,0 +1,73 @@
+import json
+import logging
+
+from ..models.properties import Property
+
+logger = logging.getLogger(__name__)
+
+
+def apply_listing_filters(query, filters):
+    """Narrow a Property query with the filter JSON sent by explore.js."""
+    # Cities
+    if filters.get("cities"):
+        query = query.filter(Property.city.in_(filters["cities"]))
+
+    # Districts
+    if filters.get("districts"):
+        query = query.filter(Property.district.in_(filters["districts"]))
+
+    # Areas (using the dedicated area column)
+    if filters.get("areas"):
+        query = query.filter(Property.area.in_(filters["areas"]))
+
+    # Property Types
+    if filters.get("propertyTypes"):
+        query = query.filter(Property.property_type.in_(filters["propertyTypes"]))
+
+    # BHK
+    if filters.get("bhk"):
+        query = query.filter(Property.house_type.in_(filters["bhk"]))
+
+    # Budget
+    if filters.get("minBudget") and filters.get("maxBudget"):
+        query = query.filter(
+            Property.rent_price.between(filters["minBudget"], filters["maxBudget"])
+        )
+
+    # Car Parking
+    if filters.get("carParking"):
+        query = query.filter(Property.car_parking == filters["carParking"])
+
+    # Pets
+    if filters.get("pets"):
+        query = query.filter(Property.pets == filters["pets"])
+
+    # Facing (multiple allowed)
+    if filters.get("facing"):
+        query = query.filter(Property.facing.in_(filters["facing"]))
+
+    # Furnishing (multiple allowed)
+    if filters.get("furnishing"):
+        query = query.filter(Property.furnishing.in_(filters["furnishing"]))
+
+    # Only listings with at least one photo
+    if filters.get("withPhotos"):
+        query = query.filter(Property.photos.any())
+
+    return query
+
+
+def listing_query(filters_param):
+    """Available listings narrowed by the raw ``filters`` query value.
+
+    Malformed filter JSON is logged and ignored, as explore.js has always
+    relied on.
+    """
+    query = Property.query.filter_by(status="Available")
+    if filters_param:
+        try:
+            filters = json.loads(filters_param)
+            query = apply_listing_filters(query, filters)
+        except Exception as e:
+            logger.warning("ignoring invalid filters error=%s", e)
+    return query
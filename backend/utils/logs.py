@@ -0,0 +1,17 @@
+import logging
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s %(message)s"
+
+
+def configure_logging(app):
+    """Level-gate the ``backend`` loggers with ``LOG_LEVEL``.
+
+    Messages are ``event key=value ...`` lines. A handler is only added
+    when nothing else (gunicorn, pytest, a host app) configured logging.
+    """
+    logger = logging.getLogger("backend")
+    logger.setLevel(app.config.get("LOG_LEVEL", "INFO").upper())
+    if not logger.handlers and not logging.getLogger().handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        logger.addHandler(handler)
@@ -0,0 +1,57 @@
+import base64
+import binascii
+
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(last_id):
+    """Opaque cursor pointing just past the given primary key."""
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return the primary key encoded in ``cursor`` (ValueError if malformed)."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        prefix, _, value = base64.urlsafe_b64decode(padded.encode()).decode().partition(":")
+        if prefix != "id":
+            raise ValueError
+        return int(value)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise ValueError("Invalid cursor")
+
+
+def parse_page_args(args):
+    """Read ``cursor`` and ``limit`` from request args.
+
+    Returns ``(after_id, limit)``; raises ValueError on bad input.
+    """
+    cursor = args.get("cursor")
+    after_id = decode_cursor(cursor) if cursor else None
+
+    limit = args.get("limit", DEFAULT_PAGE_SIZE)
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid limit")
+    if limit < 1:
+        raise ValueError("Invalid limit")
+    return after_id, min(limit, MAX_PAGE_SIZE)
+
+
+def paginate(query, column, after_id, limit):
+    """Keyset-paginate ``query`` in descending ``column`` order.
+
+    Fetches one extra row to know whether another page exists, so the cost
+    of a page only depends on ``limit``, not on the table size.
+    """
+    if after_id is not None:
+        query = query.filter(column < after_id)
+    rows = query.order_by(column.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(getattr(rows[-1], column.key))
+    return rows, next_cursor
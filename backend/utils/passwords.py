@@ -0,0 +1,159 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import current_app, jsonify
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+from .asgi import run_blocking
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasherBusy(Exception):
+    """Every hashing slot stayed taken for ``PASSWORD_HASH_QUEUE_TIMEOUT``."""
+
+
+def canonical_method(method):
+    """Werkzeug method string with its defaults spelled out, as stored in hashes."""
+    name, *args = method.split(":")
+    if name == "scrypt" and not args:
+        return "scrypt:32768:8:1"
+    if name == "pbkdf2" and len(args) < 2:
+        return f"pbkdf2:{args[0] if args else 'sha256'}:{DEFAULT_PBKDF2_ITERATIONS}"
+    return method
+
+
+def _lower_priority(niceness):
+    # Hashing yields the CPU to request threads when both want it
+    if niceness and hasattr(os, "nice"):
+        os.nice(niceness)
+
+
+class PasswordHasher:
+    """Password hashing in a small process pool, admitted through a semaphore.
+
+    A KDF call keeps a core busy for 100 ms or more. Running them in
+    ``workers`` low-priority processes caps how much CPU a login burst can
+    take from the listing endpoints. At most ``max_pending`` hashes are
+    queued or running; beyond that, callers wait up to ``queue_timeout``
+    and then get :class:`PasswordHasherBusy` (answered with a 503). With
+    ``workers=0`` hashing runs inline, which suits tests and the dev server.
+    The pool is started on first use, after any pre-fork.
+    """
+
+    def __init__(self, method, workers=2, max_pending=16, queue_timeout=2.0, niceness=10):
+        self.method = method
+        self.stored_method = canonical_method(method)
+        self.workers = workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self.niceness = niceness
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pool = None
+        self.pending = 0
+        self.jobs = 0
+        self.rejected = 0
+        self.seconds = 0.0
+
+    def hash(self, password):
+        return run_blocking(self._run, generate_password_hash, password, self.method)
+
+    def check(self, pwhash, password):
+        return bool(pwhash) and run_blocking(self._run, check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True if ``pwhash`` was made with a different method or cost."""
+        return bool(pwhash) and pwhash.split("$", 1)[0] != self.stored_method
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=context,
+                                                 initializer=_lower_priority, initargs=(self.niceness,))
+            return self._pool
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy()
+        with self._lock:
+            self.pending += 1
+        start = time.perf_counter()
+        try:
+            if self.workers <= 0:
+                return fn(*args)
+            try:
+                return self._executor().submit(fn, *args).result()
+            except BrokenProcessPool:
+                logger.warning("password hash worker died; restarting the pool")
+                with self._lock:
+                    self._pool = None
+                raise
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.jobs += 1
+                self.seconds += time.perf_counter() - start
+            self._slots.release()
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+    def metrics(self):
+        """Prometheus families (see Metrics.add_collector)."""
+        with self._lock:
+            pending, jobs, rejected, seconds = self.pending, self.jobs, self.rejected, self.seconds
+        running = min(pending, self.workers) if self.workers > 0 else pending
+        return [
+            ("password_hash_in_flight", "Hashes queued or running.", "gauge", [({}, pending)]),
+            ("password_hash_queue_depth", "Hashes waiting for a worker process.", "gauge",
+             [({}, pending - running)]),
+            ("password_hash_limit", "Hashes admitted at once (PASSWORD_HASH_MAX_PENDING).", "gauge",
+             [({}, self.max_pending)]),
+            ("password_hash_total", "Hashes computed.", "counter", [({}, jobs)]),
+            ("password_hash_seconds_total", "Wall time of hashes, queueing included.", "counter",
+             [({}, f"{seconds:.6f}")]),
+            ("password_hash_rejected_total", "Hashes refused with 503 after the queue timeout.", "counter",
+             [({}, rejected)]),
+        ]
+
+
+def password_hasher():
+    return current_app.extensions["password_hasher"]
+
+
+def init_password_hasher(app):
+    """Config: ``PASSWORD_HASH_METHOD``, ``PASSWORD_HASH_WORKERS``,
+    ``PASSWORD_HASH_MAX_PENDING``, ``PASSWORD_HASH_QUEUE_TIMEOUT``,
+    ``PASSWORD_HASH_NICE``.
+    """
+    hasher = PasswordHasher(
+        app.config.get("PASSWORD_HASH_METHOD", "scrypt"),
+        workers=app.config.get("PASSWORD_HASH_WORKERS", 2),
+        max_pending=app.config.get("PASSWORD_HASH_MAX_PENDING", 16),
+        queue_timeout=app.config.get("PASSWORD_HASH_QUEUE_TIMEOUT", 2.0),
+        niceness=app.config.get("PASSWORD_HASH_NICE", 10),
+    )
+    app.extensions["password_hasher"] = hasher
+    metrics = app.extensions.get("metrics")
+    if metrics is not None:
+        metrics.add_collector(hasher.metrics)
+
+    @app.errorhandler(PasswordHasherBusy)
+    def password_hasher_busy(exc):
+        response = jsonify({"success": False, "error": "Too many sign-ins right now, please retry"})
+        response.status_code = 503
+        response.headers["Retry-After"] = "1"
+        return response
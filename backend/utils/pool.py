@@ -0,0 +1,175 @@
+import logging
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from ..db import app_engines
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the checkout wait histogram
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.buckets = [0] * (len(WAIT_BUCKETS) + 1)
+        self.wait_sum = 0.0
+        self.checkouts = 0
+        self.timeouts = 0
+
+    def record(self, wait, timed_out=False):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_sum += wait
+            self.timeouts += timed_out
+            for i, bound in enumerate(WAIT_BUCKETS):
+                if wait <= bound:
+                    self.buckets[i] += 1
+                    break
+            else:
+                self.buckets[-1] += 1
+
+
+class _TimedCheckout:
+    """Pool mixin that records how long each checkout waited.
+
+    The wait covers queueing for a free connection and opening a new one,
+    which is exactly the time a request spends before its first query.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - start)
+        return conn
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep the counters
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    """QueuePool that records how long each checkout waited."""
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """For async drivers (ASGI mode): waiting for a connection yields to the event loop."""
+
+
+def _is_memory_sqlite(uri):
+    url = make_url(uri)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def engine_options(config):
+    """``SQLALCHEMY_ENGINE_OPTIONS`` from the ``DB_POOL_*`` settings.
+
+    In-memory SQLite keeps its single shared connection, so only pre-ping
+    applies there. Explicit ``SQLALCHEMY_ENGINE_OPTIONS`` entries win.
+    """
+    uri = config["SQLALCHEMY_DATABASE_URI"]
+    options = {"pool_pre_ping": config["DB_POOL_PRE_PING"]}
+    if not _is_memory_sqlite(uri):
+        options.update(
+            poolclass=TimedAsyncQueuePool if make_url(uri).get_dialect().is_async else TimedQueuePool,
+            pool_size=config["DB_POOL_SIZE"],
+            max_overflow=config["DB_MAX_OVERFLOW"],
+            pool_timeout=config["DB_POOL_TIMEOUT"],
+            pool_recycle=config["DB_POOL_RECYCLE"],
+        )
+    options.update(config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    return options
+
+
+def warm_pool(engine, count):
+    """Open ``count`` connections now so the first requests don't pay for it."""
+    connections = []
+    try:
+        for _ in range(count):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.exec_driver_sql("SELECT 1")
+    except Exception:
+        logger.warning("pool warmup stopped after %d connections", len(connections), exc_info=True)
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+def pool_metrics():
+    """Prometheus families for every engine's pool (see Metrics.add_collector)."""
+    gauges = {"size": [], "checked_out": [], "overflow": [], "saturation": []}
+    checkouts, wait_sum, timeouts, buckets = [], [], [], []
+    for bind, engine in app_engines().items():
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            continue
+        labels = {"bind": bind or "default"}
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        gauges["size"].append((labels, pool.size()))
+        gauges["checked_out"].append((labels, pool.checkedout()))
+        gauges["overflow"].append((labels, max(pool.overflow(), 0)))
+        gauges["saturation"].append((labels, f"{pool.checkedout() / capacity:.4f}" if capacity else 0))
+
+        stats = getattr(pool, "stats", None)
+        if stats is None:
+            continue
+        with stats._lock:
+            checkouts.append((labels, stats.checkouts))
+            wait_sum.append((labels, f"{stats.wait_sum:.6f}"))
+            timeouts.append((labels, stats.timeouts))
+            cumulative = 0
+            for bound, count in zip(WAIT_BUCKETS + ("+Inf",), stats.buckets):
+                cumulative += count
+                buckets.append(({**labels, "le": bound}, cumulative))
+
+    return [
+        ("db_pool_size", "Connections the pool keeps open.", "gauge", gauges["size"]),
+        ("db_pool_checked_out", "Connections in use.", "gauge", gauges["checked_out"]),
+        ("db_pool_overflow", "Connections open beyond the pool size.", "gauge", gauges["overflow"]),
+        ("db_pool_saturation", "Checked out / (size + max overflow).", "gauge", gauges["saturation"]),
+        ("db_pool_checkouts_total", "Connection checkouts.", "counter", checkouts),
+        ("db_pool_checkout_wait_seconds_total", "Time spent waiting for a connection.", "counter", wait_sum),
+        ("db_pool_checkout_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT.", "counter", timeouts),
+        ("db_pool_checkout_wait_seconds_bucket", "Checkout wait histogram.", "counter", buckets),
+    ]
+
+
+def warm_pools(app, is_async=False):
+    """Open ``DB_POOL_WARMUP`` connections in each pool of the given kind.
+
+    Pools of async drivers can only connect from the event loop, so the
+    ASGI server warms those at startup (see utils/asgi.py).
+    """
+    warmup = app.config.get("DB_POOL_WARMUP", 0)
+    if warmup <= 0:
+        return
+    with app.app_context():
+        for engine in app_engines().values():
+            if isinstance(engine.pool, QueuePool) and engine.dialect.is_async == is_async:
+                opened = warm_pool(engine, min(warmup, engine.pool.size()))
+                logger.info("pool warmed url=%s connections=%d", engine.url.render_as_string(), opened)
+
+
+def init_pool(app):
+    """Publish pool metrics and open ``DB_POOL_WARMUP`` connections."""
+    metrics = app.extensions.get("metrics")
+    if metrics is not None:
+        metrics.add_collector(pool_metrics)
+    warm_pools(app)
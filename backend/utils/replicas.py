@@ -0,0 +1,47 @@
+import time
+from functools import wraps
+
+from flask import g, session
+from sqlalchemy import create_engine
+
+from ..db import STICKY_SESSION_KEY
+from .pool import engine_options
+
+REPLICA_BIND_PREFIX = "replica_"
+
+
+def replica_reads(view):
+    """Mark a read-only view; its queries may be served by a replica.
+
+    Unmarked views and every write use the primary (see RoutingSession).
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.replica_reads = True
+        try:
+            return view(*args, **kwargs)
+        finally:
+            g.pop("replica_reads", None)
+            g.pop("db_replica", None)
+    return wrapper
+
+
+def init_replicas(app):
+    """Create an engine per ``REPLICA_DATABASE_URIS`` entry and set
+    stickiness after writes.
+
+    Replica engines are pooled like the primary but kept out of
+    ``SQLALCHEMY_BINDS``: they hold no tables of their own, so ``create_all``
+    and migrations must never see them.
+    """
+    app.extensions["replicas"] = {
+        f"{REPLICA_BIND_PREFIX}{i}": create_engine(uri, **engine_options({**app.config, "SQLALCHEMY_DATABASE_URI": uri}))
+        for i, uri in enumerate(app.config.get("REPLICA_DATABASE_URIS") or ())
+    }
+    sticky_seconds = app.config.get("REPLICA_STICKY_SECONDS", 5)
+
+    @app.after_request
+    def stick_to_primary_after_write(response):
+        if g.pop("db_wrote", False) and app.extensions["replicas"]:
+            session[STICKY_SESSION_KEY] = time.time() + sticky_seconds
+        return response
@@ -0,0 +1,337 @@
+import json
+import logging
+import threading
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+
+from flask import current_app
+from sqlalchemy import insert, tuple_
+
+from ..db import db
+from ..models.properties import Property
+from ..models.property_images import PropertyImage
+from ..models.saved_search_matches import SavedSearchMatch
+from ..models.saved_searches import SavedSearch
+from ..models.table_versions import TableVersion
+from .asgi import hold
+from .cache import normalize_filters
+
+logger = logging.getLogger(__name__)
+
+# explore.js filter name -> Property column, as apply_listing_filters reads them
+LIST_FILTERS = {
+    "cities": "city",
+    "districts": "district",
+    "areas": "area",
+    "propertyTypes": "property_type",
+    "bhk": "house_type",
+    "facing": "facing",
+    "furnishing": "furnishing",
+}
+SCALAR_FILTERS = {"carParking": "car_parking", "pets": "pets"}
+BUDGET_FILTERS = ("minBudget", "maxBudget")
+# Predicates a search can be filed under, most selective first. Budget
+# ranges come after the place and size columns, before the few-valued ones.
+ANCHOR_COLUMNS = ("city", "district", "house_type", "area", "property_type")
+WEAK_ANCHOR_COLUMNS = ("facing", "furnishing", "car_parking", "pets")
+TERM_COLUMNS = ANCHOR_COLUMNS + WEAK_ANCHOR_COLUMNS
+BUDGET_BUCKET = 1000  # rent per budget posting
+MAX_BUDGET_BUCKETS = 64  # wider ranges are not worth filing under budget
+
+
+def _fold(value):
+    # MySQL's default collation compares these columns case-insensitively
+    return str(value).casefold()
+
+
+def parse_saved_filters(value):
+    """Validate explore.js filters (a dict or its JSON) for saving.
+
+    Returns the normalized JSON string (see ``normalize_filters``); raises
+    ValueError for unknown names, wrong types or an empty search, which
+    would match every listing.
+    """
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            raise ValueError("Invalid filters")
+    if not isinstance(value, dict):
+        raise ValueError("Invalid filters")
+
+    normalized = json.loads(normalize_filters(json.dumps(value)) or "{}")
+    for name, item in normalized.items():
+        if name in LIST_FILTERS:
+            if not isinstance(item, list) or not all(isinstance(v, str) for v in item):
+                raise ValueError(f"{name} must be a list of strings")
+        elif name in SCALAR_FILTERS:
+            if not isinstance(item, str):
+                raise ValueError(f"{name} must be a string")
+        elif name in BUDGET_FILTERS:
+            try:
+                Decimal(str(item))
+            except InvalidOperation:
+                raise ValueError(f"{name} must be a number")
+        elif name == "withPhotos":
+            if not isinstance(item, bool):
+                raise ValueError("withPhotos must be true or false")
+        else:
+            raise ValueError(f"Unknown filter: {name}")
+
+    if not (normalized.get("minBudget") and normalized.get("maxBudget")):
+        # apply_listing_filters ignores a budget unless both bounds are set
+        normalized.pop("minBudget", None)
+        normalized.pop("maxBudget", None)
+    elif Decimal(str(normalized["minBudget"])) > Decimal(str(normalized["maxBudget"])):
+        raise ValueError("minBudget is above maxBudget")
+    if not normalized.get("withPhotos", True):
+        normalized.pop("withPhotos")  # false filters nothing
+    if not normalized:
+        raise ValueError("A saved search needs at least one filter")
+    return json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+
+
+class SavedSearchFilter:
+    """One saved search compiled to the predicates ``apply_listing_filters`` applies."""
+
+    __slots__ = ("search_id", "user_id", "terms", "budget", "with_photos")
+
+    def __init__(self, search_id, user_id, filters):
+        self.search_id = search_id
+        self.user_id = user_id
+        self.terms = {}  # column -> folded values allowed
+        for name, column in LIST_FILTERS.items():
+            if filters.get(name):
+                self.terms[column] = frozenset(_fold(v) for v in filters[name])
+        for name, column in SCALAR_FILTERS.items():
+            if filters.get(name):
+                self.terms[column] = frozenset([_fold(filters[name])])
+        self.budget = None
+        if filters.get("minBudget") and filters.get("maxBudget"):
+            self.budget = (Decimal(str(filters["minBudget"])), Decimal(str(filters["maxBudget"])))
+        self.with_photos = bool(filters.get("withPhotos"))
+
+    def keys(self):
+        """Postings this search is filed under: every value of its best anchor."""
+        for column in ANCHOR_COLUMNS:
+            if column in self.terms:
+                return [(column, value) for value in self.terms[column]]
+        if self.budget is not None:
+            low, high = (int(bound // BUDGET_BUCKET) for bound in self.budget)
+            if high - low < MAX_BUDGET_BUCKETS:
+                return [("budget", bucket) for bucket in range(low, high + 1)]
+        for column in WEAK_ANCHOR_COLUMNS:
+            if column in self.terms:
+                return [(column, value) for value in self.terms[column]]
+        return []
+
+    def matches(self, listing, has_photos=False):
+        for column, values in self.terms.items():
+            if _fold(getattr(listing, column)) not in values:
+                return False
+        if self.budget is not None and not self.budget[0] <= listing.rent_price <= self.budget[1]:
+            return False
+        return has_photos or not self.with_photos
+
+
+class SavedSearchIndex:
+    """Inverted index from listing attribute values to saved searches.
+
+    Each search is filed under the values of one predicate it requires
+    (its anchor), e.g. ``("city", "chennai")`` for every city it names, or
+    its budget buckets. A written listing only looks up the postings for
+    its own values, so the searches it is checked against are the ones
+    that share its anchor value; those are then checked in full. Searches
+    with no usable anchor are checked against every listing.
+    """
+
+    def __init__(self):
+        self.postings = defaultdict(set)  # (column or "budget", value) -> search ids
+        self.unanchored = set()
+        self.searches = {}  # search_id -> SavedSearchFilter
+        self.photo_searches = 0
+        self.version = None  # saved_searches TableVersion this index reflects
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.searches)
+
+    def add(self, search_id, user_id, filters):
+        search = SavedSearchFilter(search_id, user_id, filters)
+        with self._lock:
+            self._remove(search_id)
+            self.searches[search_id] = search
+            self.photo_searches += search.with_photos
+            keys = search.keys()
+            for key in keys:
+                self.postings[key].add(search_id)
+            if not keys:
+                self.unanchored.add(search_id)
+
+    def remove(self, search_id):
+        with self._lock:
+            self._remove(search_id)
+
+    def _remove(self, search_id):
+        search = self.searches.pop(search_id, None)
+        if search is None:
+            return
+        self.photo_searches -= search.with_photos
+        for key in search.keys():
+            posting = self.postings.get(key)
+            if posting is not None:
+                posting.discard(search_id)
+                if not posting:
+                    del self.postings[key]
+        self.unanchored.discard(search_id)
+
+    def match(self, listing, has_photos=False):
+        """``(matching searches, searches examined)`` for one listing row."""
+        keys = [(column, _fold(getattr(listing, column))) for column in TERM_COLUMNS]
+        keys.append(("budget", int(listing.rent_price // BUDGET_BUCKET)))
+        with self._lock:
+            candidates = set(self.unanchored)
+            for key in keys:
+                candidates.update(self.postings.get(key, ()))
+            searches = [self.searches[search_id] for search_id in candidates]
+        matched = [s for s in searches if s.user_id != listing.owner_id and s.matches(listing, has_photos)]
+        return matched, len(searches)
+
+
+class SavedSearchStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.listings = 0
+        self.examined = 0
+        self.matched = 0
+
+    def record(self, listings, examined, matched):
+        with self._lock:
+            self.listings += listings
+            self.examined += examined
+            self.matched += matched
+
+    def metrics(self):
+        """Prometheus families (see Metrics.add_collector)."""
+        index = current_app.extensions.get("saved_search_index")
+        with self._lock:
+            return [
+                ("saved_searches_indexed", "Saved searches in this worker's match index", "gauge",
+                 [({}, len(index) if index is not None else 0)]),
+                ("saved_search_listings_matched_total", "Written listings checked against saved searches",
+                 "counter", [({}, self.listings)]),
+                ("saved_search_candidates_total", "Saved searches examined for written listings", "counter",
+                 [({}, self.examined)]),
+                ("saved_search_matches_total", "Saved search matches found", "counter", [({}, self.matched)]),
+            ]
+
+
+# -- per-app index kept in sync with the saved_searches table -------------
+
+_build_lock = threading.Lock()
+
+
+def _build_index():
+    index = SavedSearchIndex()
+    version, _ = TableVersion.current("saved_searches")
+    rows = SavedSearch.query.with_entities(SavedSearch.search_id, SavedSearch.user_id, SavedSearch.filters)
+    for search_id, user_id, filters in rows.yield_per(2000):
+        index.add(search_id, user_id, json.loads(filters))
+    index.version = version
+    return index
+
+
+def saved_search_index():
+    """The app's index, rebuilt if another worker changed the saved searches."""
+    version, _ = TableVersion.current("saved_searches")
+    index = current_app.extensions.get("saved_search_index")
+    if index is not None and index.version == version:
+        return index
+
+    with hold(_build_lock):
+        index = current_app.extensions.get("saved_search_index")
+        if index is None or index.version != version:
+            index = _build_index()
+            current_app.extensions["saved_search_index"] = index
+    return index
+
+
+def saved_searches_changed(added=(), removed=()):
+    """Apply a committed saved search write to the index; call after the commit.
+
+    Bump ``TableVersion("saved_searches")`` in the write's transaction.
+    ``added`` holds SavedSearch objects, ``removed`` search ids.
+    """
+    index = current_app.extensions.get("saved_search_index")
+    if index is None:
+        return
+
+    version, _ = TableVersion.current("saved_searches")
+    if index.version is None or version != index.version + 1:
+        # Another worker wrote in between: start over
+        current_app.extensions.pop("saved_search_index", None)
+        return
+    for search in added:
+        index.add(search.search_id, search.user_id, json.loads(search.filters))
+    for search_id in removed:
+        index.remove(search_id)
+    index.version = version
+
+
+def match_saved_searches(property_ids):
+    """File written listings in the inboxes of the saved searches they match.
+
+    Call after the listing write's commit with the new or updated ids.
+    Only available listings match, never the owner's own searches, and a
+    listing is filed once per search however often it is edited. Failures
+    are logged: the listing write itself has already succeeded.
+    """
+    if not property_ids:
+        return 0
+    try:
+        index = saved_search_index()
+        if not len(index):
+            return 0
+        rows = (Property.query
+                .filter(Property.property_id.in_(property_ids), Property.status == "Available")
+                .with_entities(Property.property_id, Property.owner_id, Property.rent_price,
+                               *(getattr(Property, column) for column in TERM_COLUMNS))
+                .all())
+        with_photos = set()
+        if rows and index.photo_searches:
+            with_photos = {pid for pid, in db.session.query(PropertyImage.property_id).distinct()
+                           .filter(PropertyImage.property_id.in_([row.property_id for row in rows]))}
+
+        found, examined = [], 0
+        for row in rows:
+            matched, count = index.match(row, row.property_id in with_photos)
+            examined += count
+            found.extend({"search_id": s.search_id, "user_id": s.user_id, "property_id": row.property_id}
+                         for s in matched)
+
+        new = []
+        if found:
+            pairs = [(m["search_id"], m["property_id"]) for m in found]
+            existing = set(db.session.query(SavedSearchMatch.search_id, SavedSearchMatch.property_id)
+                           .filter(tuple_(SavedSearchMatch.search_id, SavedSearchMatch.property_id).in_(pairs)))
+            new = [m for m in found if (m["search_id"], m["property_id"]) not in existing]
+        if new:
+            db.session.execute(insert(SavedSearchMatch), [{**m, "seen": False} for m in new])
+            db.session.commit()
+
+        stats = current_app.extensions.get("saved_search_stats")
+        if stats is not None:
+            stats.record(len(rows), examined, len(new))
+        return len(new)
+    except Exception:
+        db.session.rollback()
+        logger.exception("saved search matching failed property_ids=%s", list(property_ids)[:20])
+        return 0
+
+
+def init_saved_searches(app):
+    stats = SavedSearchStats()
+    app.extensions["saved_search_stats"] = stats
+    metrics = app.extensions.get("metrics")
+    if metrics is not None:
+        metrics.add_collector(stats.metrics)
@@ -0,0 +1,303 @@
+import bisect
+import heapq
+import math
+import re
+import threading
+from collections import defaultdict
+
+from flask import current_app
+
+from ..models.properties import Property
+from ..models.property_tombstones import PropertyTombstone
+from ..models.table_versions import TableVersion
+from .asgi import hold
+from .cache import normalize_filters
+from .listing_filters import listing_query
+from .serializers import columns_for
+
+# Searchable columns and how much a term found in each one counts
+FIELD_WEIGHTS = {
+    "area": 2.0,
+    "city": 2.0,
+    "district": 2.0,
+    "full_name": 1.0,
+    "address": 1.0,
+    "description": 1.0,
+}
+MAX_PREFIX_EXPANSIONS = 50
+# Ranked ids checked against the filters per query
+SEARCH_CHUNK_SIZE = 500
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+class SearchIndex:
+    """In-memory inverted index over available listings with BM25 ranking.
+
+    Postings map term -> {property_id: weighted term frequency}. A sorted
+    vocabulary supports prefix expansion of the last query term for
+    type-ahead.
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.doc_terms = {}  # property_id -> {term: weighted tf}
+        self.doc_lengths = {}
+        self.total_length = 0.0
+        self.version = None  # properties TableVersion this index reflects
+        self._vocabulary = None
+        self._norms = None
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    # -- maintenance -----------------------------------------------------
+
+    def add(self, row):
+        terms = defaultdict(float)
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(getattr(row, field)):
+                terms[term] += weight
+
+        with self._lock:
+            self.remove(row.property_id)
+            for term, tf in terms.items():
+                self.postings[term][row.property_id] = tf
+            length = sum(terms.values())
+            self.doc_terms[row.property_id] = dict(terms)
+            self.doc_lengths[row.property_id] = length
+            self.total_length += length
+            self._vocabulary = None
+            self._norms = None
+
+    def remove(self, property_id):
+        with self._lock:
+            terms = self.doc_terms.pop(property_id, None)
+            if terms is None:
+                return
+            for term in terms:
+                docs = self.postings[term]
+                docs.pop(property_id, None)
+                if not docs:
+                    del self.postings[term]
+            self.total_length -= self.doc_lengths.pop(property_id)
+            self._vocabulary = None
+            self._norms = None
+
+    # -- querying --------------------------------------------------------
+
+    def _expand_prefix(self, prefix):
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        vocab = self._vocabulary
+        start = bisect.bisect_left(vocab, prefix)
+        matches = []
+        for term in vocab[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        return matches
+
+    def _idf(self, docs, n_docs):
+        return math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+
+    def _doc_norms(self):
+        # BM25 length normalisation per document; depends on the average
+        # length, so it is recomputed lazily after the index changes.
+        if self._norms is None:
+            avgdl = self.total_length / len(self.doc_lengths)
+            k1, b = self.k1, self.b
+            self._norms = {d: k1 * (1 - b + b * dl / avgdl) for d, dl in self.doc_lengths.items()}
+        return self._norms
+
+    def search(self, text, prefix=True, limit=None):
+        """Return ``[(property_id, score)]`` best first (top ``limit`` if given).
+
+        Every term must match (AND); with ``prefix`` the last term also
+        matches any word it starts, scored by its best expansion. Terms are
+        intersected rarest first and only the surviving candidates are
+        scored, so cost follows the rarest term, not the most common one.
+        """
+        terms = tokenize(text)
+        if not terms:
+            return []
+
+        with self._lock:
+            n_docs = len(self.doc_lengths)
+            if not n_docs:
+                return []
+
+            # One group per query term: [(idf, postings)], several for a prefix
+            groups = []
+            for i, term in enumerate(terms):
+                if prefix and i == len(terms) - 1:
+                    expansions = self._expand_prefix(term)
+                else:
+                    expansions = [term] if term in self.postings else []
+                if not expansions:
+                    return []
+                groups.append([(self._idf(self.postings[t], n_docs), self.postings[t]) for t in expansions])
+            groups.sort(key=lambda group: sum(len(docs) for _, docs in group))
+
+            norms = self._doc_norms()
+            k1_plus = self.k1 + 1
+
+            # Seed candidates from the rarest term, then narrow and score
+            # them one term at a time in a single pass per term.
+            scores = {}
+            for idf, docs in groups[0]:
+                for d, tf in docs.items():
+                    score = idf * tf * k1_plus / (tf + norms[d])
+                    if score > scores.get(d, 0.0):
+                        scores[d] = score
+
+            for group in groups[1:]:
+                narrowed = {}
+                if len(group) == 1:
+                    idf, docs = group[0]
+                    for d, total in scores.items():
+                        tf = docs.get(d)
+                        if tf:
+                            narrowed[d] = total + idf * tf * k1_plus / (tf + norms[d])
+                else:
+                    for d, total in scores.items():
+                        best = 0.0
+                        for idf, docs in group:
+                            tf = docs.get(d)
+                            if tf:
+                                best = max(best, idf * tf * k1_plus / (tf + norms[d]))
+                        if best:
+                            narrowed[d] = total + best
+                scores = narrowed
+                if not scores:
+                    return []
+
+        key = lambda item: (item[1], item[0])  # noqa: E731 - ties: newest listing first
+        if limit is not None:
+            return heapq.nlargest(limit, scores.items(), key=key)
+        return sorted(scores.items(), key=key, reverse=True)
+
+
+# -- per-app index kept in sync with the properties table ---------------
+
+_build_lock = threading.Lock()
+
+
+def _search_columns():
+    return [Property.property_id, *(getattr(Property, f) for f in FIELD_WEIGHTS)]
+
+
+def _build_index():
+    index = SearchIndex()
+    version, _ = TableVersion.current("properties")
+    rows = Property.query.filter_by(status="Available").with_entities(*_search_columns()).yield_per(2000)
+    for row in rows:
+        index.add(row)
+    index.version = version
+    return index
+
+
+def _apply(index, rows, removed=()):
+    """Drop ``removed`` ids, then add or drop ``rows`` by their status."""
+    for property_id in removed:
+        index.remove(property_id)
+    for row in rows:
+        if row.status == "Available":
+            index.add(row)
+        else:
+            index.remove(row.property_id)
+
+
+def _catch_up(index, version):
+    """Apply every write after ``index.version`` from the change feed columns.
+
+    Listings written since carry a higher ``change_seq``; deleted and
+    archived ones left a tombstone with one. Writers commit in version
+    order, so everything up to ``version`` is visible here.
+    """
+    seq = index.version
+    removed = [pid for pid, in PropertyTombstone.query.filter(PropertyTombstone.change_seq > seq)
+               .with_entities(PropertyTombstone.property_id)]
+    rows = (Property.query.filter(Property.change_seq > seq)
+            .with_entities(Property.status, *_search_columns()).yield_per(2000))
+    # A tombstoned id that is live again (restored) is re-added from its row
+    _apply(index, rows, removed)
+    index.version = version
+
+
+def search_index():
+    """The app's index, brought up to date if another worker changed the table."""
+    version, _ = TableVersion.current("properties")
+    index = current_app.extensions.get("search_index")
+    if index is not None and index.version == version:
+        return index
+
+    with hold(_build_lock):
+        index = current_app.extensions.get("search_index")
+        if index is None or index.version is None or index.version > version:
+            index = _build_index()
+            current_app.extensions["search_index"] = index
+        elif index.version != version:
+            _catch_up(index, version)
+    return index
+
+
+def reindex_properties(property_ids=None):
+    """Apply committed writes to the index; call after the write's commit.
+
+    ``property_ids`` are re-read and added or dropped according to their
+    status. When other workers wrote in between, or the ids are unknown
+    (None), the missing range is read from the change feed instead.
+    """
+    index = current_app.extensions.get("search_index")
+    if index is None:
+        return
+
+    version, _ = TableVersion.current("properties")
+    if index.version is None or version < index.version:
+        current_app.extensions.pop("search_index", None)  # the table was reset: start over
+        return
+    if property_ids is None or version != index.version + 1:
+        with hold(_build_lock):
+            if index.version < version:
+                _catch_up(index, version)
+        return
+
+    rows = (Property.query.filter(Property.property_id.in_(property_ids))
+            .with_entities(Property.status, *_search_columns()).all())
+    found = {row.property_id for row in rows}
+    _apply(index, rows, [pid for pid in property_ids if pid not in found])
+    index.version = version
+
+
+def ranked_listings(text, filters_param, fields, offset, limit):
+    """Rank matches for ``text`` and narrow them with the explore filters.
+
+    Hits are checked against the filter query in rank order, a chunk of
+    ids at a time, until one row past the requested page is found.
+    Returns ``(rows, scores, has_more)``.
+    """
+    wanted = offset + limit + 1
+    # Without filters every hit qualifies, so only the top of the ranking is needed
+    hits = search_index().search(text, limit=wanted if not normalize_filters(filters_param) else None)
+    scores = dict(hits)
+    base = listing_query(filters_param).with_entities(*columns_for(fields))
+
+    matched = []
+    chunk_size = max(wanted, SEARCH_CHUNK_SIZE)
+    for start in range(0, len(hits), chunk_size):
+        chunk = [property_id for property_id, _ in hits[start:start + chunk_size]]
+        rows = {row.property_id: row for row in base.filter(Property.property_id.in_(chunk))}
+        matched.extend(rows[property_id] for property_id in chunk if property_id in rows)
+        if len(matched) >= wanted:
+            break
+
+    return matched[offset:offset + limit], scores, len(matched) > offset + limit
@@ -0,0 +1,129 @@
+import json
+
+from flask import current_app
+from sqlalchemy import select
+
+try:  # optional, noticeably faster on large listing pages
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+from ..db import db
+from ..models.image_variants import ImageVariant
+from ..models.properties import Property
+from ..models.property_images import PropertyImage
+from .images import image_urls
+from .instrumentation import serialization_timer
+
+# Public listing fields, in output order
+PROPERTY_FIELDS = (
+    "property_id", "full_name", "address", "city", "area", "district", "property_type",
+    "house_type", "rent_price", "car_parking", "pets", "facing", "furnishing",
+    "description", "images", "status", "latitude", "longitude",
+)
+# Owners also see the contact number they entered (profile edit form)
+OWNER_FIELDS = PROPERTY_FIELDS + ("mobile_number",)
+
+# Fields that need more than a plain attribute read
+_CONVERTERS = {
+    "rent_price": lambda v: str(v),
+}
+# Fields served from the property_images table rather than a column
+_RELATED_FIELDS = {"images"}
+
+
+def parse_fields(param, allowed=PROPERTY_FIELDS):
+    """Parse a ``fields=a,b,c`` projection; ValueError on unknown names.
+
+    ``property_id`` is always included so clients can page and look up rows.
+    """
+    if not param:
+        return allowed
+    requested = [f.strip() for f in param.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return tuple(f for f in allowed if f == "property_id" or f in requested)
+
+
+def columns_for(fields):
+    """Property columns to SELECT for ``fields`` (skips unneeded Text columns)."""
+    return [getattr(Property, f) for f in fields if f not in _RELATED_FIELDS]
+
+
+def serialize_property(row, fields=PROPERTY_FIELDS, images=()):
+    """Dict for one listing; ``row`` can be a Property or a column Row.
+
+    ``images`` are the listing's storage keys in display order.
+    """
+    out = {}
+    for f in fields:
+        if f == "images":
+            out[f] = list(images)
+            continue
+        value = getattr(row, f)
+        convert = _CONVERTERS.get(f)
+        out[f] = convert(value) if convert else value
+    return out
+
+
+def load_photos(property_ids, connection=None):
+    """``{property_id: [(storage_key, urls)]}`` in display order.
+
+    A single query for any number of listings (the IN batch a
+    ``selectinload`` of ``Property.photos`` would issue, joined with the
+    variants) that works for column rows as well as Property objects.
+    Runs on the session unless a ``connection`` is given.
+    """
+    if not property_ids:
+        return {}
+    stmt = (
+        select(PropertyImage.property_id, PropertyImage.storage_key, ImageVariant.variant, ImageVariant.filename)
+        .outerjoin(ImageVariant, ImageVariant.source == PropertyImage.storage_key)
+        .where(PropertyImage.property_id.in_(set(property_ids)))
+        .order_by(PropertyImage.property_id, PropertyImage.ordinal)
+    )
+    variants = {}  # (property_id, storage_key) -> [(variant, filename)], in order
+    for property_id, storage_key, variant, filename in (connection or db.session).execute(stmt):
+        found = variants.setdefault((property_id, storage_key), [])
+        if variant is not None:
+            found.append((variant, filename))
+
+    photos = {}
+    for (property_id, storage_key), found in variants.items():
+        photos.setdefault(property_id, []).append((storage_key, image_urls(storage_key, found)))
+    return photos
+
+
+def serialize_properties(rows, fields=PROPERTY_FIELDS):
+    """Dicts for a page of listings, with ``image_urls`` when images are requested."""
+    with serialization_timer():
+        if "images" not in fields:
+            return [serialize_property(row, fields) for row in rows]
+
+        photos = load_photos([row.property_id for row in rows])
+        items = []
+        for row in rows:
+            listing_photos = photos.get(row.property_id, ())
+            item = serialize_property(row, fields, [storage_key for storage_key, _ in listing_photos])
+            item["image_urls"] = [urls for _, urls in listing_photos]
+            items.append(item)
+        return items
+
+
+def property_to_dict(p):
+    """Public JSON shape of a single listing."""
+    return serialize_properties([p])[0]
+
+
+def dumps(obj):
+    """Encode ``obj`` as compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_response(body, status=200):
+    with serialization_timer():
+        data = dumps(body)
+    return current_app.response_class(data, status=status, mimetype="application/json")
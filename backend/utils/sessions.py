@@ -0,0 +1,179 @@
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+from flask.sessions import SecureCookieSession, SessionInterface
+from itsdangerous import BadSignature, Signer
+
+# Expired rows are swept on roughly one write in this many
+PURGE_EVERY = 500
+
+
+class MemorySessionStore:
+    """Sessions held by this process only: one worker, development, tests."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def get(self, sid):
+        with self._lock:
+            entry = self._data.get(sid)
+            if entry is None:
+                return None
+            expires, payload = entry
+            if expires <= time.time():
+                del self._data[sid]
+                return None
+        return json.loads(payload)
+
+    def set(self, sid, data, ttl):
+        now = time.time()
+        with self._lock:
+            self._data[sid] = (now + ttl, json.dumps(data))
+            self._writes += 1
+            if self._writes % PURGE_EVERY == 0:
+                for key in [k for k, (expires, _) in self._data.items() if expires <= now]:
+                    del self._data[key]
+
+    def delete(self, sid):
+        with self._lock:
+            self._data.pop(sid, None)
+
+
+class SQLiteSessionStore:
+    """Sessions in a local SQLite file, shared by every worker on the host.
+
+    The file and table are created on first use, and each thread opens its
+    own connection, so the store is safe to build before workers fork.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS sessions "
+                "(sid TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._local.connection = connection
+        return connection
+
+    def get(self, sid):
+        row = self._connection().execute(
+            "SELECT data FROM sessions WHERE sid = ? AND expires_at > ?", (sid, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, sid, data, ttl):
+        now = time.time()
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO sessions (sid, data, expires_at) VALUES (?, ?, ?)",
+            (sid, json.dumps(data), now + ttl),
+        )
+        self._writes += 1
+        if self._writes % PURGE_EVERY == 0:
+            connection.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+
+    def delete(self, sid):
+        self._connection().execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+
+class ServerSession(SecureCookieSession):
+    """Session data kept in a store; the cookie only carries its id."""
+
+    def __init__(self, initial=None, sid=None, new=False):
+        super().__init__(initial)
+        self.sid = sid or secrets.token_urlsafe(32)
+        self.new = new
+        self.rotated = False
+
+    def rotate(self):
+        """Move the data to a fresh id (call on login against session fixation)."""
+        self.rotated = True
+        self.modified = True
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Flask session interface backed by any object with get/set/delete.
+
+    The cookie is the session id signed with ``SECRET_KEY``, so forged or
+    garbled cookies are dropped without a store lookup. Data is written back
+    only when the request changed it.
+    """
+
+    salt = "server-session"
+
+    def __init__(self, store):
+        self.store = store
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt=self.salt)
+
+    def open_session(self, app, request):
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode()
+            except BadSignature:
+                sid = None
+            data = self.store.get(sid) if sid else None
+            if data is not None:
+                return ServerSession(data, sid=sid)
+        return ServerSession(new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if session.accessed:
+            response.vary.add("Cookie")
+
+        if not session:
+            if session.modified and not session.new:  # emptied, e.g. logout
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path, secure=self.get_cookie_secure(app),
+                                       samesite=self.get_cookie_samesite(app),
+                                       httponly=self.get_cookie_httponly(app))
+            return
+        if not session.modified:
+            return
+
+        if session.rotated:
+            self.store.delete(session.sid)
+            session.sid = secrets.token_urlsafe(32)
+            session.rotated = False
+        self.store.set(session.sid, dict(session), int(app.permanent_session_lifetime.total_seconds()))
+        response.set_cookie(
+            name, self._signer(app).sign(session.sid).decode(), expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app), domain=domain, path=path,
+            secure=self.get_cookie_secure(app), samesite=self.get_cookie_samesite(app),
+        )
+
+
+def init_sessions(app):
+    """Use a server-side session store (``SESSION_BACKEND`` or ``SESSION_STORE``)."""
+    store = app.config.get("SESSION_BACKEND")
+    if store is None:
+        kind = app.config.get("SESSION_STORE", "memory")
+        if kind == "sqlite":
+            store = SQLiteSessionStore(
+                app.config.get("SESSION_SQLITE_PATH") or os.path.join(app.instance_path, "sessions.db"))
+        elif kind == "memory":
+            store = MemorySessionStore()
+        else:
+            raise ValueError(f"Unknown SESSION_STORE {kind!r}; expected sqlite or memory")
+    app.session_interface = ServerSideSessionInterface(store)
@@ -0,0 +1,88 @@
+from flask import current_app, stream_with_context
+
+from ..db import db
+from ..models.properties import Property
+from .serializers import columns_for, dumps, load_photos, serialize_property
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+# Rows fetched per round trip from the server-side cursor
+STREAM_BATCH_SIZE = 1000
+
+
+def requested_stream_format(request):
+    """``"ndjson"``, ``"json"`` or None, from ``?stream=`` or the Accept header."""
+    stream = request.args.get("stream", "").lower()
+    if stream in ("1", "true", "ndjson"):
+        return "ndjson"
+    if stream == "json":
+        return "json"
+    if request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        return "ndjson"
+    return None
+
+
+def _rows(query, fields):
+    # yield_per turns on stream_results, so the driver reads through a
+    # server-side cursor instead of buffering the whole result set. The
+    # view's session was closed at its teardown; read through the one the
+    # streaming context removes when it ends, or the connection leaks.
+    query = (query.with_session(db.session())
+             .with_entities(*columns_for(fields))
+             .order_by(Property.property_id.desc()))
+    if "images" not in fields:
+        for row in query.yield_per(STREAM_BATCH_SIZE):
+            yield serialize_property(row, fields)
+        return
+
+    # Photos and their variants are looked up once per batch. The
+    # streaming cursor keeps its connection busy (MySQL cannot run a second
+    # query on it), so the lookups use a connection of their own.
+    with db.engine.connect() as connection:
+        batch = []
+        for row in query.yield_per(STREAM_BATCH_SIZE):
+            batch.append(row)
+            if len(batch) == STREAM_BATCH_SIZE:
+                yield from _serialize_batch(connection, batch, fields)
+                batch = []
+        yield from _serialize_batch(connection, batch, fields)
+
+
+def _serialize_batch(connection, rows, fields):
+    if not rows:
+        return
+    photos = load_photos([row.property_id for row in rows], connection)
+    for row in rows:
+        listing_photos = photos.get(row.property_id, ())
+        item = serialize_property(row, fields, [storage_key for storage_key, _ in listing_photos])
+        item["image_urls"] = [urls for _, urls in listing_photos]
+        yield item
+
+
+def _ndjson(query, fields):
+    for item in _rows(query, fields):
+        yield dumps(item) + b"\n"
+
+
+def _json_array(query, fields):
+    yield b'{"properties":['
+    separator = b""
+    for item in _rows(query, fields):
+        yield separator + dumps(item)
+        separator = b","
+    yield b"]}"
+
+
+def stream_properties(query, fields, stream_format):
+    """Stream every row of ``query`` without materializing the result.
+
+    Memory stays flat regardless of catalog size and the first row is sent
+    as soon as the database returns it.
+    """
+    if stream_format == "ndjson":
+        body, mimetype = _ndjson(query, fields), NDJSON_MIMETYPE
+    else:
+        body, mimetype = _json_array(query, fields), "application/json"
+    response = current_app.response_class(stream_with_context(body), mimetype=mimetype)
+    response.headers["Cache-Control"] = "no-store"
+    response.headers["X-Accel-Buffering"] = "no"  # don't let nginx buffer the stream
+    return response
@@ -0,0 +1,70 @@
+import hashlib
+import os
+import re
+import tempfile
+
+from flask import request
+from werkzeug.utils import secure_filename
+
+CHUNK_SIZE = 64 * 1024
+# Uploaded originals and their variants are named after the content hash
+HASHED_NAME_RE = re.compile(r"^(?:variants/)?([0-9a-f]{64})(?:__\w+)?\.\w+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def allowed_extension(filename, allowed):
+    name = secure_filename(filename or "")
+    ext = name.rsplit(".", 1)[-1].lower() if "." in name else ""
+    return ext if ext in allowed else None
+
+
+def store_file(stream, upload_folder, ext):
+    """Copy ``stream`` into ``upload_folder`` under its SHA-256 name.
+
+    The data is hashed while it is written to a temporary file in chunks,
+    so large uploads are never held in memory. Identical content maps to
+    the same name, and a file that already exists is kept rather than
+    rewritten. Returns the stored filename.
+    """
+    digest = hashlib.sha256()
+    os.makedirs(upload_folder, exist_ok=True)  # not created at startup
+    fd, tmp_path = tempfile.mkstemp(dir=upload_folder, prefix=".upload-")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                tmp.write(chunk)
+
+        filename = f"{digest.hexdigest()}.{ext}"
+        final_path = os.path.join(upload_folder, filename)
+        if os.path.exists(final_path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, final_path)
+        return filename
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def save_upload(file_storage, upload_folder, allowed):
+    """Store a werkzeug upload; returns its name, or None for a bad type."""
+    ext = allowed_extension(file_storage.filename, allowed)
+    if ext is None:
+        return None
+    return store_file(file_storage.stream, upload_folder, ext)
+
+
+def init_upload_headers(app):
+    """Serve content-addressed uploads with far-future, immutable caching."""
+
+    @app.after_request
+    def cache_hashed_uploads(response):
+        filename = (request.view_args or {}).get("filename", "") if request.endpoint == "static" else ""
+        # The static route already adds ETag/Last-Modified and answers 304s;
+        # a hashed name can never change content, so let clients keep it.
+        if response.status_code in (200, 304) and filename.startswith("uploads/"):
+            if HASHED_NAME_RE.match(filename[len("uploads/"):]):
+                response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
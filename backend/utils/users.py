@@ -0,0 +1,52 @@
+from flask import current_app, session
+
+from ..db import db
+from ..models.users import Users
+from .cache import LRUCache
+
+# What the session, profile and login responses expose about a user
+USER_FIELDS = ("user_id", "full_name", "email", "mobile_number")
+
+
+def user_record(user):
+    return {field: getattr(user, field) for field in USER_FIELDS}
+
+
+def get_user(user_id):
+    """A user's public fields, from the cache or one primary-key read.
+
+    ``None`` if the account no longer exists. Entries live for
+    ``USER_CACHE_TTL`` seconds; profile writes drop them at once in this
+    process, and the TTL bounds how long other workers can lag.
+    """
+    cache = current_app.extensions["user_cache"]
+    record = cache.get(user_id)
+    if record is None:
+        user = db.session.get(Users, user_id)
+        if user is None:
+            return None
+        record = user_record(user)
+        cache.set(user_id, record)
+    return dict(record)
+
+
+def remember_user(user):
+    """Cache ``user``'s record (e.g. at login) and return it."""
+    record = user_record(user)
+    current_app.extensions["user_cache"].set(user.user_id, record)
+    return dict(record)
+
+
+def current_user():
+    """The logged-in user's record, or None (the session holds only the id)."""
+    user = session.get("user")
+    return get_user(user["user_id"]) if user else None
+
+
+def invalidate_user(user_id):
+    current_app.extensions["user_cache"].delete(user_id)
+
+
+def init_user_cache(app):
+    app.extensions["user_cache"] = LRUCache(
+        maxsize=app.config.get("USER_CACHE_SIZE", 1024), ttl=app.config.get("USER_CACHE_TTL", 30))
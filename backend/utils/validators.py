@@ -0,0 +1,62 @@
+import math
+
+CAR_PARKING_CHOICES = ("Any", "Available", "NotAvailable")
+PETS_CHOICES = ("Any", "Allowed", "Strictly Not Allowed")
+
+REQUIRED_PROPERTY_FIELDS = (
+    "full_name", "mobile_number", "address", "city", "area", "district", "property_type",
+    "house_type", "rent_price", "car_parking", "pets", "facing", "furnishing",
+)
+
+
+def validate_property(data, require_all=False, partial=False):
+    """Return an error message for bad listing input, or None if it is valid.
+
+    With ``partial`` (updates) only the fields given are checked; fields
+    left out, or sent as None, keep their stored values.
+    """
+    if require_all:
+        missing = [f for f in REQUIRED_PROPERTY_FIELDS if data.get(f) in (None, "")]
+        if missing:
+            return f"Missing fields: {', '.join(missing)}"
+    if partial:
+        blank = [f for f in REQUIRED_PROPERTY_FIELDS if data.get(f) == ""]
+        if blank:
+            return f"Missing fields: {', '.join(blank)}"
+
+    if not (partial and data.get("car_parking") is None) and data.get("car_parking") not in CAR_PARKING_CHOICES:
+        return "Invalid car_parking value"
+    if not (partial and data.get("pets") is None) and data.get("pets") not in PETS_CHOICES:
+        return "Invalid pets value"
+
+    if require_all or data.get("rent_price") is not None:
+        error = validate_rent_price(data.get("rent_price"))
+        if error:
+            return error
+
+    return validate_location(data)
+
+
+def validate_rent_price(value):
+    """Rent must be a finite, non-negative number (``nan`` and ``inf`` parse as floats)."""
+    try:
+        value = float(value)
+        if not math.isfinite(value) or value < 0:
+            raise ValueError
+    except (TypeError, ValueError):
+        return "Invalid rent_price value"
+    return None
+
+
+def validate_location(data):
+    """Latitude and longitude are optional, but only as a valid pair."""
+    lat, lng = data.get("latitude"), data.get("longitude")
+    if lat in (None, "") and lng in (None, ""):
+        return None
+    try:
+        lat, lng = float(lat), float(lng)
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            raise ValueError
+    except (TypeError, ValueError):
+        return "Invalid latitude/longitude"
+    return None